@@ -0,0 +1,105 @@
+"""Benchmark /process callback size and encoding CPU per embedding encoding.
+
+Sends a realistic page result (768-d embedding, Korean summary, tags,
+entities, todos) through ``CallbackService.send_ai_results`` into an
+in-process transport, for every ``embedding_encoding`` with and without
+gzip, and reports the body size on the wire and the CPU time per callback,
+including its trip through an in-memory outbox.
+"serialize" subtracts the cost of POSTing an empty body through the same
+client, leaving the time spent building, encoding and queuing the payload.
+Run from ``apps/ai``::
+
+    python -m scripts.bench_callback_payload --repeat 2000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+
+import httpx
+import numpy as np
+
+from src.models.schemas import AIProcessingResult
+from src.services.callback import CallbackService
+
+
+def _result(dim: int, seed: int) -> AIProcessingResult:
+    rng = np.random.default_rng(seed)
+    vector = rng.standard_normal(dim).astype(np.float32)
+    vector /= np.linalg.norm(vector)
+    return AIProcessingResult(
+        page_id="3f2b9c1e-8a4d-4e1b-9a77-2c5d0e6f1a90",
+        note_type="meeting_note",
+        tags=[{"name": f"태그{i}", "score": 0.1 * i} for i in range(10)],
+        summary="검색 품질 개선을 위해 형태소 분석기를 교체하고 재현율을 측정하기로 했다. " * 3,
+        embedding=vector.tolist(),
+        cluster_id=7,
+        entities=[
+            {"type": "person", "value": "김민수"},
+            {"type": "date", "value": "2026-10-20"},
+            {"type": "project", "value": "검색 개편"},
+        ],
+        todos=[{"title": "재현율 측정 스크립트 작성", "priority": "high", "assignee": "김민수"}],
+        confidence=0.82,
+        status_signals=[{"signal": "in_progress", "keyword": "진행 중", "context": "색인 작업 진행 중"}],
+    )
+
+
+async def _bench(
+    result: AIProcessingResult,
+    repeat: int,
+) -> list[tuple[str, int, float, float]]:
+    sizes: list[int] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        sizes.append(len(request.content))
+        return httpx.Response(200)
+
+    service = CallbackService(outbox_path=None)
+    service.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    rows = []
+    try:
+        start = time.process_time()
+        for _ in range(repeat):
+            await service.client.post("http://web/api/ai/callback", json={})
+        overhead_us = (time.process_time() - start) / repeat * 1e6
+        for encoding in ("json", "f32", "f16"):
+            for compress in (False, True):
+                sizes.clear()
+                start = time.process_time()
+                for _ in range(repeat):
+                    await service.send_ai_results(
+                        "http://web/api/ai/callback",
+                        result,
+                        embedding_encoding=encoding,
+                        compress=compress,
+                    )
+                    await service.drain(timeout=60)
+                cpu_us = (time.process_time() - start) / repeat * 1e6
+                name = encoding + (" + gzip" if compress else "")
+                rows.append((name, sizes[-1], cpu_us, cpu_us - overhead_us))
+    finally:
+        await service.close()
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--repeat", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rows = asyncio.run(_bench(_result(args.dim, args.seed), args.repeat))
+    _, base_size, base_cpu, base_serialize = rows[0]
+    print(f"{'encoding':<12} {'bytes':>7} {'x smaller':>10} {'CPU us':>8} "
+          f"{'serialize us':>13} {'x faster':>9}")
+    for name, size, cpu_us, serialize_us in rows:
+        print(f"{name:<12} {size:>7} {base_size / size:>10.1f} {cpu_us:>8.0f} "
+              f"{serialize_us:>13.0f} {base_serialize / serialize_us:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
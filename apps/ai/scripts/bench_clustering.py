@@ -0,0 +1,120 @@
+"""Scaling benchmark for ClusteringService fits on large corpora.
+
+Generates unit-normalized 768-d embeddings around one topic per 200 pages and
+times a full fit per corpus size and configuration:
+
+- ``baseline``: HDBSCAN on the raw vectors
+- ``reduced``: PCA to CLUSTER_REDUCE_DIM first
+- ``two-level``: PCA, then MiniBatchKMeans partitions of
+  ``--partition-size`` with HDBSCAN inside each
+
+Each run is a separate process so peak RSS is its own; runs past
+``--timeout`` are reported as such. ARI is against the generating topics.
+Run from ``apps/ai``::
+
+    python -m scripts.bench_clustering --sizes 10000 50000 200000
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+CONFIGS = {
+    "baseline": {"CLUSTER_REDUCE": "none", "CLUSTER_PARTITION_SIZE": "0"},
+    "reduced": {"CLUSTER_REDUCE": "pca", "CLUSTER_PARTITION_SIZE": "0"},
+    "two-level": {"CLUSTER_REDUCE": "pca"},
+}
+
+
+def _corpus(size: int, dim: int, seed: int) -> tuple[np.ndarray, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    topics = max(10, size // 200)
+    centers = rng.standard_normal((topics, dim)).astype(np.float32)
+    truth = rng.integers(0, topics, size)
+    matrix = np.empty((size, dim), dtype=np.float32)
+    for start in range(0, size, 10000):
+        end = min(size, start + 10000)
+        noise = rng.standard_normal((end - start, dim)).astype(np.float32)
+        matrix[start:end] = centers[truth[start:end]] + 0.06 * noise
+    matrix /= np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix, truth
+
+
+def _run_single(size: int, dim: int, seed: int) -> None:
+    from sklearn.metrics import adjusted_rand_score
+
+    from src.services.clustering import _full_state
+
+    matrix, truth = _corpus(size, dim, seed)
+    page_ids = [str(i) for i in range(size)]
+    start = time.perf_counter()
+    state = _full_state(page_ids, matrix)
+    elapsed = time.perf_counter() - start
+    labels = state.labels[:size]
+    print(json.dumps({
+        "seconds": elapsed,
+        # ru_maxrss is in kilobytes on Linux
+        "peak_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "clusters": int(len(set(labels.tolist()) - {-1})),
+        "noise": float((labels == -1).mean()),
+        "ari": float(adjusted_rand_score(truth, labels)),
+    }))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 50000, 200000])
+    parser.add_argument("--configs", nargs="+", default=list(CONFIGS), choices=list(CONFIGS))
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--reduce-dim", type=int, default=64)
+    parser.add_argument("--partition-size", type=int, default=20000)
+    parser.add_argument("--timeout", type=float, default=1800)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--single", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.single:
+        _run_single(args.single, args.dim, args.seed)
+        return
+
+    print(f"{'size':>8} {'config':>10} {'seconds':>9} {'peak MB':>9} "
+          f"{'clusters':>9} {'noise':>6} {'ARI':>6}")
+    for size in args.sizes:
+        for name in args.configs:
+            env = dict(
+                os.environ,
+                CLUSTER_REDUCE_DIM=str(args.reduce_dim),
+                CLUSTER_REDUCE_MIN_ITEMS="0",
+                CLUSTER_PARTITION_SIZE=str(args.partition_size),
+            )
+            env.update(CONFIGS[name])
+            command = [
+                sys.executable, "-m", "scripts.bench_clustering",
+                "--single", str(size), "--dim", str(args.dim), "--seed", str(args.seed),
+            ]
+            try:
+                out = subprocess.run(
+                    command, env=env, capture_output=True, text=True,
+                    timeout=args.timeout, check=True,
+                ).stdout
+            except subprocess.TimeoutExpired:
+                print(f"{size:>8} {name:>10} {'timeout':>9}")
+                continue
+            except subprocess.CalledProcessError as exc:
+                print(f"{size:>8} {name:>10} {'failed':>9} {exc.stderr.strip().splitlines()[-1]}")
+                continue
+            row = json.loads(out.strip().splitlines()[-1])
+            print(f"{size:>8} {name:>10} {row['seconds']:>9.1f} {row['peak_mb']:>9.0f} "
+                  f"{row['clusters']:>9} {row['noise']:>6.1%} {row['ari']:>6.3f}")
+
+
+if __name__ == "__main__":
+    main()
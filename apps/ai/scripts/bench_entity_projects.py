@@ -0,0 +1,103 @@
+"""Benchmark known-project matching in EntityExtractor.
+
+Compares the previous ``name in text`` loop, a bare Aho-Corasick pass and
+what ``EntityExtractor`` actually runs (the automaton from
+``AUTOMATON_MIN_PROJECTS`` names up, folded ``str.find`` below) on synthetic
+Korean/English project names and notes.
+Run from ``apps/ai``::
+
+    python -m scripts.bench_entity_projects --projects 100 1000 5000
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import time
+
+from src.services.automaton import AhoCorasick
+from src.services.entity_extractor import EntityExtractor
+
+_SYLLABLES = "가나다라마바사아자차카타파하개발기획서버모델검색데이터"
+_WORDS = ["Alpha", "Beta", "Search", "Infra", "Mobile", "Growth", "Platform"]
+
+
+def _project_names(count: int, rng: random.Random) -> list[str]:
+    names: set[str] = set()
+    while len(names) < count:
+        korean = "".join(rng.choice(_SYLLABLES) for _ in range(rng.randint(2, 5)))
+        if rng.random() < 0.5:
+            names.add(f"{rng.choice(_WORDS)} {korean}")
+        else:
+            names.add(f"{korean} 프로젝트")
+    return sorted(names)
+
+
+def _note(names: list[str], length: int, rng: random.Random) -> str:
+    parts: list[str] = []
+    size = 0
+    while size < length:
+        if rng.random() < 0.05:
+            part = rng.choice(names)
+        else:
+            part = "".join(rng.choice(_SYLLABLES) for _ in range(rng.randint(1, 6)))
+        parts.append(part)
+        size += len(part) + 1
+    return " ".join(parts)
+
+
+def _loop_match(names: list[str], text: str) -> list[str]:
+    return [name for name in names if name and name in text]
+
+
+def _time(fn, repeats: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fn()
+    return (time.perf_counter() - start) / repeats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--projects", type=int, nargs="+", default=[100, 1000, 5000])
+    parser.add_argument("--note-chars", type=int, default=5000)
+    parser.add_argument("--notes", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    print(
+        f"{'projects':>9} {'loop ms':>9} {'automaton ms':>13} "
+        f"{'extractor ms':>13} {'speedup':>8} {'build ms':>9}"
+    )
+    for count in args.projects:
+        names = _project_names(count, rng)
+        notes = [_note(names, args.note_chars, rng) for _ in range(args.notes)]
+
+        start = time.perf_counter()
+        extractor = EntityExtractor(names)
+        build = time.perf_counter() - start
+
+        automaton = AhoCorasick(names, fold=str.lower)
+        loop = _time(lambda: [_loop_match(names, note) for note in notes], 3)
+        fused = _time(lambda: [automaton.matched(note) for note in notes], 3)
+        chosen = _time(lambda: [extractor._find_projects(note) for note in notes], 3)
+
+        # Case-sensitive loop hits must be a subset of the automaton's hits
+        for note in notes:
+            found = {
+                e["value"] for e in extractor.extract(note) if e["type"] == "project"
+            }
+            missing = set(_loop_match(names, note)) - found
+            assert not missing, f"automaton missed {sorted(missing)[:3]}"
+
+        print(
+            f"{count:>9} {loop / len(notes) * 1000:>9.2f} "
+            f"{fused / len(notes) * 1000:>13.2f} "
+            f"{chosen / len(notes) * 1000:>13.2f} {loop / chosen:>7.1f}x "
+            f"{build * 1000:>9.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""Benchmark per-request CPU spent on validation and serialization.
+
+Measures the framework side of the large-payload endpoints, with model
+inference and the HDBSCAN fit replaced by precomputed outputs:
+
+- ``/process``: building the validated ``AIProcessingResult`` and sending
+  it through ``CallbackService.send_ai_results`` and an in-memory outbox
+  into an in-process transport (the background half of the request)
+- ``/cluster``: a request of ``--items`` embeddings through the real router
+  over ASGI, parsing and validation through the response
+- ``/embed`` and ``/embed/batch``: the real routers over ASGI
+
+CPU time per request is process time, so it excludes waiting. Run from
+``apps/ai``::
+
+    python -m scripts.bench_serialization --items 500 --repeat 200
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import time
+from typing import Any
+
+import httpx
+import numpy as np
+from fastapi import FastAPI
+
+from src.routers import cluster, embed
+from src.routers.process import _build_result
+from src.services.callback import CallbackService
+from src.services.clustering import ClusteringService
+from src.services.text_analyzer import TextAnalysis
+
+
+class _Inline:
+    """Runs inference calls inline, so only request handling is timed."""
+
+    depth = 0
+
+    def ensure_capacity(self) -> None:
+        pass
+
+    async def run(self, fn: Any, *args: Any, wait: bool = True, **kwargs: Any) -> Any:
+        return fn(*args, **kwargs)
+
+
+class _Ready:
+    all_ready = True
+
+    def is_ready(self, name: str) -> bool:
+        return True
+
+
+class _FixedEmbeddings:
+    def __init__(self, vector: list[float]) -> None:
+        self.vector = vector
+
+    async def encode(self, text: str) -> list[float]:
+        return list(self.vector)
+
+    def encode_batch(self, texts: list[str]) -> list[list[float]]:
+        return [list(self.vector) for _ in texts]
+
+
+class _PrecomputedFit(ClusteringService):
+    """The real request path up to the fit, which returns a fixed grouping."""
+
+    def _fit_all(self, page_ids: list[str], matrix: np.ndarray) -> dict:
+        groups: dict[int, list[str]] = {}
+        for i, page_id in enumerate(page_ids):
+            groups.setdefault(i % 20, []).append(page_id)
+        return {
+            "clusters": [{"cluster_id": k, "page_ids": v} for k, v in groups.items()],
+            "noise": [],
+            "_mode": "full",
+        }
+
+
+def _vector(rng: np.random.Generator, dim: int) -> list[float]:
+    vector = rng.standard_normal(dim).astype(np.float32)
+    return (vector / np.linalg.norm(vector)).tolist()
+
+
+def _analysis() -> TextAnalysis:
+    return TextAnalysis(
+        entities=[
+            {"type": "person", "value": "김민수", "metadata": None},
+            {"type": "date", "value": "2026-10-20", "metadata": {"iso": "2026-10-20"}},
+        ],
+        todos=[{"title": "재현율 측정 스크립트 작성", "priority": "high",
+                "due_date": None, "assignee": "김민수"}],
+        status_signals=[{"signal": "in_progress", "keyword": "진행 중",
+                         "context": "색인 작업 진행 중"}],
+    )
+
+
+def _cpu_us(repeat: int, fn: Any) -> float:
+    async def loop() -> float:
+        start = time.process_time()
+        for _ in range(repeat):
+            await fn()
+        return (time.process_time() - start) / repeat * 1e6
+
+    return asyncio.run(loop())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--items", type=int, default=500)
+    parser.add_argument("--batch", type=int, default=32)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    vector = _vector(rng, args.dim)
+
+    app = FastAPI()
+    app.include_router(cluster.router)
+    app.include_router(embed.router)
+    app.state.inference_executor = _Inline()
+    app.state.model_registry = _Ready()
+    app.state.embedding_batcher = _FixedEmbeddings(vector)
+    app.state.embedding_service = _FixedEmbeddings(vector)
+    app.state.clustering_service = _PrecomputedFit(snapshot_path=None)
+
+    cluster_body = json.dumps({"embeddings": [
+        {"page_id": f"page-{i}", "vector": _vector(rng, args.dim)} for i in range(args.items)
+    ]}).encode()
+    batch_body = json.dumps({"texts": ["텍스트"] * args.batch}).encode()
+    headers = {"Content-Type": "application/json"}
+
+    callback_service = CallbackService(outbox_path=None)
+    callback_service.client = httpx.AsyncClient(
+        transport=httpx.MockTransport(lambda request: httpx.Response(200))
+    )
+    client = httpx.AsyncClient(transport=httpx.ASGITransport(app), base_url="http://ai")
+
+    async def process() -> None:
+        result = _build_result(
+            "page-1", vector,
+            [{"name": f"태그{i}", "score": 0.1 * i} for i in range(10)],
+            "검색 품질 개선을 위해 형태소 분석기를 교체하기로 했다.",
+            3, ("meeting_note", 0.82), _analysis(),
+        )
+        await callback_service.send_ai_results("http://web/api/ai/callback", result)
+        await callback_service.drain(timeout=60)
+
+    async def post(path: str, body: bytes) -> None:
+        response = await client.post(path, content=body, headers=headers)
+        response.raise_for_status()
+
+    cases = [
+        ("/process callback", 20 * args.repeat, process),
+        (f"/cluster {args.items} items", max(1, args.repeat // 10),
+         lambda: post("/cluster", cluster_body)),
+        ("/embed", 20 * args.repeat, lambda: post("/embed", b'{"text": "text"}')),
+        (f"/embed/batch {args.batch}", args.repeat, lambda: post("/embed/batch", batch_body)),
+    ]
+    print(f"{'request':<22} {'CPU us':>10}")
+    for name, repeat, fn in cases:
+        _cpu_us(3, fn)  # warm up outside the timing
+        print(f"{name:<22} {_cpu_us(repeat, fn):>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""Check that callbacks survive a web app outage and a sidecar restart.
+
+Simulates, with an in-process transport and scaled-down timings:
+
+1. The web app is unreachable while a burst of ``--pages`` results, a
+   report and a cluster assignment are sent. The circuit breaker should
+   open after a handful of attempts, and shutting down leaves everything
+   in the outbox file.
+2. A new ``CallbackService`` on the same file starts while the web app is
+   back but slow and answering 503 to its first requests. Every callback
+   must arrive, with no more than ``CALLBACK_HOST_CONCURRENCY`` in flight.
+
+Run from ``apps/ai``::
+
+    python -m scripts.verify_callback_outbox --pages 300
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+
+import httpx
+
+from src.models.schemas import AIProcessingResult
+from src.services import callback
+from src.services.callback import CallbackService
+
+URL = "http://web/api/ai/callback"
+REPORT_URL = "http://web/api/ai/report"
+CLUSTER_URL = "http://web/api/ai/cluster-result"
+
+
+class _WebApp:
+    """Transport handler playing the web app: down, then flaky and slow."""
+
+    def __init__(self, latency: float, failures: int) -> None:
+        self.up = False
+        self.latency = latency
+        self.failures = failures
+        self.attempts = 0
+        self.active = 0
+        self.peak = 0
+        self.received: dict[str, int] = {}
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.attempts += 1
+        if not self.up:
+            raise httpx.ConnectError("connection refused", request=request)
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(self.latency)
+            if self.failures > 0:
+                self.failures -= 1
+                return httpx.Response(503)
+            body = json.loads(request.content)
+            name = body.get("pageId") or body.get("type") or "clusters"
+            self.received[name] = self.received.get(name, 0) + 1
+            return httpx.Response(200)
+        finally:
+            self.active -= 1
+
+
+def _result(page_id: str) -> AIProcessingResult:
+    return AIProcessingResult(
+        page_id=page_id,
+        note_type="meeting_note",
+        tags=[],
+        summary="요약",
+        embedding=[0.1] * 8,
+        confidence=0.5,
+    )
+
+
+def _service(path: str, web: _WebApp) -> CallbackService:
+    service = CallbackService(outbox_path=path)
+    service.client = httpx.AsyncClient(transport=httpx.MockTransport(web))
+    return service
+
+
+async def _run(pages: int, path: str) -> bool:
+    web = _WebApp(latency=0.01, failures=20)
+    expected = {f"page-{i}" for i in range(pages)} | {"daily", "clusters"}
+
+    service = _service(path, web)
+    for i in range(pages):
+        await service.send_ai_results(URL, _result(f"page-{i}"))
+    await service.send_report(REPORT_URL, {"type": "daily", "summary": "변경 사항이 없습니다."})
+    await service.send_cluster_results(CLUSTER_URL, {"clusters": [], "noise": []})
+    await asyncio.sleep(1.0)
+    down_stats = service.stats()
+    down_attempts = web.attempts
+    await service.close()
+    print(f"outage: {down_attempts} attempts for {len(expected)} callbacks, "
+          f"open circuits {down_stats['open_circuits']}, "
+          f"{down_stats['pending']} pending after shutdown")
+
+    web.up = True
+    web.attempts = 0
+    start = time.perf_counter()
+    service = _service(path, web)
+    service.start()
+    while service.stats()["pending"] and time.perf_counter() - start < 30:
+        await asyncio.sleep(0.05)
+    elapsed = time.perf_counter() - start
+    stats = service.stats()
+    await service.close()
+    print(f"recovery: {web.attempts} attempts in {elapsed:.2f}s, peak {web.peak} in flight, "
+          f"{len(web.received)}/{len(expected)} delivered, "
+          f"{sum(web.received.values()) - len(web.received)} duplicates, "
+          f"{stats['dead']} dead")
+
+    checks = {
+        "breaker opened during the outage": bool(down_stats["open_circuits"]),
+        "outage attempts bounded": down_attempts < len(expected),
+        "everything kept across the restart": down_stats["pending"] == len(expected),
+        "everything delivered": set(web.received) == expected and stats["pending"] == 0,
+        "per-host concurrency held": web.peak <= callback.CALLBACK_HOST_CONCURRENCY,
+    }
+    for name, ok in checks.items():
+        print(f"  {'ok ' if ok else 'FAIL'} {name}")
+    return all(checks.values())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pages", type=int, default=300)
+    args = parser.parse_args()
+
+    # Production timings scaled down so the scenario runs in seconds
+    callback.CALLBACK_BACKOFF_BASE_S = 0.02
+    callback.CALLBACK_BACKOFF_MAX_S = 0.2
+    callback.CALLBACK_BREAKER_COOLDOWN_S = 0.3
+    callback.CALLBACK_DRAIN_TIMEOUT_S = 0.2
+
+    with tempfile.TemporaryDirectory() as directory:
+        ok = asyncio.run(_run(args.pages, os.path.join(directory, "outbox.sqlite3")))
+    raise SystemExit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""Verify the recluster job's embedding fetch against a local stand-in web app.
+
+Starts a stand-in ``/ai/trigger-recluster`` in a separate process serving a
+synthetic corpus two ways: paged with packed float32 rows (the current web
+app), and under ``/legacy`` as one JSON document of float lists (a web app
+without paging). Fetches it both ways with ``fetch_embeddings``, checks the
+matrices match the corpus exactly, and reports time and peak traced memory
+of the fetching side against the size of the matrix itself. Run from
+``apps/ai``::
+
+    python -m scripts.verify_recluster_fetch --pages 10000 --page-size 2000
+
+The legacy mode needs ~20x the matrix in memory; skip it for large corpora
+with ``--modes paged``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import base64
+import socket
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import httpx
+import numpy as np
+import uvicorn
+from fastapi import FastAPI, Request
+
+from src.jobs.recluster import fetch_embeddings
+
+
+def _corpus(pages: int, dim: int, seed: int) -> tuple[list[str], np.ndarray]:
+    rng = np.random.default_rng(seed)
+    matrix = rng.standard_normal((pages, dim)).astype(np.float32)
+    matrix /= np.linalg.norm(matrix, axis=1, keepdims=True)
+    return [f"page-{i:08d}" for i in range(pages)], matrix
+
+
+def _serve(port: int, pages: int, dim: int, seed: int) -> None:
+    page_ids, matrix = _corpus(pages, dim, seed)
+    app = FastAPI()
+
+    @app.post("/ai/trigger-recluster")
+    async def paged(request: Request) -> dict:
+        limit = int(request.query_params["limit"])
+        after = request.query_params.get("after")
+        start = 0 if after is None else int(after.removeprefix("page-")) + 1
+        end = min(pages, start + limit)
+        body = {
+            "page_ids": page_ids[start:end],
+            "dim": dim,
+            "vectors": base64.b64encode(matrix[start:end].astype("<f4").tobytes()).decode(),
+            "next_after": page_ids[end - 1] if end - start == limit else None,
+        }
+        if after is None:
+            body["total"] = pages
+        return body
+
+    @app.post("/legacy/ai/trigger-recluster")
+    async def legacy() -> dict:
+        return {"embeddings": [
+            {"page_id": pid, "vector": row} for pid, row in zip(page_ids, matrix.tolist())
+        ]}
+
+    uvicorn.run(app, host="127.0.0.1", port=port, log_level="warning")
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def _fetch(url: str, page_size: int) -> tuple[float, float, list[str], np.ndarray]:
+    async with httpx.AsyncClient(timeout=httpx.Timeout(600.0)) as client:
+        tracemalloc.start()
+        start = time.perf_counter()
+        page_ids, matrix = await fetch_embeddings(client, url, page_size=page_size)
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return elapsed, peak / 2**20, page_ids, matrix
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pages", type=int, default=10000)
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--page-size", type=int, default=2000)
+    parser.add_argument("--modes", nargs="+", default=["paged", "legacy"],
+                        choices=["paged", "legacy"])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--serve", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        _serve(args.serve, args.pages, args.dim, args.seed)
+        return
+
+    port = _free_port()
+    server = subprocess.Popen([
+        sys.executable, "-m", "scripts.verify_recluster_fetch", "--serve", str(port),
+        "--pages", str(args.pages), "--dim", str(args.dim), "--seed", str(args.seed),
+    ])
+    try:
+        base = f"http://127.0.0.1:{port}"
+        for _ in range(300):
+            try:
+                httpx.post(f"{base}/ai/trigger-recluster", params={"limit": 1}).raise_for_status()
+                break
+            except httpx.TransportError:
+                time.sleep(0.1)
+        else:
+            raise RuntimeError("stand-in server did not start")
+
+        expected_ids, expected = _corpus(args.pages, args.dim, args.seed)
+        matrix_mb = expected.nbytes / 2**20
+        print(f"{args.pages} pages x {args.dim} dims, matrix {matrix_mb:.0f} MB, "
+              f"page size {args.page_size}")
+        print(f"{'mode':<8} {'seconds':>8} {'peak MB':>8} {'x matrix':>9}")
+        urls = {
+            "paged": f"{base}/ai/trigger-recluster",
+            "legacy": f"{base}/legacy/ai/trigger-recluster",
+        }
+        for mode in args.modes:
+            url = urls[mode]
+            elapsed, peak_mb, page_ids, matrix = asyncio.run(_fetch(url, args.page_size))
+            assert page_ids == expected_ids, f"{mode}: page ids differ"
+            assert matrix.dtype == np.float32 and np.array_equal(matrix, expected), (
+                f"{mode}: vectors differ"
+            )
+            print(f"{mode:<8} {elapsed:>8.2f} {peak_mb:>8.0f} {peak_mb / matrix_mb:>9.2f}")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""Check that TextAnalyzer matches the individual services exactly.
+
+Generates random notes from fragments that exercise every entity, todo,
+status and note-type keyword pattern (including overlapping hits), plus
+longer prose notes with sparse hits, and
+compares ``TextAnalyzer.analyze`` with ``EntityExtractor.extract``,
+``TodoExtractor.extract``, ``StatusDetector.detect`` and per-pattern
+``findall`` keyword counts. Also times both paths against a single
+lookahead scanner over all patterns, the approach TextAnalyzer avoids.
+Run from ``apps/ai``::
+
+    python -m scripts.verify_text_analyzer --cases 5000
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import re
+import sys
+import time
+
+import numpy as np
+
+from src.services.classifier import KEYWORD_PATTERNS, NOTE_TYPES
+from src.services.classifier import SCAN_PATTERNS as CLASSIFIER_PATTERNS
+from src.services.entity_extractor import SCAN_PATTERNS as ENTITY_PATTERNS
+from src.services.entity_extractor import EntityExtractor
+from src.services.status_detector import SCAN_PATTERNS as STATUS_PATTERNS
+from src.services.status_detector import StatusDetector
+from src.services.text_analyzer import TextAnalyzer
+from src.services.todo_extractor import SCAN_PATTERNS as TODO_PATTERNS
+from src.services.todo_extractor import TodoExtractor
+
+FRAGMENTS = [
+    # entities
+    "@홍길동", "@김철수님", "@이", "2024-03-12", "2024/3/5", "3/15", "13/40",
+    "3월 12일", "마감: 2024-04-01", "deadline 5/1", "~까지 4월 3일", "due:2024.1.2",
+    "https://example.com/a?b=1", "http://x.y)", "NotionFlow", "알파 프로젝트",
+    # todos
+    "- [ ] 배포 스크립트 정리", "* [ ] 긴급 서버 점검 @박민수 마감 2024-05-01",
+    "TODO: 문서 업데이트", "todo 리뷰 요청 high", "- 테스트 추가 해야 함",
+    "* 모니터링 필요", "- 나중에 정리할 것", "- [x] 완료된 항목", "  - 회의 준비하기",
+    # status
+    "완료", "끝남", "done", "in progress", "진행 중", "작업중", "blocked", "on hold",
+    "보류", "중단", "해결", "resolved",
+    # note-type keywords (some overlap each other)
+    "회의록", "참석자", "안건", "최종 결정 사항", "결정:", "합의", "decision", "[ ]",
+    "[x]", "☑", "✅", "아이디어", "어떨까", "참고 자료", "가이드", "log", "catalog",
+    "작업 일지", "2024-01-01 기록", "진행 상황", "journal",
+    # characters re.IGNORECASE folds onto ASCII letters
+    "fınıshed", "ſtarted", "İN PROGRESS", "DONE", "Blocked", "\u212aorea", "LOG",
+    # glue
+    " ", " ", " ", "\n", "\n", "\n\n", ".", ",", "그리고", "abc", "Ab", "-", "*", ":",
+]
+
+
+_SYLLABLES = "가나다라마바사아자차카타파하개발기획서버모델검색데이터를은는이가에서으로"
+
+
+def _note(rng: random.Random) -> str:
+    return "".join(rng.choice(FRAGMENTS) for _ in range(rng.randint(0, 40)))
+
+
+def _prose(rng: random.Random, length: int) -> str:
+    """Mostly filler words with an occasional rule hit, like a real note."""
+    parts: list[str] = []
+    size = 0
+    while size < length:
+        if rng.random() < 0.005:
+            part = rng.choice(FRAGMENTS)
+        else:
+            part = "".join(rng.choice(_SYLLABLES) for _ in range(rng.randint(1, 5)))
+            part += ". " if rng.random() < 0.1 else " "
+        parts.append(part)
+        size += len(part)
+    return "".join(parts)
+
+
+def _reference_counts(text: str) -> np.ndarray:
+    return np.array(
+        [
+            sum(len(p.findall(text)) for p in KEYWORD_PATTERNS[note_type])
+            for note_type in NOTE_TYPES
+        ],
+        dtype=np.float64,
+    )
+
+
+def _fused_scanner() -> re.Pattern[str]:
+    """Zero-width lookahead that stops wherever any analyzer pattern matches."""
+    flag_letters = ((re.I, "i"), (re.M, "m"), (re.S, "s"), (re.X, "x"))
+    parts = []
+    for pattern in ENTITY_PATTERNS + TODO_PATTERNS + STATUS_PATTERNS + CLASSIFIER_PATTERNS:
+        flags = "".join(letter for flag, letter in flag_letters if pattern.flags & flag)
+        parts.append(f"(?{flags}:{pattern.pattern})" if flags else f"(?:{pattern.pattern})")
+    return re.compile("(?=" + "|".join(parts) + ")")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--cases", type=int, default=5000)
+    parser.add_argument("--prose-chars", type=int, default=3000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    entity_extractor = EntityExtractor(["NotionFlow", "알파 프로젝트"])
+    todo_extractor = TodoExtractor()
+    status_detector = StatusDetector()
+    analyzer = TextAnalyzer(entity_extractor, todo_extractor, status_detector)
+
+    prose = [_prose(rng, args.prose_chars) for _ in range(args.cases // 10)]
+    notes = [_note(rng) for _ in range(args.cases)] + prose
+    failures = 0
+    for note in notes:
+        analysis = analyzer.analyze(note)
+        expected = (
+            entity_extractor.extract(note),
+            todo_extractor.extract(note),
+            status_detector.detect(note),
+            list(_reference_counts(note) if note.strip() else np.zeros(len(NOTE_TYPES))),
+        )
+        got = (
+            analysis.entities,
+            analysis.todos,
+            analysis.status_signals,
+            list(analysis.keyword_counts),
+        )
+        if got != expected:
+            failures += 1
+            if failures <= 5:
+                print(f"MISMATCH for {note!r}")
+                for name, e, g in zip(("entities", "todos", "status", "keywords"), expected, got):
+                    if e != g:
+                        print(f"  {name}: expected {e!r}\n  {name}:      got {g!r}")
+
+    # Timings use the prose notes, which look like real pages
+    start = time.perf_counter()
+    for note in prose:
+        entity_extractor.extract(note)
+        todo_extractor.extract(note)
+        status_detector.detect(note)
+        _reference_counts(note)
+    separate = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for note in prose:
+        analyzer.analyze(note)
+    shared = time.perf_counter() - start
+
+    scanner = _fused_scanner()
+    start = time.perf_counter()
+    for note in prose:
+        for _ in scanner.finditer(note):
+            pass
+    fused = time.perf_counter() - start
+
+    print(f"{len(notes)} notes, {failures} mismatches")
+    print(f"{len(prose)} prose notes: separate services {separate * 1000:.1f} ms, "
+          f"TextAnalyzer {shared * 1000:.1f} ms (x{separate / shared:.2f}), "
+          f"single lookahead scan alone {fused * 1000:.1f} ms")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
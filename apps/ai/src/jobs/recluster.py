@@ -1,14 +1,85 @@
+import json
 import logging
+import os
 
 import httpx
+import numpy as np
 
 from src.services.callback import CallbackService
 from src.services.clustering import ClusteringService
+from src.services.inference import InferenceExecutor
+from src.services.vector_codec import decode_f32
 
 logger = logging.getLogger(__name__)
 
 TIMEOUT = httpx.Timeout(60.0, connect=10.0)
 
+# Embeddings fetched per request; one page is ~3 KB per 768-d vector
+RECLUSTER_PAGE_SIZE = int(os.environ.get("RECLUSTER_PAGE_SIZE", "2000"))
+
+
+async def fetch_embeddings(
+    client: httpx.AsyncClient,
+    trigger_url: str,
+    page_size: int = RECLUSTER_PAGE_SIZE,
+) -> tuple[list[str], np.ndarray]:
+    """Page ids and an (N x d) float32 matrix of every stored embedding.
+
+    Pages of packed float32 rows are decoded straight into a matrix sized
+    from the total on the first page, so at most one page is held besides
+    it. A web app without paging ignores the parameters and answers with
+    the whole corpus as float lists, which is converted once.
+    """
+    page_ids: list[str] = []
+    matrix: np.ndarray | None = None
+    after: str | None = None
+    while True:
+        params: dict[str, str | int] = {"limit": page_size}
+        if after is not None:
+            params["after"] = after
+        # Streamed into a local buffer: httpx keeps a read body on the response,
+        # which sits in a reference cycle until the next GC pass
+        body = bytearray()
+        async with client.stream("POST", trigger_url, params=params) as response:
+            response.raise_for_status()
+            async for chunk in response.aiter_bytes():
+                body += chunk
+        data = json.loads(body)
+        del body
+
+        if "page_ids" not in data:
+            entries = data.get("embeddings", [])
+            return (
+                [entry["page_id"] for entry in entries],
+                np.array([entry["vector"] for entry in entries], dtype=np.float32),
+            )
+
+        if data["page_ids"]:
+            rows = decode_f32(data["vectors"], data["dim"])
+            if len(rows) != len(data["page_ids"]):
+                raise ValueError(f"{len(rows)} vectors for {len(data['page_ids'])} page ids")
+            n = len(page_ids)
+            if matrix is None:
+                capacity = max(data.get("total", 0), len(rows))
+                matrix = np.empty((capacity, rows.shape[1]), dtype=np.float32)
+            elif rows.shape[1] != matrix.shape[1]:
+                raise ValueError(f"dimension changed mid-fetch: {matrix.shape[1]} -> {rows.shape[1]}")
+            if n + len(rows) > len(matrix):
+                # Pages were added since the first request
+                grown = np.empty((max(n + len(rows), len(matrix) * 5 // 4), matrix.shape[1]), dtype=np.float32)
+                grown[:n] = matrix[:n]
+                matrix = grown
+            matrix[n:n + len(rows)] = rows
+            page_ids.extend(data["page_ids"])
+
+        after = data.get("next_after")
+        if after is None:
+            break
+
+    if matrix is None:
+        return [], np.empty((0, 0), dtype=np.float32)
+    return page_ids, matrix[:len(page_ids)]
+
 
 async def recluster_job(app_state: object, callback_url: str) -> None:
     logger.info("Starting recluster job")
@@ -16,35 +87,30 @@ async def recluster_job(app_state: object, callback_url: str) -> None:
     try:
         trigger_url = f"{callback_url}/ai/trigger-recluster"
         async with httpx.AsyncClient(timeout=TIMEOUT) as client:
-            response = await client.post(trigger_url)
-            response.raise_for_status()
-            data = response.json()
+            page_ids, matrix = await fetch_embeddings(client, trigger_url)
 
-        raw_embeddings = data.get("embeddings", [])
-        if not raw_embeddings:
+        if not page_ids:
             logger.info("No embeddings returned, skipping recluster")
             return
 
-        items = [
-            (entry["page_id"], entry["vector"])
-            for entry in raw_embeddings
-        ]
-
         clustering_service: ClusteringService = app_state.clustering_service
-        result = clustering_service.cluster(items)
-
-        clusterer = result.pop("_clusterer", None)
-        if clusterer is not None:
-            clustering_service._last_clusterer = clusterer
+        inference_executor: InferenceExecutor = app_state.inference_executor
+        # Refits only the regions that changed since the last run
+        result = await inference_executor.run(
+            clustering_service.recluster_matrix, page_ids, matrix
+        )
+        mode = result.pop("_mode", "full")
 
         callback_service: CallbackService = app_state.callback_service
         cluster_result_url = f"{callback_url}/ai/cluster-results"
-        await callback_service.send_cluster_results(cluster_result_url, result)
+        queued = await callback_service.send_cluster_results(cluster_result_url, result)
 
         logger.info(
-            "Recluster complete: %d clusters, %d noise",
+            "Recluster complete (%s): %d clusters, %d noise, %s",
+            mode,
             len(result["clusters"]),
             len(result["noise"]),
+            "queued for delivery" if queued else "not queued",
         )
     except Exception:
         logger.exception("Recluster job failed")
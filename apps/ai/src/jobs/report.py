@@ -4,6 +4,7 @@ from datetime import datetime, timedelta, timezone
 import httpx
 
 from src.services.callback import CallbackService
+from src.services.inference import InferenceExecutor
 from src.services.summarizer import SummarizerService
 
 logger = logging.getLogger(__name__)
@@ -26,9 +27,10 @@ async def _fetch_changes(
     return data.get("changes", [])
 
 
-def _generate_summary(
+async def _generate_summary(
     changes: list[dict],
     summarizer_service: SummarizerService,
+    inference_executor: InferenceExecutor,
 ) -> str:
     if not changes:
         return "변경 사항이 없습니다."
@@ -41,12 +43,18 @@ def _generate_summary(
         lines.append(f"[{action}] {title}: {summary}")
 
     combined = "\n".join(lines)
-    return summarizer_service.summarize(combined, max_length=256)
+    return await inference_executor.run(
+        summarizer_service.summarize, combined, max_length=256
+    )
 
 
 async def daily_report_job(app_state: object, callback_url: str) -> None:
     logger.info("Starting daily report job")
 
+    if not app_state.model_registry.is_ready("kobart"):
+        logger.warning("Summarizer not ready, skipping daily report job")
+        return
+
     try:
         now = datetime.now(tz=KST)
         period_end = now.isoformat()
@@ -54,11 +62,12 @@ async def daily_report_job(app_state: object, callback_url: str) -> None:
 
         changes = await _fetch_changes(callback_url, period_start, period_end)
 
-        summarizer_service = SummarizerService(
-            app_state.kobart_tokenizer,
-            app_state.kobart_model,
+        summarizer_service: SummarizerService = app_state.summarizer_service
+        report_summary = await _generate_summary(
+            changes,
+            summarizer_service,
+            app_state.inference_executor,
         )
-        report_summary = _generate_summary(changes, summarizer_service)
 
         report_data = {
             "type": "daily",
@@ -71,9 +80,8 @@ async def daily_report_job(app_state: object, callback_url: str) -> None:
 
         callback_service: CallbackService = app_state.callback_service
         report_url = f"{callback_url}/ai/report"
-        await callback_service.send_report(report_url, report_data)
-
-        logger.info("Daily report sent with %d changes", len(changes))
+        if await callback_service.send_report(report_url, report_data):
+            logger.info("Daily report with %d changes queued for delivery", len(changes))
     except Exception:
         logger.exception("Daily report job failed")
 
@@ -81,6 +89,10 @@ async def daily_report_job(app_state: object, callback_url: str) -> None:
 async def weekly_report_job(app_state: object, callback_url: str) -> None:
     logger.info("Starting weekly report job")
 
+    if not app_state.model_registry.is_ready("kobart"):
+        logger.warning("Summarizer not ready, skipping weekly report job")
+        return
+
     try:
         now = datetime.now(tz=KST)
         period_end = now.isoformat()
@@ -88,11 +100,12 @@ async def weekly_report_job(app_state: object, callback_url: str) -> None:
 
         changes = await _fetch_changes(callback_url, period_start, period_end)
 
-        summarizer_service = SummarizerService(
-            app_state.kobart_tokenizer,
-            app_state.kobart_model,
+        summarizer_service: SummarizerService = app_state.summarizer_service
+        report_summary = await _generate_summary(
+            changes,
+            summarizer_service,
+            app_state.inference_executor,
         )
-        report_summary = _generate_summary(changes, summarizer_service)
 
         report_data = {
             "type": "weekly",
@@ -105,8 +118,7 @@ async def weekly_report_job(app_state: object, callback_url: str) -> None:
 
         callback_service: CallbackService = app_state.callback_service
         report_url = f"{callback_url}/ai/report"
-        await callback_service.send_report(report_url, report_data)
-
-        logger.info("Weekly report sent with %d changes", len(changes))
+        if await callback_service.send_report(report_url, report_data):
+            logger.info("Weekly report with %d changes queued for delivery", len(changes))
     except Exception:
         logger.exception("Weekly report job failed")
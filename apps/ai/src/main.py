@@ -1,20 +1,34 @@
+import asyncio
 import logging
+import os
 from collections.abc import AsyncGenerator
 from contextlib import asynccontextmanager
+from functools import partial
+from typing import Any
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from sentence_transformers import SentenceTransformer
-from transformers import AutoModelForSeq2SeqLM, AutoTokenizer
+from fastapi.responses import JSONResponse
 
 from src.jobs.scheduler import start_scheduler
 from src.routers import cluster, embed, process, project, report, summarize, tag
+from src.services import onnx_backend
+from src.services.batcher import EmbeddingBatcher
 from src.services.callback import CallbackService
 from src.services.classifier import ClassifierService
 from src.services.clustering import ClusteringService
+from src.services.embedding import EmbeddingService
 from src.services.entity_extractor import EntityExtractor
+from src.services.inference import InferenceExecutor, InferenceQueueFull
+from src.services.keyword import KeywordService
+from src.services.model_registry import ModelRegistry
 from src.services.project_matcher import ProjectMatcher
+from src.services.result_cache import ResultCache
 from src.services.status_detector import StatusDetector
+from src.services.summarizer import SummarizerService
+from src.services.text_analyzer import TextAnalyzer
+from src.services.text_pool import TextPool
+from src.services.tfidf_tagger import TfidfTagger
 from src.services.todo_extractor import TodoExtractor
 
 logging.basicConfig(
@@ -26,21 +40,134 @@ logger = logging.getLogger(__name__)
 SBERT_MODEL_NAME = "snunlp/KR-SBERT-V40K-klueNLI-augSTS"
 KOBART_MODEL_NAME = "gogamza/kobart-summarization"
 
+# "torch" (default) or "onnx" for the quantized ONNX Runtime backend
+INFERENCE_BACKEND = os.environ.get("INFERENCE_BACKEND", "torch")
+
+
+def _cache_name(model_name: str) -> str:
+    if INFERENCE_BACKEND == "onnx":
+        return f"{model_name}@{onnx_backend.backend_tag()}"
+    return model_name
+
+
+# Raw models loaded by src.serve before forking workers. Each worker builds
+# its own services around them, so the weights are shared copy-on-write.
+PRELOADED_MODELS: dict[str, Any] = {}
+
+
+def _load_sbert_model() -> Any:
+    if "sbert" in PRELOADED_MODELS:
+        return PRELOADED_MODELS["sbert"]
+
+    logger.info("Loading KR-SBERT model (%s): %s", INFERENCE_BACKEND, SBERT_MODEL_NAME)
+    if INFERENCE_BACKEND == "onnx":
+        return onnx_backend.load_sbert(SBERT_MODEL_NAME)
+
+    from sentence_transformers import SentenceTransformer
+
+    return SentenceTransformer(
+        SBERT_MODEL_NAME,
+        model_kwargs={"low_cpu_mem_usage": True},
+    )
+
+
+def _load_kobart_model() -> tuple[Any, Any]:
+    if "kobart" in PRELOADED_MODELS:
+        return PRELOADED_MODELS["kobart"]
+
+    logger.info("Loading KoBART model (%s): %s", INFERENCE_BACKEND, KOBART_MODEL_NAME)
+    if INFERENCE_BACKEND == "onnx":
+        return onnx_backend.load_kobart(KOBART_MODEL_NAME)
+
+    from transformers import AutoModelForSeq2SeqLM, AutoTokenizer
+
+    tokenizer = AutoTokenizer.from_pretrained(KOBART_MODEL_NAME)
+    # low_cpu_mem_usage memory-maps safetensors checkpoints instead of
+    # materializing a randomly initialized model first
+    model = AutoModelForSeq2SeqLM.from_pretrained(
+        KOBART_MODEL_NAME,
+        low_cpu_mem_usage=True,
+    )
+    return tokenizer, model
+
+
+def preload_models() -> None:
+    """Load model weights without building services or running inference.
+
+    ONNX Runtime sessions don't survive fork (their thread pools stay behind
+    in the parent), so for that backend only the exported files are prepared
+    here and every worker opens its own sessions from them.
+    """
+    if INFERENCE_BACKEND == "onnx":
+        onnx_backend.prepare_sbert(SBERT_MODEL_NAME)
+        onnx_backend.prepare_kobart(KOBART_MODEL_NAME)
+        return
+    PRELOADED_MODELS["sbert"] = _load_sbert_model()
+    PRELOADED_MODELS["kobart"] = _load_kobart_model()
+
+
+def load_sbert(state: Any) -> None:
+    """Load KR-SBERT and the services built on it into ``state``."""
+    state.sbert_model = _load_sbert_model()
+
+    state.embedding_service = EmbeddingService(
+        state.sbert_model,
+        cache=state.result_cache,
+        model_name=_cache_name(SBERT_MODEL_NAME),
+    )
+    state.embedding_batcher = EmbeddingBatcher(
+        state.embedding_service,
+        state.inference_executor,
+    )
+
+    # Phase 2: Note type classifier (encodes its prototypes with SBERT)
+    state.classifier_service = ClassifierService(
+        state.sbert_model,
+        cache=state.result_cache,
+        model_name=_cache_name(SBERT_MODEL_NAME),
+    )
+
+    state.embedding_service.warmup()
+
+
+def load_kobart(state: Any) -> None:
+    """Load KoBART and the summarizer service into ``state``."""
+    state.kobart_tokenizer, state.kobart_model = _load_kobart_model()
+
+    state.summarizer_service = SummarizerService(
+        state.kobart_tokenizer,
+        state.kobart_model,
+        cache=state.result_cache,
+        model_name=_cache_name(KOBART_MODEL_NAME),
+    )
+
+    state.summarizer_service.warmup()
+
+
+async def _load_models(app: FastAPI) -> None:
+    registry: ModelRegistry = app.state.model_registry
+    await asyncio.gather(
+        registry.load("sbert", partial(load_sbert, app.state)),
+        registry.load("kobart", partial(load_kobart, app.state)),
+    )
+    app.state.models_loaded = registry.all_ready
+    if registry.all_ready:
+        logger.info("All models loaded successfully")
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
-    logger.info("Loading KR-SBERT model: %s", SBERT_MODEL_NAME)
-    app.state.sbert_model = SentenceTransformer(SBERT_MODEL_NAME)
-
-    logger.info("Loading KoBART model: %s", KOBART_MODEL_NAME)
-    app.state.kobart_tokenizer = AutoTokenizer.from_pretrained(KOBART_MODEL_NAME)
-    app.state.kobart_model = AutoModelForSeq2SeqLM.from_pretrained(KOBART_MODEL_NAME)
+    app.state.models_loaded = False
+    app.state.model_registry = ModelRegistry(["sbert", "kobart"])
+    app.state.inference_executor = InferenceExecutor()
+    app.state.result_cache = ResultCache()
 
     app.state.clustering_service = ClusteringService()
+    # Sends results queued in the outbox, including any left by the last run
     app.state.callback_service = CallbackService()
+    app.state.callback_service.start()
 
     # Phase 2: New services
-    app.state.classifier_service = ClassifierService(app.state.sbert_model)
     app.state.entity_extractor = EntityExtractor()
     app.state.todo_extractor = TodoExtractor()
 
@@ -48,16 +175,41 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     app.state.project_matcher = ProjectMatcher()
     app.state.status_detector = StatusDetector()
 
-    app.state.models_loaded = True
+    # Entity, todo, status and keyword rules share one set of text scans
+    app.state.text_analyzer = TextAnalyzer(
+        app.state.entity_extractor,
+        app.state.todo_extractor,
+        app.state.status_detector,
+    )
 
-    logger.info("All models loaded successfully")
+    # YAKE and the text rules, optionally in worker processes (TEXT_POOL_WORKERS)
+    app.state.text_pool = TextPool(
+        KeywordService(cache=app.state.result_cache),
+        app.state.text_analyzer,
+    )
+    # Corpus-aware alternative to YAKE, selected per request with engine="tfidf"
+    app.state.tfidf_tagger = TfidfTagger()
 
-    app.state.scheduler = start_scheduler(app.state)
+    # Bind immediately; models load in parallel in the background
+    loading_task = asyncio.create_task(_load_models(app))
+
+    # With several workers only one of them runs the periodic jobs
+    app.state.scheduler = None
+    if os.environ.get("AI_SCHEDULER_ENABLED", "1") == "1":
+        app.state.scheduler = start_scheduler(app.state)
 
     yield
 
-    app.state.scheduler.shutdown(wait=False)
+    if app.state.scheduler is not None:
+        app.state.scheduler.shutdown(wait=False)
+    loading_task.cancel()
+    batcher: EmbeddingBatcher | None = getattr(app.state, "embedding_batcher", None)
+    if batcher is not None:
+        await batcher.close()
+    app.state.inference_executor.shutdown()
+    app.state.text_pool.shutdown()
     await app.state.callback_service.close()
+    app.state.result_cache.close()
     logger.info("Shutdown complete")
 
 
@@ -75,6 +227,19 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+
+@app.exception_handler(InferenceQueueFull)
+async def inference_queue_full_handler(
+    request: Request,
+    exc: InferenceQueueFull,
+) -> JSONResponse:
+    return JSONResponse(
+        status_code=503,
+        content={"detail": str(exc)},
+        headers={"Retry-After": "1"},
+    )
+
+
 app.include_router(process.router)
 app.include_router(embed.router)
 app.include_router(tag.router)
@@ -87,4 +252,41 @@ app.include_router(project.router)
 @app.get("/")
 async def health_check() -> dict:
     models_loaded = getattr(app.state, "models_loaded", False)
-    return {"status": "ok", "models_loaded": models_loaded}
+    registry: ModelRegistry | None = getattr(app.state, "model_registry", None)
+    executor: InferenceExecutor | None = getattr(app.state, "inference_executor", None)
+    cache: ResultCache | None = getattr(app.state, "result_cache", None)
+    callbacks: CallbackService | None = getattr(app.state, "callback_service", None)
+    return {
+        "status": "ok",
+        "models_loaded": models_loaded,
+        "models": registry.status() if registry is not None else None,
+        "inference": executor.stats() if executor is not None else None,
+        "result_cache": cache.stats() if cache is not None else None,
+        "callbacks": callbacks.stats() if callbacks is not None else None,
+    }
+
+
+@app.get("/health/live")
+async def liveness() -> dict:
+    return {"status": "ok"}
+
+
+@app.get("/health/ready")
+async def readiness(response: Response) -> dict:
+    registry: ModelRegistry = app.state.model_registry
+    if not registry.all_ready:
+        response.status_code = 503
+    return {"ready": registry.all_ready, "models": registry.status()}
+
+
+@app.get("/health/ready/{model_name}")
+async def model_readiness(model_name: str, response: Response) -> dict:
+    registry: ModelRegistry = app.state.model_registry
+    models = registry.status()
+    if model_name not in models:
+        response.status_code = 404
+        return {"ready": False, "error": f"Unknown model: {model_name}"}
+    ready = registry.is_ready(model_name)
+    if not ready:
+        response.status_code = 503
+    return {"ready": ready, **models[model_name]}
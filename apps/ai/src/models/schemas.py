@@ -1,22 +1,41 @@
 from __future__ import annotations
 
-from typing import Literal
+from typing import Annotated, Any, Literal
 
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, PlainValidator
+from pydantic.alias_generators import to_camel
 
 
-class TagResult(BaseModel):
+def _opaque_vector(value: Any) -> list[float]:
+    if not isinstance(value, list):
+        raise ValueError("expected an array of numbers")
+    return value
+
+
+# Embedding vectors are checked as arrays, not element by element: hundreds
+# of floats per page make per-element validation a large share of request
+# CPU. Consumers convert them with numpy, which rejects non-numbers.
+Vector = Annotated[list[float], PlainValidator(_opaque_vector)]
+
+
+class _CallbackModel(BaseModel):
+    """Serialized with camelCase keys for the web app's callback endpoint."""
+
+    model_config = ConfigDict(alias_generator=to_camel, populate_by_name=True)
+
+
+class TagResult(_CallbackModel):
     name: str
     score: float
 
 
-class EntityResult(BaseModel):
+class EntityResult(_CallbackModel):
     type: Literal["person", "date", "url", "project", "deadline"]
     value: str
     metadata: dict | None = None
 
 
-class TodoResult(BaseModel):
+class TodoResult(_CallbackModel):
     title: str
     priority: Literal["low", "medium", "high", "urgent"] = "medium"
     due_date: str | None = None
@@ -28,18 +47,30 @@ NoteType = Literal[
 ]
 
 
-class StatusSignal(BaseModel):
+# "yake" scores each text on its own; "tfidf" weighs terms against the
+# workspace's document frequencies and is much faster
+TagEngine = Literal["yake", "tfidf"]
+
+
+# Wire encoding of embeddings: JSON float lists, or base64 of the packed
+# little-endian float32 / float16 bytes (about 4x / 8x smaller than the JSON)
+VectorEncoding = Literal["json", "f32", "f16"]
+
+
+class StatusSignal(_CallbackModel):
     signal: Literal["done", "in_progress", "blocked"]
     keyword: str
     context: str
 
 
-class AIProcessingResult(BaseModel):
+class AIProcessingResult(_CallbackModel):
     page_id: str
     note_type: NoteType
     tags: list[TagResult]
     summary: str
-    embedding: list[float]
+    # Packed into a base64 string when the callback asks for it
+    embedding: Vector | str
+    embedding_encoding: VectorEncoding = "json"
     cluster_id: int | None = None
     entities: list[EntityResult] = []
     todos: list[TodoResult] = []
@@ -0,0 +1,48 @@
+"""JSON through pydantic-core for endpoints that move large payloads.
+
+FastAPI parses request bodies with the stdlib ``json`` module before
+validating them, which for a few hundred embeddings is most of the
+request's CPU; pydantic-core parses and validates in one pass several
+times faster. On the way out, returning an encoded ``Response`` skips
+FastAPI re-validating a model the endpoint just built.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Awaitable, Callable
+from typing import TypeVar
+
+from fastapi import Request, Response
+from fastapi.exceptions import RequestValidationError
+from pydantic import BaseModel, ValidationError
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+
+def json_body(model: type[ModelT]) -> Callable[[Request], Awaitable[ModelT]]:
+    """FastAPI dependency parsing the raw request body straight into ``model``.
+
+    Invalid bodies answer 422 like FastAPI's own validation. The body isn't
+    described in the OpenAPI schema, so keep ``model`` in the endpoint's
+    docstring.
+    """
+
+    async def dependency(request: Request) -> ModelT:
+        try:
+            return model.model_validate_json(await request.body())
+        except ValidationError as exc:
+            errors = exc.errors(include_url=False)
+            for error in errors:
+                error["loc"] = ("body", *error["loc"])
+            raise RequestValidationError(errors) from None
+
+    return dependency
+
+
+def json_response(model: BaseModel, status_code: int = 200) -> Response:
+    """``model`` encoded by pydantic-core, with aliases like FastAPI's encoder."""
+    return Response(
+        content=model.model_dump_json(by_alias=True),
+        status_code=status_code,
+        media_type="application/json",
+    )
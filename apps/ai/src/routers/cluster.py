@@ -1,14 +1,18 @@
-from fastapi import APIRouter, Request
+import numpy as np
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from pydantic import BaseModel
 
+from src.models.schemas import Vector
+from src.models.serialization import json_body, json_response
 from src.services.clustering import ClusteringService
+from src.services.inference import InferenceExecutor
 
 router = APIRouter()
 
 
 class EmbeddingItem(BaseModel):
     page_id: str
-    vector: list[float]
+    vector: Vector
 
 
 class ClusterRequest(BaseModel):
@@ -27,19 +31,36 @@ class ClusterResponse(BaseModel):
 
 @router.post("/cluster", response_model=ClusterResponse)
 async def cluster_endpoint(
-    body: ClusterRequest,
     request: Request,
-) -> ClusterResponse:
+    body: ClusterRequest = Depends(json_body(ClusterRequest)),
+) -> Response:
+    """Cluster a ``ClusterRequest`` of page embeddings from scratch."""
     service: ClusteringService = request.app.state.clustering_service
+    executor: InferenceExecutor = request.app.state.inference_executor
 
-    items = [(e.page_id, e.vector) for e in body.embeddings]
-    result = service.cluster(items)
+    page_ids = [e.page_id for e in body.embeddings]
+    try:
+        with np.errstate(over="ignore"):
+            matrix = np.array([e.vector for e in body.embeddings], dtype=np.float32)
+    except (TypeError, ValueError):
+        matrix = None
+    # Vectors are opaque to validation, so a null element only shows up
+    # here, as NaN after the float32 conversion
+    if (
+        matrix is None
+        or (body.embeddings and matrix.ndim != 2)
+        or not np.isfinite(matrix).all()
+    ):
+        raise HTTPException(
+            status_code=422,
+            detail="Vectors must be equal-length arrays of finite numbers",
+        )
 
-    clusterer = result.pop("_clusterer", None)
-    if clusterer is not None:
-        service._last_clusterer = clusterer
+    result = await executor.run(service.cluster_matrix, page_ids, matrix, wait=False)
 
-    return ClusterResponse(
+    result.pop("_mode", None)
+
+    return json_response(ClusterResponse(
         clusters=[ClusterGroup(**c) for c in result["clusters"]],
         noise=result["noise"],
-    )
+    ))
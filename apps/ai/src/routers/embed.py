@@ -1,9 +1,15 @@
-from fastapi import APIRouter, Request
+from fastapi import APIRouter, Depends, Request, Response
 from pydantic import BaseModel
 
+from src.models.schemas import Vector, VectorEncoding
+from src.models.serialization import json_response
+from src.services.batcher import EmbeddingBatcher
 from src.services.embedding import EmbeddingService
+from src.services.inference import InferenceExecutor
+from src.services.model_registry import require_models
+from src.services.vector_codec import encode_vector
 
-router = APIRouter()
+router = APIRouter(dependencies=[Depends(require_models("sbert"))])
 
 
 class EmbedRequest(BaseModel):
@@ -11,11 +17,65 @@ class EmbedRequest(BaseModel):
 
 
 class EmbedResponse(BaseModel):
-    vector: list[float]
+    vector: Vector
+    encoding: VectorEncoding = "json"
 
 
-@router.post("/embed", response_model=EmbedResponse)
-async def embed_endpoint(body: EmbedRequest, request: Request) -> EmbedResponse:
-    service = EmbeddingService(request.app.state.sbert_model)
-    vector = service.encode(body.text)
-    return EmbedResponse(vector=vector)
+# With ?encoding=f32|f16 vectors come back as base64 packed little-endian
+# floats. A separate model rather than a union field: serializing a union
+# type-checks every element first.
+class PackedEmbedResponse(BaseModel):
+    vector: str
+    encoding: VectorEncoding
+
+
+class EmbedBatchRequest(BaseModel):
+    texts: list[str]
+
+
+class EmbedBatchResponse(BaseModel):
+    vectors: list[Vector]
+    encoding: VectorEncoding = "json"
+
+
+class PackedEmbedBatchResponse(BaseModel):
+    vectors: list[str]
+    encoding: VectorEncoding
+
+
+@router.post("/embed", response_model=EmbedResponse | PackedEmbedResponse)
+async def embed_endpoint(
+    body: EmbedRequest,
+    request: Request,
+    encoding: VectorEncoding = "json",
+) -> Response:
+    executor: InferenceExecutor = request.app.state.inference_executor
+    executor.ensure_capacity()
+
+    batcher: EmbeddingBatcher = request.app.state.embedding_batcher
+    vector = await batcher.encode(body.text)
+    if encoding == "json":
+        return json_response(EmbedResponse(vector=vector))
+    return json_response(
+        PackedEmbedResponse(vector=encode_vector(vector, encoding), encoding=encoding)
+    )
+
+
+@router.post("/embed/batch", response_model=EmbedBatchResponse | PackedEmbedBatchResponse)
+async def embed_batch_endpoint(
+    body: EmbedBatchRequest,
+    request: Request,
+    encoding: VectorEncoding = "json",
+) -> Response:
+    executor: InferenceExecutor = request.app.state.inference_executor
+    service: EmbeddingService = request.app.state.embedding_service
+
+    vectors: list[list[float]] = []
+    if body.texts:
+        vectors = await executor.run(service.encode_batch, body.texts, wait=False)
+    if encoding == "json":
+        return json_response(EmbedBatchResponse(vectors=vectors))
+    return json_response(PackedEmbedBatchResponse(
+        vectors=[encode_vector(v, encoding) for v in vectors],
+        encoding=encoding,
+    ))
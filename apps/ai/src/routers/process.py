@@ -1,29 +1,42 @@
+import asyncio
 import logging
+import os
 
-from fastapi import APIRouter, BackgroundTasks, Request
+from fastapi import APIRouter, BackgroundTasks, Depends, Request
 from pydantic import BaseModel
 
-from src.models.schemas import AIProcessingResult
+from src.models.schemas import AIProcessingResult, TagEngine, VectorEncoding
+from src.services.batcher import EmbeddingBatcher
 from src.services.callback import CallbackService
 from src.services.classifier import ClassifierService
-from src.services.clustering import ClusteringService
+from src.services.clustering import NOISE, ClusteringService
 from src.services.embedding import EmbeddingService
-from src.services.entity_extractor import EntityExtractor
-from src.services.keyword import KeywordService
+from src.services.inference import InferenceExecutor
+from src.services.model_registry import require_models
 from src.services.project_matcher import ProjectMatcher
-from src.services.status_detector import StatusDetector
 from src.services.summarizer import SummarizerService
-from src.services.todo_extractor import TodoExtractor
+from src.services.text_analyzer import TextAnalysis
+from src.services.text_pool import TextPool
+from src.services.tfidf_tagger import TfidfTagger
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter()
+router = APIRouter(dependencies=[Depends(require_models("sbert", "kobart"))])
+
+# Summary tier for /process, and the inference queue depth at which pages
+# fall back to the fast tier to keep up with bursts
+PROCESS_SUMMARY_TIER = os.environ.get("PROCESS_SUMMARY_TIER", "full")
+PROCESS_BURST_QUEUE_DEPTH = int(os.environ.get("PROCESS_BURST_QUEUE_DEPTH", "8"))
 
 
 class ProcessRequest(BaseModel):
     page_id: str
     plain_text: str
     callback_url: str
+    tag_engine: TagEngine = "yake"
+    # Opt-in compact callbacks, for web apps that decode them
+    embedding_encoding: VectorEncoding = "json"
+    callback_gzip: bool = False
 
 
 class ProcessResponse(BaseModel):
@@ -31,79 +44,283 @@ class ProcessResponse(BaseModel):
     page_id: str
 
 
+class ProcessBatchItem(BaseModel):
+    page_id: str
+    plain_text: str
+
+
+class ProcessBatchRequest(BaseModel):
+    items: list[ProcessBatchItem]
+    callback_url: str
+    tag_engine: TagEngine = "yake"
+    embedding_encoding: VectorEncoding = "json"
+    callback_gzip: bool = False
+
+
+class ProcessBatchResponse(BaseModel):
+    status: str
+    page_ids: list[str]
+
+
+async def _assign_cluster(
+    clustering_service: ClusteringService,
+    inference_executor: InferenceExecutor,
+    page_id: str,
+    vector: list[float],
+) -> int | None:
+    # Also marks the page dirty for the next incremental recluster
+    cluster_id = await inference_executor.run(
+        clustering_service.assign, page_id, vector
+    )
+    return None if cluster_id == NOISE else cluster_id
+
+
+def _build_result(
+    page_id: str,
+    vector: list[float],
+    tags: list[dict],
+    summary: str,
+    cluster_id: int | None,
+    classification: tuple[str, float],
+    analysis: TextAnalysis,
+) -> AIProcessingResult:
+    note_type, confidence = classification
+
+    # Validate with Pydantic schema
+    return AIProcessingResult(
+        page_id=page_id,
+        note_type=note_type,
+        tags=[{"name": t["name"], "score": t["score"]} for t in tags],
+        summary=summary,
+        embedding=vector,
+        cluster_id=cluster_id,
+        entities=analysis.entities,
+        todos=analysis.todos,
+        confidence=confidence,
+        status_signals=analysis.status_signals,
+    )
+
+
+async def _tag_pages(
+    text_pool: TextPool,
+    tfidf_tagger: TfidfTagger,
+    tag_engine: TagEngine,
+    page_ids: list[str],
+    texts: list[str],
+) -> list[list[dict] | BaseException]:
+    # Every page feeds the workspace document frequencies, whichever engine
+    # tags it; the tfidf engine scores the whole batch in one pass. Failures
+    # come back per page, like the YAKE path's gather.
+    if tag_engine == "tfidf":
+        try:
+            return tfidf_tagger.extract_many(texts, doc_ids=page_ids)
+        except Exception as exc:
+            return [exc] * len(texts)
+    tfidf_tagger.observe_many(texts, doc_ids=page_ids)
+    return await asyncio.gather(
+        *(text_pool.extract_keywords(text) for text in texts),
+        return_exceptions=True,
+    )
+
+
+def _summary_tier(inference_executor: InferenceExecutor) -> str:
+    if inference_executor.depth >= PROCESS_BURST_QUEUE_DEPTH:
+        return "fast"
+    return PROCESS_SUMMARY_TIER
+
+
 async def process_page(
     page_id: str,
     plain_text: str,
     callback_url: str,
-    embedding_service: EmbeddingService,
-    keyword_service: KeywordService,
+    embedding_batcher: EmbeddingBatcher,
+    text_pool: TextPool,
+    tfidf_tagger: TfidfTagger,
     summarizer_service: SummarizerService,
     clustering_service: ClusteringService,
     classifier_service: ClassifierService,
-    entity_extractor: EntityExtractor,
-    todo_extractor: TodoExtractor,
     project_matcher: ProjectMatcher,
-    status_detector: StatusDetector,
     callback_service: CallbackService,
+    inference_executor: InferenceExecutor,
+    tag_engine: TagEngine = "yake",
+    embedding_encoding: VectorEncoding = "json",
+    callback_gzip: bool = False,
 ) -> None:
     try:
-        # Core processing
-        vector = embedding_service.encode(plain_text)
-        tags = keyword_service.extract(plain_text)
-        summary = summarizer_service.summarize(plain_text)
-
-        # Cluster assignment
-        cluster_id: int | None = None
-        clusterer = getattr(clustering_service, "_last_clusterer", None)
-        if clusterer is not None:
-            cluster_id = clustering_service.approximate_predict(clusterer, vector)
-            if cluster_id == -1:
-                cluster_id = None
-
-        # Phase 2: Note type classification
-        note_type, confidence = classifier_service.classify(
-            plain_text, embedding=vector
+        # Tags plus entities, todos, status signals and note type keywords;
+        # with a text pool these run in worker processes alongside inference
+        text_stages = asyncio.gather(
+            _tag_pages(text_pool, tfidf_tagger, tag_engine, [page_id], [plain_text]),
+            text_pool.analyze(plain_text),
         )
+        try:
+            # Core processing
+            vector = await embedding_batcher.encode(plain_text)
+            summary = await inference_executor.run(
+                summarizer_service.summarize,
+                plain_text,
+                tier=_summary_tier(inference_executor),
+            )
 
-        # Phase 2: Entity extraction
-        entities = entity_extractor.extract(plain_text)
-
-        # Phase 2: Todo extraction
-        todos = todo_extractor.extract(plain_text)
-
-        # Phase 4: Status detection
-        status_signals = status_detector.detect(plain_text)
-
-        # Validate with Pydantic schema
-        result = AIProcessingResult(
-            page_id=page_id,
-            note_type=note_type,
-            tags=[{"name": t["name"], "score": t["score"]} for t in tags],
-            summary=summary,
-            embedding=vector,
-            cluster_id=cluster_id,
-            entities=entities,
-            todos=todos,
-            confidence=confidence,
-            status_signals=status_signals,
+            # Cluster assignment
+            cluster_id = await _assign_cluster(
+                clustering_service, inference_executor, page_id, vector
+            )
+        except BaseException:
+            text_stages.cancel()
+            raise
+
+        (tags,), analysis = await text_stages
+        if isinstance(tags, BaseException):
+            raise tags
+
+        # Phase 2: Note type classification; off the loop, as it reads the cache
+        (classification,) = await inference_executor.run(
+            classifier_service.classify_many,
+            [plain_text],
+            [vector],
+            keyword_counts=[analysis.keyword_counts],
+        )
+
+        result = _build_result(
+            page_id,
+            vector,
+            tags,
+            summary,
+            cluster_id,
+            classification,
+            analysis,
         )
 
         await callback_service.send_ai_results(
             callback_url=callback_url,
             result=result,
+            embedding_encoding=embedding_encoding,
+            compress=callback_gzip,
         )
         logger.info(
             "Processed page %s: type=%s, entities=%d, todos=%d, signals=%d",
             page_id,
-            note_type,
-            len(entities),
-            len(todos),
-            len(status_signals),
+            result.note_type,
+            len(result.entities),
+            len(result.todos),
+            len(result.status_signals),
         )
     except Exception:
         logger.exception("Failed to process page %s", page_id)
 
 
+async def process_pages(
+    items: list[ProcessBatchItem],
+    callback_url: str,
+    embedding_service: EmbeddingService,
+    text_pool: TextPool,
+    tfidf_tagger: TfidfTagger,
+    summarizer_service: SummarizerService,
+    clustering_service: ClusteringService,
+    classifier_service: ClassifierService,
+    callback_service: CallbackService,
+    inference_executor: InferenceExecutor,
+    tag_engine: TagEngine = "yake",
+    embedding_encoding: VectorEncoding = "json",
+    callback_gzip: bool = False,
+) -> None:
+    # Text stages for every page overlap with the batched inference below
+    tag_stage = asyncio.ensure_future(_tag_pages(
+        text_pool,
+        tfidf_tagger,
+        tag_engine,
+        [item.page_id for item in items],
+        [item.plain_text for item in items],
+    ))
+    analysis_stage = asyncio.gather(
+        *(text_pool.analyze(item.plain_text) for item in items),
+        return_exceptions=True,
+    )
+
+    try:
+        # One forward pass for the whole batch
+        vectors = await inference_executor.run(
+            embedding_service.encode_batch,
+            [item.plain_text for item in items],
+        )
+    except Exception:
+        logger.exception("Failed to embed batch of %d pages", len(items))
+        tag_stage.cancel()
+        analysis_stage.cancel()
+        return
+
+    try:
+        summaries = await inference_executor.run(
+            summarizer_service.summarize_many,
+            [item.plain_text for item in items],
+            tier=_summary_tier(inference_executor),
+        )
+    except Exception:
+        logger.exception("Failed to summarize batch of %d pages", len(items))
+        tag_stage.cancel()
+        analysis_stage.cancel()
+        return
+
+    # Per-page failures come back as exceptions and fail just that page below
+    all_tags = await tag_stage
+    analyses = await analysis_stage
+
+    # Phase 2: Note type classification, one matmul for the batch
+    classifications = await inference_executor.run(
+        classifier_service.classify_many,
+        [item.plain_text for item in items],
+        vectors,
+        keyword_counts=[
+            TextAnalysis().keyword_counts
+            if isinstance(analysis, Exception)
+            else analysis.keyword_counts
+            for analysis in analyses
+        ],
+    )
+
+    # One vectorized cluster assignment for the batch
+    try:
+        cluster_labels, _ = await inference_executor.run(
+            clustering_service.assign_batch, [item.page_id for item in items], vectors
+        )
+    except Exception:
+        logger.exception("Failed to assign clusters for batch of %d pages", len(items))
+        cluster_labels = [NOISE] * len(items)
+
+    processed = 0
+    for item, vector, summary, classification, analysis, tags, label in zip(
+        items, vectors, summaries, classifications, analyses, all_tags, cluster_labels
+    ):
+        try:
+            for stage_result in (tags, analysis):
+                if isinstance(stage_result, Exception):
+                    raise stage_result
+            cluster_id = None if label == NOISE else int(label)
+
+            result = _build_result(
+                item.page_id,
+                vector,
+                tags,
+                summary,
+                cluster_id,
+                classification,
+                analysis,
+            )
+
+            await callback_service.send_ai_results(
+                callback_url=callback_url,
+                result=result,
+                embedding_encoding=embedding_encoding,
+                compress=callback_gzip,
+            )
+            processed += 1
+        except Exception:
+            logger.exception("Failed to process page %s", item.page_id)
+
+    logger.info("Processed batch: %d/%d pages", processed, len(items))
+
+
 @router.post("/process", response_model=ProcessResponse, status_code=202)
 async def process_endpoint(
     body: ProcessRequest,
@@ -111,16 +328,15 @@ async def process_endpoint(
     request: Request,
 ) -> ProcessResponse:
     state = request.app.state
+    inference_executor: InferenceExecutor = state.inference_executor
+    inference_executor.ensure_capacity()
 
-    embedding_service = EmbeddingService(state.sbert_model)
-    keyword_service = KeywordService()
-    summarizer_service = SummarizerService(state.kobart_tokenizer, state.kobart_model)
+    embedding_batcher = state.embedding_batcher
+    text_pool = state.text_pool
+    summarizer_service = state.summarizer_service
     clustering_service = state.clustering_service
     classifier_service = state.classifier_service
-    entity_extractor = state.entity_extractor
-    todo_extractor = state.todo_extractor
     project_matcher = state.project_matcher
-    status_detector = state.status_detector
     callback_service = state.callback_service
 
     background_tasks.add_task(
@@ -128,16 +344,52 @@ async def process_endpoint(
         page_id=body.page_id,
         plain_text=body.plain_text,
         callback_url=body.callback_url,
-        embedding_service=embedding_service,
-        keyword_service=keyword_service,
+        embedding_batcher=embedding_batcher,
+        text_pool=text_pool,
+        tfidf_tagger=state.tfidf_tagger,
         summarizer_service=summarizer_service,
         clustering_service=clustering_service,
         classifier_service=classifier_service,
-        entity_extractor=entity_extractor,
-        todo_extractor=todo_extractor,
         project_matcher=project_matcher,
-        status_detector=status_detector,
         callback_service=callback_service,
+        inference_executor=inference_executor,
+        tag_engine=body.tag_engine,
+        embedding_encoding=body.embedding_encoding,
+        callback_gzip=body.callback_gzip,
     )
 
     return ProcessResponse(status="accepted", page_id=body.page_id)
+
+
+@router.post("/process/batch", response_model=ProcessBatchResponse, status_code=202)
+async def process_batch_endpoint(
+    body: ProcessBatchRequest,
+    background_tasks: BackgroundTasks,
+    request: Request,
+) -> ProcessBatchResponse:
+    state = request.app.state
+    inference_executor: InferenceExecutor = state.inference_executor
+    inference_executor.ensure_capacity()
+
+    if body.items:
+        background_tasks.add_task(
+            process_pages,
+            items=body.items,
+            callback_url=body.callback_url,
+            embedding_service=state.embedding_service,
+            text_pool=state.text_pool,
+            tfidf_tagger=state.tfidf_tagger,
+            summarizer_service=state.summarizer_service,
+            clustering_service=state.clustering_service,
+            classifier_service=state.classifier_service,
+            callback_service=state.callback_service,
+            inference_executor=inference_executor,
+            tag_engine=body.tag_engine,
+            embedding_encoding=body.embedding_encoding,
+            callback_gzip=body.callback_gzip,
+        )
+
+    return ProcessBatchResponse(
+        status="accepted",
+        page_ids=[item.page_id for item in body.items],
+    )
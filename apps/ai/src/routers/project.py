@@ -1,15 +1,17 @@
 import logging
 import os
 
-from fastapi import APIRouter, BackgroundTasks, Request
+from fastapi import APIRouter, BackgroundTasks, Depends, Request
 from pydantic import BaseModel
 
 from src.services.callback import CallbackService
+from src.services.inference import InferenceExecutor
+from src.services.model_registry import require_models
 from src.services.summarizer import SummarizerService
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter()
+router = APIRouter(dependencies=[Depends(require_models("kobart"))])
 
 WEB_CALLBACK_URL = os.environ.get("WEB_CALLBACK_URL", "http://localhost:3000/api")
 
@@ -54,9 +56,11 @@ async def analyze_project(
     pages_data: list[PageInput],
     summarizer_service: SummarizerService,
     callback_service: CallbackService,
+    inference_executor: InferenceExecutor,
 ) -> None:
     try:
-        milestone_updates = []
+        progresses: list[int] = []
+        milestone_texts: list[str] = []
 
         for ms in milestones_data:
             ms_pages = [p for p in pages_data if p.milestone_id == ms.id]
@@ -71,17 +75,30 @@ async def analyze_project(
                 ratio = pages_with_content / len(ms_pages) if ms_pages else 0
                 ai_progress = min(int(ratio * 80), 95)
 
-            # Summarize milestone pages
-            ms_text = " ".join(p.content for p in ms_pages if p.content.strip())
-            ai_summary = ""
-            if ms_text.strip():
-                ai_summary = summarizer_service.summarize(ms_text, max_length=128)
+            progresses.append(ai_progress)
+            milestone_texts.append(
+                " ".join(p.content for p in ms_pages if p.content.strip())
+            )
 
-            milestone_updates.append(MilestoneUpdate(
+        # Summarize every milestone plus the whole project in one batched pass
+        all_text = f"{project_name}. " + " ".join(p.content for p in pages_data if p.content.strip())
+        summaries = await inference_executor.run(
+            summarizer_service.summarize_many,
+            milestone_texts + [all_text],
+            [128] * len(milestone_texts) + [256],
+        )
+        overall_summary = summaries.pop()
+
+        milestone_updates = [
+            MilestoneUpdate(
                 milestoneId=ms.id,
                 aiProgress=ai_progress,
                 aiSummary=ai_summary,
-            ))
+            )
+            for ms, ai_progress, ai_summary in zip(
+                milestones_data, progresses, summaries
+            )
+        ]
 
         # Overall progress: average of milestone progresses
         if milestone_updates:
@@ -89,12 +106,6 @@ async def analyze_project(
         else:
             overall_progress = 0
 
-        # Overall summary
-        all_text = f"{project_name}. " + " ".join(p.content for p in pages_data if p.content.strip())
-        overall_summary = ""
-        if all_text.strip():
-            overall_summary = summarizer_service.summarize(all_text, max_length=256)
-
         payload = {
             "projectId": project_id,
             "overallProgress": overall_progress,
@@ -102,8 +113,9 @@ async def analyze_project(
             "milestoneUpdates": [m.model_dump() for m in milestone_updates],
         }
 
-        await callback_service._post(callback_url, payload)
-        logger.info("Project analysis complete for %s", project_id)
+        # Queued in the outbox; delivery happens in the background
+        if await callback_service.send_project_analysis(callback_url, payload):
+            logger.info("Project analysis for %s queued for delivery", project_id)
     except Exception:
         logger.exception("Failed to analyze project %s", project_id)
 
@@ -116,7 +128,7 @@ async def project_analyze_endpoint(
 ) -> ProjectAnalyzeResponse:
     state = request.app.state
 
-    summarizer_service = SummarizerService(state.kobart_tokenizer, state.kobart_model)
+    summarizer_service: SummarizerService = state.summarizer_service
     callback_service = state.callback_service
 
     background_tasks.add_task(
@@ -128,6 +140,7 @@ async def project_analyze_endpoint(
         pages_data=body.pages,
         summarizer_service=summarizer_service,
         callback_service=callback_service,
+        inference_executor=state.inference_executor,
     )
 
     return ProjectAnalyzeResponse(status="accepted", project_id=body.project_id)
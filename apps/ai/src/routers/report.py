@@ -1,14 +1,19 @@
 import logging
 
-from fastapi import APIRouter, BackgroundTasks, Request
+from fastapi import APIRouter, BackgroundTasks, Depends, Request
 from pydantic import BaseModel
 
 from src.services.callback import CallbackService
+from src.services.inference import InferenceExecutor
+from src.services.model_registry import require_models
 from src.services.summarizer import SummarizerService
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter(prefix="/report")
+router = APIRouter(
+    prefix="/report",
+    dependencies=[Depends(require_models("kobart"))],
+)
 
 
 class ChangeItem(BaseModel):
@@ -38,6 +43,7 @@ async def generate_report(
     callback_url: str,
     summarizer_service: SummarizerService,
     callback_service: CallbackService,
+    inference_executor: InferenceExecutor,
 ) -> None:
     try:
         change_lines = []
@@ -48,8 +54,8 @@ async def generate_report(
         combined_text = "\n".join(change_lines)
 
         if combined_text.strip():
-            report_summary = summarizer_service.summarize(
-                combined_text, max_length=256
+            report_summary = await inference_executor.run(
+                summarizer_service.summarize, combined_text, max_length=256
             )
         else:
             report_summary = "변경 사항이 없습니다."
@@ -63,12 +69,14 @@ async def generate_report(
             "changes": [c.model_dump() for c in changes],
         }
 
-        await callback_service.send_report(callback_url, report_data)
+        # True once queued in the outbox, not once the web app has it
+        queued = await callback_service.send_report(callback_url, report_data)
         logger.info(
-            "Generated %s report for %s ~ %s",
+            "Generated %s report for %s ~ %s (%s)",
             report_type,
             period_start,
             period_end,
+            "queued for delivery" if queued else "not queued",
         )
     except Exception:
         logger.exception("Failed to generate %s report", report_type)
@@ -81,7 +89,7 @@ async def generate_report_endpoint(
     request: Request,
 ) -> ReportResponse:
     state = request.app.state
-    summarizer_service = SummarizerService(state.kobart_tokenizer, state.kobart_model)
+    summarizer_service: SummarizerService = state.summarizer_service
     callback_service = state.callback_service
 
     background_tasks.add_task(
@@ -93,6 +101,7 @@ async def generate_report_endpoint(
         callback_url=body.callback_url,
         summarizer_service=summarizer_service,
         callback_service=callback_service,
+        inference_executor=state.inference_executor,
     )
 
     return ReportResponse(status="accepted")
@@ -1,14 +1,19 @@
-from fastapi import APIRouter, Request
+from typing import Literal
+
+from fastapi import APIRouter, Depends, Request
 from pydantic import BaseModel
 
+from src.services.inference import InferenceExecutor
+from src.services.model_registry import require_models
 from src.services.summarizer import SummarizerService
 
-router = APIRouter()
+router = APIRouter(dependencies=[Depends(require_models("kobart"))])
 
 
 class SummarizeRequest(BaseModel):
     text: str
     max_length: int = 128
+    tier: Literal["fast", "balanced", "full"] = "full"
 
 
 class SummarizeResponse(BaseModel):
@@ -21,6 +26,13 @@ async def summarize_endpoint(
     request: Request,
 ) -> SummarizeResponse:
     state = request.app.state
-    service = SummarizerService(state.kobart_tokenizer, state.kobart_model)
-    summary = service.summarize(body.text, max_length=body.max_length)
+    executor: InferenceExecutor = state.inference_executor
+    service: SummarizerService = state.summarizer_service
+    summary = await executor.run(
+        service.summarize,
+        body.text,
+        max_length=body.max_length,
+        tier=body.tier,
+        wait=False,
+    )
     return SummarizeResponse(summary=summary)
@@ -1,7 +1,9 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Request
 from pydantic import BaseModel
 
-from src.services.keyword import KeywordService
+from src.models.schemas import TagEngine
+from src.services.text_pool import TextPool
+from src.services.tfidf_tagger import TfidfTagger
 
 router = APIRouter()
 
@@ -9,6 +11,7 @@ router = APIRouter()
 class TagRequest(BaseModel):
     text: str
     top_n: int = 10
+    engine: TagEngine = "yake"
 
 
 class TagItem(BaseModel):
@@ -20,8 +23,35 @@ class TagResponse(BaseModel):
     tags: list[TagItem]
 
 
+class TagBatchRequest(BaseModel):
+    texts: list[str]
+    top_n: int = 10
+    engine: TagEngine = "yake"
+
+
+class TagBatchResponse(BaseModel):
+    results: list[TagResponse]
+
+
 @router.post("/tag", response_model=TagResponse)
-async def tag_endpoint(body: TagRequest) -> TagResponse:
-    service = KeywordService()
-    tags = service.extract(body.text, top_n=body.top_n)
+async def tag_endpoint(body: TagRequest, request: Request) -> TagResponse:
+    if body.engine == "tfidf":
+        tfidf_tagger: TfidfTagger = request.app.state.tfidf_tagger
+        tags = tfidf_tagger.extract_many([body.text], top_n=body.top_n)[0]
+    else:
+        text_pool: TextPool = request.app.state.text_pool
+        tags = await text_pool.extract_keywords(body.text, top_n=body.top_n)
     return TagResponse(tags=[TagItem(**t) for t in tags])
+
+
+@router.post("/tag/batch", response_model=TagBatchResponse)
+async def tag_batch_endpoint(body: TagBatchRequest, request: Request) -> TagBatchResponse:
+    if body.engine == "tfidf":
+        tfidf_tagger: TfidfTagger = request.app.state.tfidf_tagger
+        batches = tfidf_tagger.extract_many(body.texts, top_n=body.top_n)
+    else:
+        text_pool: TextPool = request.app.state.text_pool
+        batches = await text_pool.extract_keywords_many(body.texts, top_n=body.top_n)
+    return TagBatchResponse(
+        results=[TagResponse(tags=[TagItem(**t) for t in tags]) for tags in batches]
+    )
@@ -0,0 +1,169 @@
+"""Server entry point: ``python -m src.serve``.
+
+With ``AI_WORKERS=1`` (default) this is plain uvicorn. With more workers the
+master process loads the model weights once, binds the listening socket and
+forks the workers, so every worker shares one read-only copy of the weights
+instead of loading its own. With ``INFERENCE_BACKEND=onnx`` the master only
+exports the model files and each worker opens its own ONNX Runtime sessions.
+"""
+
+from __future__ import annotations
+
+import gc
+import logging
+import os
+import signal
+import socket
+import sys
+import time
+
+import uvicorn
+
+logger = logging.getLogger("src.serve")
+
+AI_HOST = os.environ.get("AI_HOST", "0.0.0.0")
+AI_PORT = int(os.environ.get("AI_PORT", "8000"))
+AI_WORKERS = int(os.environ.get("AI_WORKERS", "1"))
+# Intra-op threads per worker; 0 splits the machine's cores evenly
+TORCH_THREADS_PER_WORKER = int(os.environ.get("TORCH_THREADS_PER_WORKER", "0"))
+
+# Don't respawn a worker that keeps crashing faster than this
+_MIN_WORKER_UPTIME_S = 5.0
+
+
+def _threads_per_worker(workers: int) -> int:
+    if TORCH_THREADS_PER_WORKER > 0:
+        return TORCH_THREADS_PER_WORKER
+    return max(1, (os.cpu_count() or 1) // workers)
+
+
+def _set_torch_threads(threads: int) -> None:
+    try:
+        import torch
+    except ImportError:
+        return
+    torch.set_num_threads(threads)
+
+
+def _set_onnx_threads(threads: int) -> None:
+    # Workers open their own ONNX Runtime sessions; an explicit setting wins
+    if "ONNX_INTRA_OP_THREADS" in os.environ:
+        return
+    from src.services import onnx_backend
+
+    onnx_backend.ONNX_INTRA_OP_THREADS = threads
+
+
+def _bind_socket() -> socket.socket:
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((AI_HOST, AI_PORT))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+def _run_worker(index: int, sock: socket.socket, threads: int) -> None:
+    """Body of a forked worker; never returns."""
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    _set_torch_threads(threads)
+    _set_onnx_threads(threads)
+    os.environ["AI_SCHEDULER_ENABLED"] = "1" if index == 0 else "0"
+
+    from src.main import app
+
+    config = uvicorn.Config(app, log_config=None, lifespan="on")
+    server = uvicorn.Server(config)
+    server.run(sockets=[sock])
+    os._exit(0)
+
+
+def _spawn(index: int, sock: socket.socket, threads: int) -> int:
+    pid = os.fork()
+    if pid == 0:
+        try:
+            _run_worker(index, sock, threads)
+        finally:
+            os._exit(1)
+    logger.info("Started worker %d (pid %d, %d threads)", index, pid, threads)
+    return pid
+
+
+def serve_prefork(workers: int) -> None:
+    threads = _threads_per_worker(workers)
+
+    # Keep the master single-threaded while loading so no OpenMP thread
+    # pool exists at fork time; workers size their own. The ONNX backend
+    # opens no sessions here at all (see preload_models).
+    _set_torch_threads(1)
+
+    from src.main import preload_models
+
+    logger.info("Preloading models before forking %d workers", workers)
+    preload_models()
+
+    sock = _bind_socket()
+    # Move everything allocated so far out of the GC's reach so collections
+    # in the workers don't touch (and un-share) the preloaded pages.
+    gc.collect()
+    gc.freeze()
+
+    children: dict[int, tuple[int, float]] = {}
+    for index in range(workers):
+        children[_spawn(index, sock, threads)] = (index, time.monotonic())
+
+    stopping = False
+
+    def _stop(signum: int, _frame: object) -> None:
+        nonlocal stopping
+        stopping = True
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, _stop)
+    signal.signal(signal.SIGINT, _stop)
+
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        except InterruptedError:
+            continue
+
+        index, started = children.pop(pid, (None, 0.0))
+        if index is None or stopping:
+            continue
+
+        logger.warning("Worker %d (pid %d) exited with status %d", index, pid, status)
+        if time.monotonic() - started < _MIN_WORKER_UPTIME_S:
+            logger.error("Worker %d is crash-looping, not respawning", index)
+            continue
+        children[_spawn(index, sock, threads)] = (index, time.monotonic())
+
+    sock.close()
+    logger.info("All workers stopped")
+
+
+def main() -> None:
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
+    )
+
+    if AI_WORKERS <= 1:
+        uvicorn.run("src.main:app", host=AI_HOST, port=AI_PORT)
+        return
+
+    if not hasattr(os, "fork"):
+        sys.exit("AI_WORKERS > 1 requires a platform with fork()")
+
+    serve_prefork(AI_WORKERS)
+
+
+if __name__ == "__main__":
+    main()
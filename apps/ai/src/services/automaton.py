@@ -0,0 +1,81 @@
+"""Aho-Corasick automaton for finding many literal strings in one text pass."""
+
+from __future__ import annotations
+
+from collections import deque
+from collections.abc import Callable, Iterator
+
+
+class AhoCorasick:
+    """Reports every occurrence of any pattern, overlapping ones included.
+
+    ``fold`` normalizes patterns and text before matching (e.g. case
+    folding); it must preserve length so that reported positions line up
+    with the original text. Empty patterns never match.
+    """
+
+    def __init__(
+        self,
+        patterns: list[str],
+        fold: Callable[[str], str] | None = None,
+    ) -> None:
+        self.patterns = list(patterns)
+        self._fold = fold
+        # Node 0 is the root. _goto[n] maps a character to the next node,
+        # _fail[n] is the longest proper suffix that is also a trie path and
+        # _out[n] lists the pattern indices ending at n (suffixes included).
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._out: list[list[int]] = [[]]
+
+        for index, pattern in enumerate(self.patterns):
+            if pattern:
+                self._insert(self._fold_text(pattern), index)
+        self._link()
+
+    def __len__(self) -> int:
+        return len(self.patterns)
+
+    def _fold_text(self, text: str) -> str:
+        return text if self._fold is None else self._fold(text)
+
+    def _insert(self, pattern: str, index: int) -> None:
+        node = 0
+        for ch in pattern:
+            nxt = self._goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            node = nxt
+        self._out[node].append(index)
+
+    def _link(self) -> None:
+        queue: deque[int] = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(ch, 0)
+                self._fail[child] = target if target != child else 0
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+
+    def iter_matches(self, text: str) -> Iterator[tuple[int, int]]:
+        """Yield ``(start, pattern_index)`` ordered by match end position."""
+        goto, fail, out = self._goto, self._fail, self._out
+        node = 0
+        for pos, ch in enumerate(self._fold_text(text)):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            for index in out[node]:
+                yield pos + 1 - len(self.patterns[index]), index
+
+    def matched(self, text: str) -> set[int]:
+        """Indices of the patterns that occur anywhere in ``text``."""
+        return {index for _, index in self.iter_matches(text)}
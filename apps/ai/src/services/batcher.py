@@ -0,0 +1,126 @@
+"""Dynamic micro-batching in front of the SBERT embedding model."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+
+from src.services.embedding import EmbeddingService
+from src.services.inference import InferenceExecutor
+
+logger = logging.getLogger(__name__)
+
+EMBED_BATCH_MAX_SIZE = int(os.environ.get("EMBED_BATCH_MAX_SIZE", "32"))
+EMBED_BATCH_MAX_WAIT_MS = float(os.environ.get("EMBED_BATCH_MAX_WAIT_MS", "5"))
+
+
+class EmbeddingBatcher:
+    """Coalesces concurrent ``encode`` calls into one batched forward pass.
+
+    Requests are gathered for up to ``max_wait_ms`` or until ``max_batch_size``
+    distinct texts are pending. Identical texts share a single slot in the
+    batch, and every caller receives its own copy of the vector. If the
+    worker stops (``close`` or a crash), every caller still waiting gets a
+    RuntimeError instead of hanging.
+    """
+
+    def __init__(
+        self,
+        embedding_service: EmbeddingService,
+        executor: InferenceExecutor,
+        max_batch_size: int = EMBED_BATCH_MAX_SIZE,
+        max_wait_ms: float = EMBED_BATCH_MAX_WAIT_MS,
+    ) -> None:
+        self.embedding_service = embedding_service
+        self.executor = executor
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self._queue: asyncio.Queue[tuple[str, asyncio.Future]] | None = None
+        self._worker: asyncio.Task | None = None
+        self._closed = False
+
+    async def encode(self, text: str) -> list[float]:
+        if self._closed:
+            raise RuntimeError("Embedding batcher is closed")
+        self._ensure_worker()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((text, future))
+        vector = await future
+        return list(vector)
+
+    def _ensure_worker(self) -> None:
+        if self._worker is None or self._worker.done():
+            if self._worker is not None and not self._worker.cancelled():
+                logger.error("Embedding batcher worker died: %r", self._worker.exception())
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._run())
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        queue = self._queue
+        batch: dict[str, list[asyncio.Future]] = {}
+        try:
+            while True:
+                text, future = await queue.get()
+                batch = {text: [future]}
+                deadline = loop.time() + self.max_wait
+
+                while len(batch) < self.max_batch_size:
+                    timeout = deadline - loop.time()
+                    try:
+                        if timeout > 0:
+                            text, future = await asyncio.wait_for(queue.get(), timeout)
+                        else:
+                            text, future = queue.get_nowait()
+                    except (asyncio.TimeoutError, asyncio.QueueEmpty):
+                        break
+                    batch.setdefault(text, []).append(future)
+
+                await self._flush(batch)
+                batch = {}
+        finally:
+            # Nothing else will answer the batch being gathered or flushed,
+            # or what is still queued; a restarted worker gets a new queue
+            pending = [future for futures in batch.values() for future in futures]
+            while not queue.empty():
+                pending.append(queue.get_nowait()[1])
+            error = RuntimeError("Embedding batcher stopped")
+            for future in pending:
+                if not future.done():
+                    future.set_exception(error)
+
+    async def _flush(self, batch: dict[str, list[asyncio.Future]]) -> None:
+        texts = list(batch)
+        try:
+            vectors = await self.executor.run(
+                self.embedding_service.encode_batch, texts
+            )
+        except Exception as exc:
+            logger.exception("Batched encode failed for %d texts", len(texts))
+            for futures in batch.values():
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(exc)
+            return
+
+        for text, vector in zip(texts, vectors):
+            for future in batch[text]:
+                if not future.done():
+                    future.set_result(vector)
+
+        logger.debug(
+            "Encoded batch of %d texts for %d callers",
+            len(texts),
+            sum(len(f) for f in batch.values()),
+        )
+
+    async def close(self) -> None:
+        self._closed = True
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
@@ -0,0 +1,230 @@
+"""Durable SQLite queue of callback requests waiting to reach the web app."""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections.abc import Sequence
+from dataclasses import dataclass
+
+logger = logging.getLogger(__name__)
+
+CALLBACK_OUTBOX_PATH = os.environ.get(
+    "CALLBACK_OUTBOX_PATH",
+    os.path.join(os.environ.get("MODEL_CACHE_DIR", "."), "callback_outbox.sqlite3"),
+)
+
+
+@dataclass
+class OutboxEntry:
+    id: int
+    url: str
+    host: str
+    body: bytes
+    headers: dict[str, str]
+    attempts: int
+    created_at: float
+
+
+class CallbackOutbox:
+    """Callback requests persisted before they are sent, deleted once delivered.
+
+    Several worker processes can share one file: a sender ``claim``s an
+    entry by pushing its due time past a lease, so no other worker picks it
+    up meanwhile, and an entry whose sender died becomes due again when the
+    lease runs out. Entries under an unexpired lease are the ones in flight,
+    which lets ``claim`` cap the sends to a host across all workers. Entries that can't be delivered are kept with status
+    ``dead`` for inspection instead of being dropped. With ``path=None`` the
+    queue lives in memory and doesn't survive a restart.
+    """
+
+    def __init__(self, path: str | None = CALLBACK_OUTBOX_PATH) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = self._open(path) if path else None
+        if self._conn is None:
+            self._conn = self._connect(":memory:")
+
+    @staticmethod
+    def _connect(path: str) -> sqlite3.Connection:
+        conn = sqlite3.connect(path, check_same_thread=False, timeout=5.0)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS callbacks ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " url TEXT NOT NULL,"
+            " host TEXT NOT NULL,"
+            " key TEXT,"
+            " body BLOB NOT NULL,"
+            " headers TEXT NOT NULL,"
+            " status TEXT NOT NULL DEFAULT 'pending',"
+            " attempts INTEGER NOT NULL DEFAULT 0,"
+            " claimed INTEGER NOT NULL DEFAULT 0,"
+            " next_at REAL NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " last_error TEXT)"
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS callbacks_due ON callbacks (status, next_at)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS callbacks_key ON callbacks (key)")
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS callbacks_leased ON callbacks (host, claimed, next_at)"
+        )
+        conn.commit()
+        return conn
+
+    def _open(self, path: str) -> sqlite3.Connection | None:
+        try:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = self._connect(path)
+            pending = conn.execute(
+                "SELECT COUNT(*) FROM callbacks WHERE status = 'pending'"
+            ).fetchone()[0]
+            logger.info("Callback outbox opened at %s (%d pending)", path, pending)
+            return conn
+        except sqlite3.Error:
+            logger.exception("Failed to open callback outbox at %s, using memory only", path)
+            return None
+
+    def add(
+        self,
+        url: str,
+        host: str,
+        body: bytes,
+        headers: dict[str, str],
+        key: str | None = None,
+    ) -> int:
+        """Queue a request, due now. A queued, unclaimed entry with the same
+        ``key`` is an older version of the same result and is replaced."""
+        now = time.time()
+        with self._lock:
+            if key is not None:
+                self._conn.execute(
+                    "DELETE FROM callbacks"
+                    " WHERE key = ? AND status = 'pending' AND claimed = 0",
+                    (key,),
+                )
+            cursor = self._conn.execute(
+                "INSERT INTO callbacks (url, host, key, body, headers, next_at, created_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (url, host, key, body, json.dumps(headers), now, now),
+            )
+            self._conn.commit()
+            return int(cursor.lastrowid)
+
+    def due(
+        self,
+        now: float,
+        exclude_hosts: Sequence[str] = (),
+        limit: int = 64,
+    ) -> list[OutboxEntry]:
+        """Pending entries due by ``now``, oldest first."""
+        placeholders = ",".join("?" * len(exclude_hosts))
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, url, host, body, headers, attempts, created_at FROM callbacks"
+                " WHERE status = 'pending' AND next_at <= ?"
+                f" AND host NOT IN ({placeholders})"
+                " ORDER BY next_at, id LIMIT ?",
+                (now, *exclude_hosts, limit),
+            ).fetchall()
+        return [
+            OutboxEntry(
+                id=row[0],
+                url=row[1],
+                host=row[2],
+                body=row[3],
+                headers=json.loads(row[4]),
+                attempts=row[5],
+                created_at=row[6],
+            )
+            for row in rows
+        ]
+
+    def next_due(self, exclude_hosts: Sequence[str] = ()) -> float | None:
+        placeholders = ",".join("?" * len(exclude_hosts))
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT MIN(next_at) FROM callbacks"
+                f" WHERE status = 'pending' AND host NOT IN ({placeholders})",
+                tuple(exclude_hosts),
+            ).fetchone()
+        return row[0]
+
+    def claim(
+        self,
+        entry_id: int,
+        host: str,
+        now: float,
+        lease_until: float,
+        host_limit: int,
+    ) -> bool:
+        """Take a due entry for sending.
+
+        False if another sender got it first, or if ``host_limit`` entries
+        for ``host`` are already leased by any sender.
+        """
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE callbacks SET claimed = 1, next_at = ?"
+                " WHERE id = ? AND status = 'pending' AND next_at <= ?"
+                " AND (SELECT COUNT(*) FROM callbacks"
+                "      WHERE host = ? AND claimed = 1 AND next_at > ?) < ?",
+                (lease_until, entry_id, now, host, now, host_limit),
+            )
+            self._conn.commit()
+            return cursor.rowcount == 1
+
+    def leased(self, host: str, now: float) -> int:
+        """Entries for ``host`` that some sender holds a live lease on."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT COUNT(*) FROM callbacks WHERE host = ? AND claimed = 1 AND next_at > ?",
+                (host, now),
+            ).fetchone()
+        return int(row[0])
+
+    def delete(self, entry_id: int) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM callbacks WHERE id = ?", (entry_id,))
+            self._conn.commit()
+
+    def retry(self, entry_id: int, attempts: int, next_at: float, error: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE callbacks SET claimed = 0, attempts = ?, next_at = ?, last_error = ?"
+                " WHERE id = ?",
+                (attempts, next_at, error, entry_id),
+            )
+            self._conn.commit()
+
+    def bury(self, entry_id: int, attempts: int, error: str) -> None:
+        """Keep an undeliverable entry as ``dead`` instead of retrying it."""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE callbacks SET status = 'dead', claimed = 0, attempts = ?,"
+                " last_error = ? WHERE id = ?",
+                (attempts, error, entry_id),
+            )
+            self._conn.commit()
+
+    def counts(self) -> dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT status, COUNT(*) FROM callbacks GROUP BY status"
+            ).fetchall()
+        counts = {"pending": 0, "dead": 0}
+        counts.update({status: int(n) for status, n in rows})
+        return counts
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
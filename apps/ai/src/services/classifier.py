@@ -2,12 +2,17 @@
 
 from __future__ import annotations
 
+import hashlib
+import json
 import logging
 import re
+from collections.abc import Iterable, Mapping
 from typing import TYPE_CHECKING
 
 import numpy as np
 
+from src.services.result_cache import ResultCache
+
 if TYPE_CHECKING:
     from sentence_transformers import SentenceTransformer
 
@@ -56,22 +61,74 @@ PROTOTYPE_SENTENCES: dict[str, str] = {
 
 NOTE_TYPES = list(KEYWORD_PATTERNS.keys())
 
+# Flattened (note type index, pattern) pairs in NOTE_TYPES order
+_FLAT_PATTERNS: list[tuple[int, re.Pattern[str]]] = [
+    (type_index, pattern)
+    for type_index, note_type in enumerate(NOTE_TYPES)
+    for pattern in KEYWORD_PATTERNS[note_type]
+]
+
+# Every pattern keyword scoring scans the whole text with
+SCAN_PATTERNS: tuple[re.Pattern[str], ...] = tuple(p for _, p in _FLAT_PATTERNS)
+
+
+def _rules_digest(
+    patterns: Mapping[str, list[re.Pattern[str]]],
+    prototypes: Mapping[str, str],
+) -> str:
+    rules = {
+        note_type: [[p.pattern, p.flags] for p in note_patterns]
+        for note_type, note_patterns in patterns.items()
+    }
+    blob = json.dumps([rules, dict(prototypes)], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()[:16]
+
+
+# Part of the cache key, so editing the patterns or prototype sentences
+# reclassifies pages instead of serving note types cached under the old rules
+_RULES_DIGEST = _rules_digest(KEYWORD_PATTERNS, PROTOTYPE_SENTENCES)
+
+
+def keyword_counts_from_matches(
+    matches: Mapping[re.Pattern[str], Iterable[re.Match[str]]],
+) -> np.ndarray:
+    """Per-note-type keyword match counts from ``finditer`` results per SCAN_PATTERNS entry."""
+    counts = np.zeros(len(NOTE_TYPES), dtype=np.float64)
+    for type_index, pattern in _FLAT_PATTERNS:
+        counts[type_index] += sum(1 for _ in matches[pattern])
+    return counts
+
+
+def _keyword_counts(text: str) -> np.ndarray:
+    return keyword_counts_from_matches(
+        {pattern: pattern.finditer(text) for pattern in SCAN_PATTERNS}
+    )
+
 
 class ClassifierService:
     """Classifies notes into 6 types using keywords + embedding similarity."""
 
-    def __init__(self, sbert_model: SentenceTransformer | None = None) -> None:
-        self._prototype_vectors: dict[str, np.ndarray] | None = None
+    def __init__(
+        self,
+        sbert_model: SentenceTransformer | None = None,
+        cache: ResultCache | None = None,
+        model_name: str = "",
+    ) -> None:
+        # One L2-normalized float32 row per entry of NOTE_TYPES
+        self._prototype_matrix: np.ndarray | None = None
+        self.cache = cache
+        self.model_name = model_name
         if sbert_model is not None:
             self._build_prototypes(sbert_model)
 
     def _build_prototypes(self, model: SentenceTransformer) -> None:
         """Pre-compute prototype vectors for each note type."""
-        self._prototype_vectors = {}
-        for note_type, sentence in PROTOTYPE_SENTENCES.items():
-            vec = model.encode(sentence, normalize_embeddings=True)
-            self._prototype_vectors[note_type] = np.array(vec)
-        logger.info("Built %d note type prototype vectors", len(self._prototype_vectors))
+        vectors = model.encode(
+            [PROTOTYPE_SENTENCES[note_type] for note_type in NOTE_TYPES],
+            normalize_embeddings=True,
+        )
+        self._prototype_matrix = np.asarray(vectors, dtype=np.float32)
+        logger.info("Built %d note type prototype vectors", len(self._prototype_matrix))
 
     def classify(
         self,
@@ -85,49 +142,119 @@ class ClassifierService:
 
         Returns (note_type, confidence) where confidence is 0.0-1.0.
         """
-        if not text.strip():
-            return "log", 0.0
-
-        # 1. Rule-based keyword scoring
-        keyword_scores: dict[str, float] = {}
-        for note_type, patterns in KEYWORD_PATTERNS.items():
-            score = 0.0
-            for pattern in patterns:
-                matches = pattern.findall(text)
-                score += len(matches) * 0.3
-            keyword_scores[note_type] = min(score, 1.0)
-
-        # 2. Embedding similarity scoring
-        embedding_scores: dict[str, float] = {}
-        if embedding is not None and self._prototype_vectors is not None:
-            vec = np.array(embedding)
-            norm = np.linalg.norm(vec)
-            if norm > 0:
-                vec = vec / norm
-            for note_type, proto in self._prototype_vectors.items():
-                sim = float(np.dot(vec, proto))
-                # Normalize similarity from [-1,1] to [0,1]
-                embedding_scores[note_type] = (sim + 1.0) / 2.0
+        return self.classify_many(
+            [text], [embedding], keyword_weight, embedding_weight
+        )[0]
 
-        # 3. Combine scores
-        final_scores: dict[str, float] = {}
-        for note_type in NOTE_TYPES:
-            k_score = keyword_scores.get(note_type, 0.0)
-            e_score = embedding_scores.get(note_type, 0.0)
+    def classify_many(
+        self,
+        texts: list[str],
+        embeddings: list[list[float] | None] | np.ndarray | None = None,
+        keyword_weight: float = 0.4,
+        embedding_weight: float = 0.6,
+        keyword_counts: list[np.ndarray] | np.ndarray | None = None,
+    ) -> list[tuple[NoteType, float]]:
+        """
+        Classify several texts at once.
+
+        Embedding similarities for the whole batch come from one matmul
+        against the prototype matrix. ``embeddings`` is either an (N, d)
+        array or a list with one vector (or None) per text.
+        ``keyword_counts`` optionally supplies each text's per-type keyword
+        counts (see keyword_counts_from_matches) so the text isn't rescanned.
+        """
+        if embeddings is None:
+            embeddings = [None] * len(texts)
+        if len(embeddings) != len(texts):
+            raise ValueError("embeddings must have one entry per text")
+        if keyword_counts is not None and len(keyword_counts) != len(texts):
+            raise ValueError("keyword_counts must have one entry per text")
+
+        results: list[tuple[NoteType, float] | None] = [None] * len(texts)
+        keys: dict[int, str] = {}
+        pending: list[int] = []
 
-            if embedding_scores:
-                final_scores[note_type] = (
-                    keyword_weight * k_score + embedding_weight * e_score
+        for i, text in enumerate(texts):
+            if not text.strip():
+                results[i] = ("log", 0.0)
+                continue
+
+            if self.cache is not None:
+                use_embedding = (
+                    embeddings[i] is not None and self._prototype_matrix is not None
                 )
-            else:
-                # No embedding available, use only keywords
-                final_scores[note_type] = k_score
+                # The embedding is a deterministic function of the text, so the
+                # text plus the scoring mode is enough to identify the result.
+                keys[i] = ResultCache.make_key(
+                    "note_type",
+                    self.model_name if use_embedding else "keywords",
+                    text,
+                    keyword_weight=keyword_weight,
+                    embedding_weight=embedding_weight,
+                    rules=_RULES_DIGEST,
+                )
+                cached = self.cache.get(keys[i])
+                if cached is not None:
+                    results[i] = (cached[0], cached[1])
+                    continue
+
+            pending.append(i)
 
-        best_type = max(final_scores, key=lambda k: final_scores[k])
-        confidence = final_scores[best_type]
+        if pending:
+            classified = self._classify(
+                [texts[i] for i in pending],
+                [embeddings[i] for i in pending],
+                keyword_weight,
+                embedding_weight,
+                None if keyword_counts is None else [keyword_counts[i] for i in pending],
+            )
+            for i, result in zip(pending, classified):
+                results[i] = result
+                if self.cache is not None:
+                    self.cache.set(keys[i], list(result))
 
-        # If no strong signal, default to "log"
-        if confidence < 0.15:
-            return "log", confidence
+        return results
 
-        return best_type, round(confidence, 4)
+    def _classify(
+        self,
+        texts: list[str],
+        embeddings: list[list[float] | None],
+        keyword_weight: float,
+        embedding_weight: float,
+        keyword_counts: list[np.ndarray] | None = None,
+    ) -> list[tuple[NoteType, float]]:
+        # 1. Rule-based keyword scoring, one row per text
+        if keyword_counts is None:
+            keyword_counts = [_keyword_counts(text) for text in texts]
+        keyword_scores = np.stack(keyword_counts).astype(np.float64)
+        keyword_scores = np.minimum(keyword_scores * 0.3, 1.0)
+
+        # 2. Embedding similarity scoring for the rows that have an embedding
+        final_scores = keyword_scores
+        if self._prototype_matrix is not None:
+            rows = [i for i, vec in enumerate(embeddings) if vec is not None]
+            if rows:
+                matrix = np.asarray([embeddings[i] for i in rows], dtype=np.float32)
+                norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+                matrix = matrix / np.where(norms > 0, norms, 1.0)
+                sims = (matrix @ self._prototype_matrix.T).astype(np.float64)
+                # Normalize similarity from [-1,1] to [0,1]
+                embedding_scores = (sims + 1.0) / 2.0
+
+                # 3. Combine scores
+                final_scores = keyword_scores.copy()
+                final_scores[rows] = (
+                    keyword_weight * keyword_scores[rows]
+                    + embedding_weight * embedding_scores
+                )
+
+        results: list[tuple[NoteType, float]] = []
+        for row in final_scores:
+            best = int(np.argmax(row))
+            confidence = float(row[best])
+            # If no strong signal, default to "log"
+            if confidence < 0.15:
+                results.append(("log", confidence))
+            else:
+                results.append((NOTE_TYPES[best], round(confidence, 4)))
+        return results
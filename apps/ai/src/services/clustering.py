@@ -1,66 +1,854 @@
 import logging
+import math
+import os
+import threading
+import time
+from dataclasses import dataclass, field
 
 import hdbscan
 import numpy as np
+from sklearn.cluster import MiniBatchKMeans
+from sklearn.decomposition import PCA
 
 logger = logging.getLogger(__name__)
 
 MIN_ITEMS_FOR_CLUSTERING = 10
+MIN_CLUSTER_SIZE = 3
+MIN_SAMPLES = 2
+
+# Incremental reclustering: a cluster is refit once this fraction of its
+# members joined, left or moved since its last fit, or once its spread
+# changed by this fraction. Past RECLUSTER_FULL_FRACTION of the corpus
+# (changed, or touched by a partial refit) everything is refit instead.
+RECLUSTER_REGION_CHURN = float(os.environ.get("RECLUSTER_REGION_CHURN", "0.2"))
+RECLUSTER_DENSITY_CHANGE = float(os.environ.get("RECLUSTER_DENSITY_CHANGE", "0.25"))
+RECLUSTER_FULL_FRACTION = float(os.environ.get("RECLUSTER_FULL_FRACTION", "0.3"))
+# A partial refit also fits the untouched clusters nearest to each refit
+# cluster: fitted alone, a single cluster mostly comes back as noise. If
+# it still turns over half of the region's clustered pages into noise,
+# everything is refit instead.
+RECLUSTER_CONTEXT_CLUSTERS = int(os.environ.get("RECLUSTER_CONTEXT_CLUSTERS", "1"))
+
+# Large corpora: from CLUSTER_REDUCE_MIN_ITEMS pages on, vectors are reduced
+# to CLUSTER_REDUCE_DIM dimensions ("pca", "random" or "none") before
+# HDBSCAN, which computes core distances on CLUSTER_N_JOBS cores (-1: all).
+# With CLUSTER_PARTITION_SIZE > 0, corpora over twice that size are first
+# split by MiniBatchKMeans and HDBSCAN runs inside each partition.
+CLUSTER_REDUCE = os.environ.get("CLUSTER_REDUCE", "pca")
+CLUSTER_REDUCE_DIM = int(os.environ.get("CLUSTER_REDUCE_DIM", "64"))
+CLUSTER_REDUCE_MIN_ITEMS = int(os.environ.get("CLUSTER_REDUCE_MIN_ITEMS", "20000"))
+CLUSTER_N_JOBS = int(os.environ.get("CLUSTER_N_JOBS", "-1"))
+CLUSTER_PARTITION_SIZE = int(os.environ.get("CLUSTER_PARTITION_SIZE", "0"))
+
+# Every fit is snapshotted here ("" disables) and loaded at startup; other
+# workers pick up a newer snapshot within CLUSTER_SNAPSHOT_CHECK_S seconds
+CLUSTER_SNAPSHOT_PATH = os.environ.get(
+    "CLUSTER_SNAPSHOT_PATH",
+    os.path.join(os.environ.get("MODEL_CACHE_DIR", "."), "cluster_state.npz"),
+)
+CLUSTER_SNAPSHOT_CHECK_S = float(os.environ.get("CLUSTER_SNAPSHOT_CHECK_S", "30"))
+
+# Online assignment compares against every fitted member up to this many;
+# past it, against CLUSTER_EXEMPLARS spread-out exemplars per cluster
+CLUSTER_ASSIGN_EXACT_MAX = int(os.environ.get("CLUSTER_ASSIGN_EXACT_MAX", "50000"))
+CLUSTER_EXEMPLARS = int(os.environ.get("CLUSTER_EXEMPLARS", "16"))
+
+NOISE = -1
+# Label of spare rows past the end of a state's arrays
+_UNUSED = -2
+
+# Query rows per distance matmul in online assignment
+_ASSIGN_CHUNK = 1024
+# Rows PCA is fitted on; the projection is then applied to every row
+_PCA_SAMPLE = 20000
+# Bumped whenever the snapshot layout changes; older files are ignored
+_SNAPSHOT_FORMAT = 1
+
+
+@dataclass
+class _Projection:
+    mean: np.ndarray  # (d,)
+    components: np.ndarray  # (d, k)
+
+    def apply(self, matrix: np.ndarray) -> np.ndarray:
+        return ((matrix - self.mean) @ self.components).astype(np.float32)
+
+
+def _fit_projection(matrix: np.ndarray) -> _Projection | None:
+    dim = matrix.shape[1]
+    if (
+        CLUSTER_REDUCE not in ("pca", "random")
+        or len(matrix) < CLUSTER_REDUCE_MIN_ITEMS
+        or dim <= CLUSTER_REDUCE_DIM
+    ):
+        return None
+
+    rng = np.random.default_rng(0)
+    if CLUSTER_REDUCE == "random":
+        components = rng.standard_normal((dim, CLUSTER_REDUCE_DIM)) / math.sqrt(CLUSTER_REDUCE_DIM)
+        return _Projection(np.zeros(dim, dtype=np.float32), components.astype(np.float32))
+
+    sample = matrix
+    if len(matrix) > _PCA_SAMPLE:
+        sample = matrix[rng.choice(len(matrix), _PCA_SAMPLE, replace=False)]
+    pca = PCA(n_components=CLUSTER_REDUCE_DIM, svd_solver="randomized", random_state=0)
+    pca.fit(sample)
+    return _Projection(pca.mean_.astype(np.float32), pca.components_.T.astype(np.float32))
+
+
+@dataclass
+class _Region:
+    size: int
+    centroid: np.ndarray
+    spread: float  # mean member distance to the centroid
+    extent: float  # max member distance to the centroid
+    reach: float  # largest member core distance; online joins must be this close
+
+
+@dataclass
+class _Reference:
+    """Rows new points are compared against, with the label each one votes
+    for and how far from it a point may be to join."""
+
+    vectors: np.ndarray  # (m, d)
+    norms: np.ndarray  # (m,) squared norms
+    labels: np.ndarray  # (m,)
+    limits: np.ndarray  # (m,)
+
+    @classmethod
+    def build(cls, vectors: np.ndarray, labels: np.ndarray, limits: np.ndarray) -> "_Reference":
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        return cls(vectors, np.einsum("ij,ij->i", vectors, vectors), labels, limits)
+
+
+@dataclass
+class _ClusterState:
+    page_ids: list[str]
+    # Arrays have a row per page id plus spare capacity (labelled _UNUSED)
+    # for pages assigned online
+    vectors: np.ndarray  # (capacity, d) float32
+    labels: np.ndarray  # (capacity,) int64, NOISE for noise
+    core_distances: np.ndarray  # (capacity,) float32
+    dirty: np.ndarray  # (capacity,) bool, assigned online since the last fit
+    regions: dict[int, _Region]
+    # Members that joined or left each label (NOISE included) since its last fit
+    churn: dict[int, int]
+    next_cluster_id: int
+    fitted_size: int  # corpus size at the last full fit
+    # Reduction applied to incoming vectors; the arrays above are reduced
+    projection: _Projection | None = None
+    index: dict[str, int] = field(init=False)
+    # Fitted, clustered rows; online assignment compares against these (or
+    # their exemplars) and never against pages it placed itself
+    members: np.ndarray = field(init=False)
+    _reference: _Reference | None = field(init=False, default=None)
+
+    def __post_init__(self) -> None:
+        self.index = {page_id: row for row, page_id in enumerate(self.page_ids)}
+        self.members = np.flatnonzero((self.labels >= 0) & ~self.dirty)
+        self._reference = None
+
+    def reference(self) -> _Reference:
+        """Fitted members, or per-cluster exemplars past CLUSTER_ASSIGN_EXACT_MAX.
+
+        Built on first use and cached until the next fit.
+        """
+        if self._reference is None:
+            if len(self.members) <= CLUSTER_ASSIGN_EXACT_MAX:
+                labels = self.labels[self.members]
+                reach = np.array([self.regions[int(label)].reach for label in labels])
+                self._reference = _Reference.build(self.vectors[self.members], labels, reach)
+            else:
+                self._reference = _exemplar_reference(self)
+        return self._reference
+
+    @property
+    def input_dim(self) -> int:
+        if self.projection is not None:
+            return self.projection.components.shape[0]
+        return self.vectors.shape[1]
+
+    def project(self, matrix: np.ndarray) -> np.ndarray:
+        return matrix if self.projection is None else self.projection.apply(matrix)
+
+    def grow(self) -> None:
+        extra = max(16, len(self.labels))
+        self.vectors = np.vstack([
+            self.vectors, np.zeros((extra, self.vectors.shape[1]), dtype=np.float32)
+        ])
+        self.labels = np.concatenate([self.labels, np.full(extra, _UNUSED, dtype=np.int64)])
+        self.core_distances = np.concatenate([
+            self.core_distances, np.zeros(extra, dtype=np.float32)
+        ])
+        self.dirty = np.concatenate([self.dirty, np.zeros(extra, dtype=bool)])
+
+
+def _fit_hdbscan(matrix: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    clusterer = hdbscan.HDBSCAN(
+        min_cluster_size=MIN_CLUSTER_SIZE,
+        min_samples=MIN_SAMPLES,
+        metric="euclidean",
+        prediction_data=True,
+        core_dist_n_jobs=CLUSTER_N_JOBS,
+    )
+    labels = clusterer.fit_predict(matrix).astype(np.int64)
+    core_distances = clusterer.prediction_data_.core_distances.astype(np.float32)
+    return labels, core_distances
+
+
+def _fit(matrix: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Labels and core distances, pre-partitioned for very large matrices.
+
+    Partitions are MiniBatchKMeans cells; a dense cluster cut by a cell
+    boundary comes back as two clusters, the price of never fitting
+    HDBSCAN on more than about CLUSTER_PARTITION_SIZE points at once.
+    """
+    if not CLUSTER_PARTITION_SIZE or len(matrix) <= 2 * CLUSTER_PARTITION_SIZE:
+        return _fit_hdbscan(matrix)
+
+    n_partitions = math.ceil(len(matrix) / CLUSTER_PARTITION_SIZE)
+    partitions = MiniBatchKMeans(
+        n_clusters=n_partitions, batch_size=4096, n_init=3, random_state=0
+    ).fit_predict(matrix)
+
+    labels = np.full(len(matrix), NOISE, dtype=np.int64)
+    core_distances = np.zeros(len(matrix), dtype=np.float32)
+    offset = 0
+    for partition in range(n_partitions):
+        rows = np.flatnonzero(partitions == partition)
+        if len(rows) < MIN_ITEMS_FOR_CLUSTERING:
+            continue
+        part_labels, part_core = _fit_hdbscan(matrix[rows])
+        labels[rows] = np.where(part_labels >= 0, part_labels + offset, NOISE)
+        core_distances[rows] = part_core
+        offset += int(part_labels.max()) + 1
+    logger.info("Clustered %d points in %d partitions", len(matrix), n_partitions)
+    return labels, core_distances
+
+
+def _region(members: np.ndarray, core_distances: np.ndarray) -> _Region:
+    centroid = members.mean(axis=0)
+    distances = np.linalg.norm(members - centroid, axis=1)
+    return _Region(
+        size=len(members),
+        centroid=centroid,
+        spread=float(distances.mean()),
+        extent=float(distances.max()),
+        reach=float(core_distances.max()),
+    )
+
+
+def _regions(
+    vectors: np.ndarray,
+    labels: np.ndarray,
+    core_distances: np.ndarray,
+    cluster_ids: set[int] | None = None,
+) -> dict[int, _Region]:
+    regions = {}
+    for cluster_id in np.unique(labels[labels >= 0]):
+        if cluster_ids is not None and cluster_id not in cluster_ids:
+            continue
+        members = labels == cluster_id
+        regions[int(cluster_id)] = _region(vectors[members], core_distances[members])
+    return regions
+
+
+def _exemplar_reference(state: _ClusterState) -> _Reference:
+    """Up to CLUSTER_EXEMPLARS members per cluster, picked greedily to cover it.
+
+    Starts from the densest member (smallest core distance) and keeps adding
+    the member farthest from every exemplar so far. A point may join when
+    it's within the cluster's cover radius (farthest member from its nearest
+    exemplar) plus its reach.
+    """
+    vectors, labels, limits = [], [], []
+    member_labels = state.labels[state.members]
+    for cluster_id, region in state.regions.items():
+        rows = state.members[member_labels == cluster_id]
+        if not len(rows):
+            continue
+        members = state.vectors[rows]
+        chosen = [int(np.argmin(state.core_distances[rows]))]
+        nearest = np.linalg.norm(members - members[chosen[0]], axis=1)
+        while len(chosen) < min(CLUSTER_EXEMPLARS, len(rows)):
+            farthest = int(np.argmax(nearest))
+            if nearest[farthest] == 0:
+                break
+            chosen.append(farthest)
+            nearest = np.minimum(nearest, np.linalg.norm(members - members[farthest], axis=1))
+        vectors.append(members[chosen])
+        labels.append(np.full(len(chosen), cluster_id, dtype=np.int64))
+        limits.append(np.full(len(chosen), float(nearest.max()) + region.reach))
+
+    if not vectors:
+        dim = state.vectors.shape[1]
+        return _Reference.build(np.empty((0, dim)), np.empty(0, np.int64), np.empty(0))
+    return _Reference.build(np.vstack(vectors), np.concatenate(labels), np.concatenate(limits))
+
+
+def _assign(
+    state: _ClusterState,
+    queries: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Labels, distances and membership strengths for the rows of ``queries``.
+
+    A point takes the label of its nearest reference row when it's within
+    that row's limit; its strength falls linearly from 1 at the row to 0 at
+    the limit. Noise gets strength 0.
+    """
+    labels = np.full(len(queries), NOISE, dtype=np.int64)
+    distances = np.full(len(queries), np.inf, dtype=np.float32)
+    strengths = np.zeros(len(queries), dtype=np.float32)
+    reference = state.reference()
+    if not len(reference.labels) or not len(queries):
+        return labels, distances, strengths
+
+    for start in range(0, len(queries), _ASSIGN_CHUNK):
+        chunk = queries[start:start + _ASSIGN_CHUNK]
+        squared = (
+            np.einsum("ij,ij->i", chunk, chunk)[:, None]
+            + reference.norms[None, :]
+            - 2.0 * chunk @ reference.vectors.T
+        )
+        nearest = squared.argmin(axis=1)
+        distance = np.sqrt(np.maximum(squared[np.arange(len(chunk)), nearest], 0.0))
+        limit = reference.limits[nearest]
+        within = distance <= limit
+        window = slice(start, start + len(chunk))
+        labels[window] = np.where(within, reference.labels[nearest], NOISE)
+        distances[window] = distance
+        strengths[window] = np.where(
+            within, 1.0 - distance / np.where(limit > 0, limit, 1.0), 0.0
+        )
+    return labels, distances, strengths
+
+
+def _full_state(page_ids: list[str], matrix: np.ndarray) -> _ClusterState:
+    projection = _fit_projection(matrix)
+    # Online assignment appends to and writes into the state, so it owns its
+    # page ids and vectors instead of sharing the caller's
+    if projection is not None:
+        matrix = projection.apply(matrix)
+    else:
+        matrix = np.array(matrix, dtype=np.float32)
+    labels, core_distances = _fit(matrix)
+    return _ClusterState(
+        page_ids=list(page_ids),
+        vectors=matrix,
+        labels=labels,
+        core_distances=core_distances,
+        dirty=np.zeros(len(page_ids), dtype=bool),
+        regions=_regions(matrix, labels, core_distances),
+        churn={},
+        next_cluster_id=int(labels.max()) + 1 if len(labels) else 0,
+        fitted_size=len(page_ids),
+        projection=projection,
+    )
+
+
+def _result(state: _ClusterState) -> dict:
+    cluster_map: dict[int, list[str]] = {}
+    noise: list[str] = []
+    for page_id, label in zip(state.page_ids, state.labels.tolist()):
+        if label == NOISE:
+            noise.append(page_id)
+        else:
+            cluster_map.setdefault(label, []).append(page_id)
+
+    clusters = [
+        {"cluster_id": cid, "page_ids": pids}
+        for cid, pids in sorted(cluster_map.items())
+    ]
+    return {"clusters": clusters, "noise": noise}
+
+
+def _save_snapshot(state: _ClusterState, path: str, version: int) -> None:
+    """Write ``state`` to ``path`` atomically (temp file, fsync, rename)."""
+    size = len(state.page_ids)
+    region_ids = sorted(state.regions)
+    regions = [state.regions[cluster_id] for cluster_id in region_ids]
+    arrays = {
+        "format": np.array(_SNAPSHOT_FORMAT),
+        "version": np.array(version, dtype=np.int64),
+        "next_cluster_id": np.array(state.next_cluster_id, dtype=np.int64),
+        "fitted_size": np.array(state.fitted_size, dtype=np.int64),
+        "page_ids": np.array(state.page_ids, dtype=str),
+        "vectors": state.vectors[:size],
+        "labels": state.labels[:size],
+        "core_distances": state.core_distances[:size],
+        "dirty": state.dirty[:size],
+        "region_ids": np.array(region_ids, dtype=np.int64),
+        "region_sizes": np.array([r.size for r in regions], dtype=np.int64),
+        "region_centroids": np.array(
+            [r.centroid for r in regions], dtype=np.float32
+        ).reshape(len(regions), state.vectors.shape[1]),
+        "region_stats": np.array(
+            [(r.spread, r.extent, r.reach) for r in regions], dtype=np.float64
+        ).reshape(len(regions), 3),
+        "churn": np.array(sorted(state.churn.items()), dtype=np.int64).reshape(-1, 2),
+    }
+    if state.projection is not None:
+        arrays["projection_mean"] = state.projection.mean
+        arrays["projection_components"] = state.projection.components
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            np.savez(f, **arrays)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def _load_snapshot(path: str) -> tuple[_ClusterState, int] | None:
+    with np.load(path, allow_pickle=False) as data:
+        if int(data["format"]) != _SNAPSHOT_FORMAT:
+            logger.warning("Ignoring cluster snapshot %s with an old format", path)
+            return None
+        projection = None
+        if "projection_components" in data:
+            projection = _Projection(data["projection_mean"], data["projection_components"])
+        regions = {
+            int(cluster_id): _Region(
+                size=int(size),
+                centroid=centroid,
+                spread=float(stats[0]),
+                extent=float(stats[1]),
+                reach=float(stats[2]),
+            )
+            for cluster_id, size, centroid, stats in zip(
+                data["region_ids"], data["region_sizes"],
+                data["region_centroids"], data["region_stats"],
+            )
+        }
+        state = _ClusterState(
+            page_ids=data["page_ids"].tolist(),
+            vectors=data["vectors"],
+            labels=data["labels"],
+            core_distances=data["core_distances"],
+            dirty=data["dirty"],
+            regions=regions,
+            churn={int(label): int(count) for label, count in data["churn"]},
+            next_cluster_id=int(data["next_cluster_id"]),
+            fitted_size=int(data["fitted_size"]),
+            projection=projection,
+        )
+        return state, int(data["version"])
 
 
 class ClusteringService:
+    """HDBSCAN clustering with online assignment and incremental refits.
+
+    ``cluster`` fits everything and returns the result without touching
+    the service's state, so ad-hoc requests never disturb the clusters
+    pages are assigned to. ``recluster`` diffs the corpus against the last
+    fit (fitting everything when there is none), assigns new and changed
+    pages online and refits only the clusters whose membership or spread
+    moved past the RECLUSTER_* thresholds (plus nearby noise), keeping the
+    ids of the untouched clusters. Each refit includes the nearest untouched clusters
+    as context, whose labels it never changes. ``assign`` places a single page between refits.
+    The ``*_matrix`` variants take page ids and an (N x d) float32 matrix
+    as fetched, so large corpora are never held as float lists; the state
+    copies both, and the caller's list and array are never modified.
+    Fits run without the lock; pages assigned meanwhile are replayed onto
+    the new state.
+
+    Each recluster is snapshotted to ``snapshot_path`` with a version,
+    which is loaded at startup, so a restarted or additional worker assigns
+    pages right away. Workers stat the file at most every CLUSTER_SNAPSHOT_CHECK_S
+    seconds and swap in a newer version written by another worker.
+    """
+
+    def __init__(self, snapshot_path: str | None = CLUSTER_SNAPSHOT_PATH) -> None:
+        self.snapshot_path = snapshot_path
+        self._lock = threading.Lock()
+        self._state: _ClusterState | None = None
+        self._pending: dict[str, np.ndarray] | None = None
+        self._version = 0
+        self._snapshot_stat: tuple[int, int] | None = None
+        self._next_check = 0.0
+        self._reload_lock = threading.Lock()
+        if snapshot_path:
+            self._reload()
+
+    @property
+    def version(self) -> int:
+        return self._version
+
     def cluster(
         self,
         embeddings: list[tuple[str, list[float]]],
     ) -> dict:
         page_ids = [item[0] for item in embeddings]
-        vectors = [item[1] for item in embeddings]
-
         if len(embeddings) < MIN_ITEMS_FOR_CLUSTERING:
             return {
                 "clusters": [],
                 "noise": page_ids,
             }
+        matrix = np.array([item[1] for item in embeddings], dtype=np.float32)
+        return self.cluster_matrix(page_ids, matrix)
 
-        matrix = np.array(vectors, dtype=np.float32)
+    def cluster_matrix(self, page_ids: list[str], matrix: np.ndarray) -> dict:
+        """``cluster`` over an (N x d) float32 matrix; the state is untouched."""
+        if len(page_ids) < MIN_ITEMS_FOR_CLUSTERING:
+            return {
+                "clusters": [],
+                "noise": list(page_ids),
+            }
+        return _result(_full_state(page_ids, matrix)) | {"_mode": "full"}
 
-        clusterer = hdbscan.HDBSCAN(
-            min_cluster_size=3,
-            min_samples=2,
-            metric="euclidean",
-            prediction_data=True,
-        )
-        labels = clusterer.fit_predict(matrix)
+    def recluster(
+        self,
+        embeddings: list[tuple[str, list[float]]],
+    ) -> dict:
+        page_ids = [item[0] for item in embeddings]
+        if len(embeddings) < MIN_ITEMS_FOR_CLUSTERING:
+            return self.cluster(embeddings)
+        matrix = np.array([item[1] for item in embeddings], dtype=np.float32)
+        return self.recluster_matrix(page_ids, matrix)
 
-        cluster_map: dict[int, list[str]] = {}
-        noise: list[str] = []
+    def recluster_matrix(self, page_ids: list[str], matrix: np.ndarray) -> dict:
+        """``recluster`` over an (N x d) float32 matrix; the state keeps a copy."""
+        if len(page_ids) < MIN_ITEMS_FOR_CLUSTERING:
+            return self.cluster_matrix(page_ids, matrix)
+        self._maybe_reload(force=True)
+        # Pages assigned from here on are replayed onto the new state
+        with self._lock:
+            self._pending = {}
+            previous = self._state
+        if previous is None or matrix.shape[1] != previous.input_dim:
+            return self._fit_all(page_ids, matrix)
 
-        for page_id, label in zip(page_ids, labels):
-            if label == -1:
-                noise.append(page_id)
-            else:
-                cluster_map.setdefault(label, []).append(page_id)
+        with self._lock:
+            state, changed = self._carry_over(self._state, page_ids, matrix)
+        n = len(page_ids)
+        if changed >= RECLUSTER_FULL_FRACTION * n or n >= 2 * state.fitted_size:
+            logger.info("Recluster: %d/%d pages changed, refitting everything", changed, n)
+            return self._fit_all(page_ids, matrix)
 
-        clusters = [
-            {"cluster_id": cid, "page_ids": pids}
-            for cid, pids in sorted(cluster_map.items())
-        ]
+        affected = self._affected_regions(state)
+        rows = self._refit_rows(state, affected)
+        context = self._context_rows(state, affected)
+        if len(rows) + len(context) >= RECLUSTER_FULL_FRACTION * n:
+            logger.info(
+                "Recluster: partial refit would touch %d/%d pages",
+                len(rows) + len(context), n,
+            )
+            return self._fit_all(page_ids, matrix)
 
-        return {
-            "clusters": clusters,
-            "noise": noise,
-            "_clusterer": clusterer,
-        }
+        mode = "online"
+        if len(rows) >= MIN_ITEMS_FOR_CLUSTERING:
+            clustered = state.labels[rows] >= 0
+            self._refit(state, rows, context, affected)
+            lost = int((clustered & (state.labels[rows] == NOISE)).sum())
+            if 2 * lost > clustered.sum():
+                logger.info(
+                    "Recluster: partial refit left %d/%d clustered pages as noise, "
+                    "refitting everything", lost, int(clustered.sum()),
+                )
+                return self._fit_all(page_ids, matrix)
+            mode = "partial"
+        logger.info(
+            "Recluster (%s): %d pages added, changed or removed; %d clusters refit over %d pages",
+            mode, changed, len(affected), len(rows),
+        )
+        self._install(state)
+        return _result(state) | {"_mode": mode}
 
-    def approximate_predict(
+    def assign(self, page_id: str, vector: list[float]) -> int:
+        """Cluster id for a new or updated page, NOISE if none fits."""
+        labels, _ = self.assign_batch([page_id], np.array([vector], dtype=np.float32))
+        return int(labels[0])
+
+    def assign_batch(
         self,
-        clusterer: hdbscan.HDBSCAN,
-        vector: list[float],
-    ) -> int:
+        page_ids: list[str],
+        matrix: np.ndarray,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Cluster ids and membership strengths (0-1) for an (N x d) matrix.
+
+        One distance matmul per 1024 rows against the cached reference set;
+        every page is recorded as dirty for the next recluster.
+        """
+        matrix = np.asarray(matrix, dtype=np.float32).reshape(len(page_ids), -1)
+        self._maybe_reload()
+        with self._lock:
+            if self._pending is not None:
+                self._pending.update(zip(page_ids, matrix))
+            state = self._state
+            if state is None or matrix.shape[1] != state.input_dim:
+                return (
+                    np.full(len(page_ids), NOISE, dtype=np.int64),
+                    np.zeros(len(page_ids), dtype=np.float32),
+                )
+            points = state.project(matrix)
+            labels, distances, strengths = _assign(state, points)
+            for page_id, point, label, distance in zip(page_ids, points, labels, distances):
+                self._record(state, page_id, point, int(label), float(distance))
+            return labels, strengths
+
+    def _fit_all(self, page_ids: list[str], matrix: np.ndarray) -> dict:
+        state = _full_state(page_ids, matrix)
+        self._install(state)
+        return _result(state) | {"_mode": "full"}
+
+    def _maybe_reload(self, force: bool = False) -> None:
+        if not self.snapshot_path:
+            return
+        now = time.monotonic()
+        if not force and now < self._next_check:
+            return
+        self._next_check = now + CLUSTER_SNAPSHOT_CHECK_S
+        # One thread checks; the others keep using the current state
+        if self._reload_lock.acquire(blocking=False):
+            try:
+                self._reload()
+            finally:
+                self._reload_lock.release()
+
+    def _reload(self) -> None:
+        """Swap in the snapshot on disk if it's newer than the current state."""
+        try:
+            stat = os.stat(self.snapshot_path)
+        except FileNotFoundError:
+            return
+        key = (stat.st_mtime_ns, stat.st_size)
+        if key == self._snapshot_stat:
+            return
         try:
-            point = np.array([vector], dtype=np.float32)
-            labels, _ = hdbscan.approximate_predict(clusterer, point)
-            return int(labels[0])
+            loaded = _load_snapshot(self.snapshot_path)
         except Exception:
-            logger.exception("approximate_predict failed")
-            return -1
+            logger.exception("Failed to load cluster snapshot %s", self.snapshot_path)
+            return
+        finally:
+            self._snapshot_stat = key
+        if loaded is None:
+            return
+        state, version = loaded
+        with self._lock:
+            if version <= self._version:
+                return
+            self._state = state
+            self._version = version
+        logger.info(
+            "Loaded cluster snapshot v%d: %d pages, %d clusters",
+            version, len(state.page_ids), len(state.regions),
+        )
+
+    def _save(self, state: _ClusterState) -> int:
+        version = max(time.time_ns(), self._version + 1)
+        if self.snapshot_path:
+            try:
+                _save_snapshot(state, self.snapshot_path, version)
+                # Our own snapshot never needs reloading
+                stat = os.stat(self.snapshot_path)
+                self._snapshot_stat = (stat.st_mtime_ns, stat.st_size)
+            except Exception:
+                logger.exception("Failed to write cluster snapshot %s", self.snapshot_path)
+        return version
+
+    def _install(self, state: _ClusterState) -> None:
+        # Saved before anything else can touch it
+        version = self._save(state)
+        with self._lock:
+            self._version = version
+            pending, self._pending = self._pending or {}, None
+            pending = {
+                page_id: point for page_id, point in pending.items()
+                if point.shape[0] == state.input_dim
+            }
+            if pending:
+                queries = state.project(np.stack(list(pending.values())))
+                labels, distances, _ = _assign(state, queries)
+                for page_id, point, label, distance in zip(pending, queries, labels, distances):
+                    self._record(state, page_id, point, int(label), float(distance))
+            self._state = state
+
+    @staticmethod
+    def _record(
+        state: _ClusterState,
+        page_id: str,
+        point: np.ndarray,
+        label: int,
+        distance: float,
+    ) -> None:
+        row = state.index.get(page_id)
+        if row is None:
+            row = len(state.page_ids)
+            if row == len(state.labels):
+                state.grow()
+            state.page_ids.append(page_id)
+            state.index[page_id] = row
+        else:
+            previous = int(state.labels[row])
+            if previous != label:
+                state.churn[previous] = state.churn.get(previous, 0) + 1
+        state.vectors[row] = point
+        state.labels[row] = label
+        state.core_distances[row] = distance if np.isfinite(distance) else 0.0
+        state.dirty[row] = True
+        state.churn[label] = state.churn.get(label, 0) + 1
+
+    @staticmethod
+    def _carry_over(
+        previous: _ClusterState,
+        page_ids: list[str],
+        matrix: np.ndarray,
+    ) -> tuple[_ClusterState, int]:
+        """State over the new corpus, keeping labels of pages that didn't change."""
+        if previous.projection is not None:
+            matrix = previous.projection.apply(matrix)
+        else:
+            matrix = np.array(matrix, dtype=np.float32)
+        size = len(previous.page_ids)
+        rows = np.array([previous.index.get(pid, -1) for pid in page_ids], dtype=np.int64)
+        known = rows >= 0
+        same = known.copy()
+        same[known] = np.all(
+            np.isclose(previous.vectors[rows[known]], matrix[known], atol=1e-6), axis=1
+        )
+
+        labels = np.full(len(page_ids), NOISE, dtype=np.int64)
+        labels[same] = previous.labels[rows[same]]
+        core_distances = np.zeros(len(page_ids), dtype=np.float32)
+        core_distances[same] = previous.core_distances[rows[same]]
+        dirty = np.ones(len(page_ids), dtype=bool)
+        dirty[same] = previous.dirty[rows[same]]
+
+        churn = dict(previous.churn)
+        kept = np.zeros(size, dtype=bool)
+        kept[rows[same]] = True
+        for label in previous.labels[:size][~kept].tolist():
+            churn[label] = churn.get(label, 0) + 1
+
+        state = _ClusterState(
+            page_ids=list(page_ids),
+            vectors=matrix,
+            labels=labels,
+            core_distances=core_distances,
+            dirty=dirty,
+            regions=previous.regions,
+            churn=churn,
+            next_cluster_id=previous.next_cluster_id,
+            fitted_size=previous.fitted_size,
+            projection=previous.projection,
+        )
+        # Only pages that kept their row and label were fitted members, so
+        # the reference (fitted members) already excludes new and changed pages
+        new = np.flatnonzero(~same)
+        new_labels, distances, _ = _assign(state, matrix[new])
+        state.labels[new] = new_labels
+        state.core_distances[new] = np.where(np.isfinite(distances), distances, 0.0)
+        for label in new_labels.tolist():
+            churn[label] = churn.get(label, 0) + 1
+        removed = int((~kept).sum()) - int((known & ~same).sum())
+        return state, int((~same).sum()) + removed
+
+    @staticmethod
+    def _affected_regions(state: _ClusterState) -> set[int]:
+        affected = set()
+        for cluster_id, region in state.regions.items():
+            members = state.labels == cluster_id
+            if state.churn.get(cluster_id, 0) >= RECLUSTER_REGION_CHURN * region.size:
+                affected.add(cluster_id)
+            elif members.sum() < MIN_CLUSTER_SIZE:
+                affected.add(cluster_id)
+            else:
+                spread = _region(state.vectors[members], state.core_distances[members]).spread
+                if abs(spread - region.spread) >= RECLUSTER_DENSITY_CHANGE * max(region.spread, 1e-6):
+                    affected.add(cluster_id)
+        return affected
+
+    @staticmethod
+    def _refit_rows(state: _ClusterState, affected: set[int]) -> np.ndarray:
+        """Members of the affected clusters plus the noise that could join them."""
+        selected = np.isin(state.labels, list(affected))
+        noise = state.labels == NOISE
+        # Enough new noise could form a cluster of its own
+        if state.churn.get(NOISE, 0) >= MIN_CLUSTER_SIZE:
+            selected |= noise & state.dirty
+        if affected and noise.any():
+            centroids = np.stack([state.regions[c].centroid for c in sorted(affected)])
+            radii = 2.0 * np.array([state.regions[c].extent for c in sorted(affected)])
+            centroid_norms = np.einsum("ij,ij->i", centroids, centroids)
+            noise_rows = np.flatnonzero(noise)
+            near = np.zeros(len(noise_rows), dtype=bool)
+            for start in range(0, len(noise_rows), _ASSIGN_CHUNK):
+                chunk = state.vectors[noise_rows[start:start + _ASSIGN_CHUNK]]
+                squared = (
+                    np.einsum("ij,ij->i", chunk, chunk)[:, None]
+                    + centroid_norms[None, :]
+                    - 2.0 * chunk @ centroids.T
+                )
+                near[start:start + len(chunk)] = (squared <= radii ** 2).any(axis=1)
+            selected[noise_rows[near]] = True
+        return np.flatnonzero(selected)
+
+    @staticmethod
+    def _context_rows(state: _ClusterState, affected: set[int]) -> np.ndarray:
+        """Fitted members of the untouched clusters nearest to ``affected``."""
+        untouched = sorted(set(state.regions) - affected)
+        if not affected or not untouched or RECLUSTER_CONTEXT_CLUSTERS < 1:
+            return np.empty(0, dtype=np.int64)
+        centroids = np.stack([state.regions[c].centroid for c in untouched])
+        neighbours: set[int] = set()
+        for cluster_id in affected:
+            distances = np.linalg.norm(centroids - state.regions[cluster_id].centroid, axis=1)
+            nearest = np.argsort(distances, kind="stable")[:RECLUSTER_CONTEXT_CLUSTERS]
+            neighbours.update(untouched[i] for i in nearest)
+        size = len(state.page_ids)
+        return np.flatnonzero(
+            np.isin(state.labels[:size], list(neighbours)) & ~state.dirty[:size]
+        )
+
+    @staticmethod
+    def _refit(
+        state: _ClusterState,
+        rows: np.ndarray,
+        context: np.ndarray,
+        affected: set[int],
+    ) -> None:
+        """Refit ``rows`` together with the ``context`` clusters around them.
+
+        Context rows keep their labels. A refit cluster made mostly of one
+        context cluster's members is that cluster, and the region rows in it
+        join it; every other refit cluster gets a new id.
+        """
+        fit_rows = np.concatenate([rows, context])
+        labels, core_distances = _fit(state.vectors[fit_rows])
+        context_labels = state.labels[context]
+        new_ids = np.full(len(rows), NOISE, dtype=np.int64)
+        for label in np.unique(labels[labels >= 0]).tolist():
+            in_cluster = labels == label
+            owners, counts = np.unique(
+                context_labels[in_cluster[len(rows):]], return_counts=True
+            )
+            if len(owners) and 2 * counts.max() > in_cluster.sum():
+                cluster_id = int(owners[counts.argmax()])
+            else:
+                cluster_id = state.next_cluster_id
+                state.next_cluster_id += 1
+            new_ids[in_cluster[: len(rows)]] = cluster_id
+        state.labels[rows] = new_ids
+        state.core_distances[rows] = core_distances[: len(rows)]
+        state.dirty[rows] = False
+
+        size = len(state.page_ids)
+        fitted = ~state.dirty[:size]
+        regions = {k: v for k, v in state.regions.items() if k not in affected}
+        regions.update(_regions(
+            state.vectors[:size][fitted],
+            state.labels[:size][fitted],
+            state.core_distances[:size][fitted],
+            set(new_ids[new_ids >= 0].tolist()),
+        ))
+        state.regions = regions
+        for cluster_id in affected | {NOISE}:
+            state.churn.pop(cluster_id, None)
+        state.__post_init__()
@@ -1,14 +1,62 @@
-from sentence_transformers import SentenceTransformer
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from src.services.result_cache import ResultCache
+
+if TYPE_CHECKING:
+    from sentence_transformers import SentenceTransformer
+
+WARMUP_TEXT = "모델 워밍업을 위한 문장입니다."
 
 
 class EmbeddingService:
-    def __init__(self, model: SentenceTransformer) -> None:
+    def __init__(
+        self,
+        model: SentenceTransformer,
+        cache: ResultCache | None = None,
+        model_name: str = "",
+    ) -> None:
         self.model = model
+        self.cache = cache
+        self.model_name = model_name
+
+    def warmup(self) -> None:
+        """Run one uncached forward pass so the first request isn't slow."""
+        self.model.encode([WARMUP_TEXT], normalize_embeddings=True)
+
+    def _cache_key(self, text: str) -> str:
+        return ResultCache.make_key("embedding", self.model_name, text)
 
     def encode(self, text: str) -> list[float]:
-        vector = self.model.encode(text, normalize_embeddings=True)
-        return vector.tolist()
+        if self.cache is not None:
+            key = self._cache_key(text)
+            cached = self.cache.get_vector(key)
+            if cached is not None:
+                return cached
+
+        vector = self.model.encode(text, normalize_embeddings=True).tolist()
+
+        if self.cache is not None:
+            self.cache.set_vector(key, vector)
+        return vector
 
     def encode_batch(self, texts: list[str]) -> list[list[float]]:
-        vectors = self.model.encode(texts, normalize_embeddings=True)
-        return vectors.tolist()
+        if self.cache is None:
+            vectors = self.model.encode(texts, normalize_embeddings=True)
+            return vectors.tolist()
+
+        keys = [self._cache_key(text) for text in texts]
+        cached = self.cache.get_vectors(keys)
+        missing = [i for i, key in enumerate(keys) if key not in cached]
+
+        if missing:
+            vectors = self.model.encode(
+                [texts[i] for i in missing],
+                normalize_embeddings=True,
+            ).tolist()
+            for i, vector in zip(missing, vectors):
+                self.cache.set_vector(keys[i], vector)
+                cached[keys[i]] = vector
+
+        return [cached[key] for key in keys]
@@ -4,6 +4,9 @@ from __future__ import annotations
 
 import logging
 import re
+from collections.abc import Iterable, Mapping
+
+from src.services.automaton import AhoCorasick
 
 logger = logging.getLogger(__name__)
 
@@ -25,20 +28,89 @@ _DEADLINE = re.compile(
 # URL pattern
 _URL = re.compile(r"https?://[^\s<>\"')\]]+")
 
+# Every pattern extract() scans the whole text with, in scan order
+SCAN_PATTERNS: tuple[re.Pattern[str], ...] = (
+    _KOREAN_NAME,
+    _DEADLINE,
+    _DATE_ISO,
+    _DATE_KOREAN,
+    _DATE_SLASH,
+    _URL,
+)
+
+
+# Fallback for texts where str.lower() changes length (e.g. "İ"): Latin
+# letters through Latin Extended-B that lowercase to a single character.
+# Hangul has no case and passes through unchanged either way.
+_LATIN_CASE_FOLD = {
+    code: ord(chr(code).lower())
+    for code in range(0x250)
+    if len(chr(code).lower()) == 1 and chr(code).lower() != chr(code)
+}
+
+
+# Below this many known projects, per-name str.find (in C) beats walking
+# the pure-Python automaton over the text.
+AUTOMATON_MIN_PROJECTS = 500
+
+
+def _fold_case(text: str) -> str:
+    """Case-fold while keeping every character at its original offset."""
+    lowered = text.lower()
+    if len(lowered) == len(text):
+        return lowered
+    return text.translate(_LATIN_CASE_FOLD)
+
 
 class EntityExtractor:
     """Extracts entities from plain text using regex patterns."""
 
     def __init__(self, known_projects: list[str] | None = None) -> None:
-        self._known_projects = known_projects or []
+        self.set_known_projects(known_projects or [])
+
+    @property
+    def known_projects(self) -> list[str]:
+        return self._known_projects
 
     def set_known_projects(self, projects: list[str]) -> None:
+        """Compile the project names for case-insensitive matching."""
         self._known_projects = projects
+        self._folded_projects = [_fold_case(name) for name in projects]
+        self._project_automaton = (
+            AhoCorasick(projects, fold=_fold_case)
+            if len(projects) >= AUTOMATON_MIN_PROJECTS
+            else None
+        )
+
+    def _find_projects(self, text: str) -> dict[int, list[int]]:
+        """Map each known project index found in ``text`` to its start offsets."""
+        positions: dict[int, list[int]] = {}
+        if self._project_automaton is not None:
+            for start, index in self._project_automaton.iter_matches(text):
+                positions.setdefault(index, []).append(start)
+            return positions
+
+        folded = _fold_case(text)
+        for index, name in enumerate(self._folded_projects):
+            if not name:
+                continue
+            start = folded.find(name)
+            while start != -1:
+                positions.setdefault(index, []).append(start)
+                start = folded.find(name, start + 1)
+        return positions
 
     def extract(self, text: str) -> list[dict]:
         if not text or not text.strip():
             return []
-
+        return self.extract_from_matches(
+            text, {pattern: pattern.finditer(text) for pattern in SCAN_PATTERNS}
+        )
+
+    def extract_from_matches(
+        self, text: str, matches: Mapping[re.Pattern[str], Iterable[re.Match[str]]]
+    ) -> list[dict]:
+        """Build entities from precomputed ``finditer`` results per SCAN_PATTERNS entry."""
         entities: list[dict] = []
         seen: set[tuple[str, str]] = set()
 
@@ -53,26 +125,26 @@ class EntityExtractor:
                 })
 
         # People (@name)
-        for m in _KOREAN_NAME.finditer(text):
+        for m in matches[_KOREAN_NAME]:
             _add("person", m.group(1))
 
         # Deadlines (must check before general dates to avoid duplication)
         deadline_positions: set[int] = set()
-        for m in _DEADLINE.finditer(text):
+        for m in matches[_DEADLINE]:
             _add("deadline", m.group(1).strip())
             deadline_positions.add(m.start())
 
         # Dates (ISO)
-        for m in _DATE_ISO.finditer(text):
+        for m in matches[_DATE_ISO]:
             if m.start() not in deadline_positions:
                 _add("date", m.group(1))
 
         # Dates (Korean)
-        for m in _DATE_KOREAN.finditer(text):
+        for m in matches[_DATE_KOREAN]:
             _add("date", m.group(1))
 
         # Dates (slash)
-        for m in _DATE_SLASH.finditer(text):
+        for m in matches[_DATE_SLASH]:
             val = m.group(1)
             parts = val.split("/")
             if len(parts) == 2:
@@ -81,12 +153,16 @@ class EntityExtractor:
                     _add("date", val)
 
         # URLs
-        for m in _URL.finditer(text):
+        for m in matches[_URL]:
             _add("url", m.group(0))
 
         # Project name matching
-        for project_name in self._known_projects:
-            if project_name and project_name in text:
-                _add("project", project_name)
+        positions = self._find_projects(text)
+        for index in sorted(positions):
+            _add(
+                "project",
+                self._known_projects[index],
+                {"positions": sorted(positions[index])},
+            )
 
         return entities
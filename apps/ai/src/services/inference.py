@@ -0,0 +1,119 @@
+"""Bounded executor that keeps blocking model inference off the event loop."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import threading
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, TypeVar
+
+logger = logging.getLogger(__name__)
+
+INFERENCE_WORKERS = int(os.environ.get("INFERENCE_WORKERS", "1"))
+INFERENCE_QUEUE_SIZE = int(os.environ.get("INFERENCE_QUEUE_SIZE", "32"))
+
+T = TypeVar("T")
+
+
+class InferenceQueueFull(RuntimeError):
+    """Raised when a caller asks not to wait and the inference queue is full."""
+
+
+class InferenceExecutor:
+    """Runs synchronous torch / HDBSCAN calls on dedicated worker threads.
+
+    At most ``max_pending`` calls are queued or running at once. Callers either
+    wait for a free slot (background tasks) or fail fast with
+    ``InferenceQueueFull`` (interactive endpoints), so the HTTP layer stays
+    responsive while the models are saturated.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = INFERENCE_WORKERS,
+        max_pending: int = INFERENCE_QUEUE_SIZE,
+    ) -> None:
+        self.max_workers = max(1, max_workers)
+        self.max_pending = max(self.max_workers, max_pending)
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_workers,
+            thread_name_prefix="inference",
+        )
+        self._slots = asyncio.Semaphore(self.max_pending)
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._active = 0
+        self._waiting = 0
+        self._rejected = 0
+        self._completed = 0
+
+    @property
+    def depth(self) -> int:
+        """Calls queued or running in the executor."""
+        return self._pending
+
+    @property
+    def is_full(self) -> bool:
+        return self._pending >= self.max_pending
+
+    def ensure_capacity(self) -> None:
+        if self.is_full:
+            self._rejected += 1
+            raise InferenceQueueFull(
+                f"Inference queue is full ({self._pending}/{self.max_pending})"
+            )
+
+    async def run(
+        self,
+        fn: Callable[..., T],
+        *args: Any,
+        wait: bool = True,
+        **kwargs: Any,
+    ) -> T:
+        if not wait:
+            self.ensure_capacity()
+
+        self._waiting += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self._waiting -= 1
+
+        self._pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self._executor,
+                partial(self._call, fn, *args, **kwargs),
+            )
+        finally:
+            self._pending -= 1
+            self._slots.release()
+
+    def _call(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        with self._lock:
+            self._active += 1
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            with self._lock:
+                self._active -= 1
+                self._completed += 1
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.max_workers,
+            "capacity": self.max_pending,
+            "depth": self._pending,
+            "active": self._active,
+            "waiting": self._waiting,
+            "rejected": self._rejected,
+            "completed": self._completed,
+        }
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
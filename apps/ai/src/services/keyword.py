@@ -1,25 +1,108 @@
+from __future__ import annotations
+
+import queue
+from contextlib import contextmanager
+from typing import Iterator
+
 import yake
 
+from src.services.result_cache import ResultCache
+
+# YAKE settings; part of the cache key so changing them invalidates old tags
+YAKE_LANGUAGE = "ko"
+YAKE_MAX_NGRAM = 2
+YAKE_DEDUP_LIMIT = 0.3
+# Most keywords YAKE is asked for; requests for more still get this many
+YAKE_MAX_KEYWORDS = 20
+
+
+def _new_extractor() -> yake.KeywordExtractor:
+    return yake.KeywordExtractor(
+        lan=YAKE_LANGUAGE,
+        n=YAKE_MAX_NGRAM,
+        dedupLim=YAKE_DEDUP_LIMIT,
+        top=YAKE_MAX_KEYWORDS,
+        features=None,
+    )
+
+
+def _set_top(extractor: yake.KeywordExtractor, top: int) -> None:
+    # Newer YAKE releases read settings from ``config``; older ones (still
+    # allowed by the dependency pin) keep them as attributes.
+    config = getattr(extractor, "config", None)
+    if isinstance(config, dict):
+        config["top"] = top
+    else:
+        extractor.top = top
+
 
 class KeywordService:
-    def __init__(self) -> None:
-        self.extractor = yake.KeywordExtractor(
-            lan="ko",
-            n=2,
-            dedupLim=0.3,
-            top=20,
-            features=None,
-        )
+    """YAKE keyword extraction over a pool of long-lived extractors.
+
+    Extractors keep their stopword set and similarity cache between calls,
+    but aren't safe to share, so each call checks one out of the pool and a
+    new one is only built when every pooled extractor is busy.
+    """
+
+    def __init__(self, cache: ResultCache | None = None) -> None:
+        self.cache = cache
+        self._extractors: queue.SimpleQueue[yake.KeywordExtractor] = queue.SimpleQueue()
+        self._extractors.put(_new_extractor())
+
+    @contextmanager
+    def _extractor(self, top_n: int) -> Iterator[yake.KeywordExtractor]:
+        try:
+            extractor = self._extractors.get_nowait()
+        except queue.Empty:
+            extractor = _new_extractor()
+        # YAKE's dedup pass walks candidates best-first and stops after
+        # ``top`` keywords, so asking for only top_n returns the same leading
+        # keywords without comparing the ones we'd slice off.
+        _set_top(extractor, min(max(top_n, 1), YAKE_MAX_KEYWORDS))
+        try:
+            yield extractor
+        finally:
+            self._extractors.put(extractor)
 
     def extract(self, text: str, top_n: int = 10) -> list[dict]:
         if not text or not text.strip():
             return []
 
-        keywords = self.extractor.extract_keywords(text)
+        cached = self.get_cached(text, top_n)
+        if cached is not None:
+            return cached
+
+        with self._extractor(top_n) as extractor:
+            keywords = extractor.extract_keywords(text)
         results = []
         for keyword, score in keywords[:top_n]:
             results.append({
                 "name": keyword,
                 "score": round(1.0 - score, 4),
             })
+
+        self.set_cached(text, top_n, results)
         return results
+
+    def extract_many(self, texts: list[str], top_n: int = 10) -> list[list[dict]]:
+        return [self.extract(text, top_n=top_n) for text in texts]
+
+    def _cache_key(self, text: str, top_n: int) -> str:
+        return ResultCache.make_key(
+            "tags",
+            "yake",
+            text,
+            top_n=top_n,
+            lan=YAKE_LANGUAGE,
+            n=YAKE_MAX_NGRAM,
+            dedup=YAKE_DEDUP_LIMIT,
+        )
+
+    def get_cached(self, text: str, top_n: int) -> list[dict] | None:
+        if self.cache is None:
+            return None
+        return self.cache.get(self._cache_key(text, top_n))
+
+    def set_cached(self, text: str, top_n: int, results: list[dict]) -> None:
+        if self.cache is not None:
+            self.cache.set(self._cache_key(text, top_n), results)
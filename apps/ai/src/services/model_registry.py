@@ -0,0 +1,77 @@
+"""Tracks background model loading so the server can serve before models are ready."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections.abc import Callable
+
+from fastapi import HTTPException, Request
+
+logger = logging.getLogger(__name__)
+
+
+class ModelRegistry:
+    """Per-model load state: ``pending`` -> ``loading`` -> ``ready`` | ``failed``."""
+
+    def __init__(self, names: list[str]) -> None:
+        self._status: dict[str, str] = {name: "pending" for name in names}
+        self._errors: dict[str, str] = {}
+        self._load_seconds: dict[str, float] = {}
+
+    def is_ready(self, name: str) -> bool:
+        return self._status.get(name) == "ready"
+
+    @property
+    def all_ready(self) -> bool:
+        return all(status == "ready" for status in self._status.values())
+
+    def mark_ready(self, name: str, seconds: float = 0.0) -> None:
+        self._status[name] = "ready"
+        self._load_seconds[name] = round(seconds, 2)
+
+    def load_sync(self, name: str, loader: Callable[[], None]) -> None:
+        """Run ``loader`` in the current thread and record the outcome."""
+        self._status[name] = "loading"
+        started = time.perf_counter()
+        try:
+            loader()
+        except Exception as exc:
+            self._status[name] = "failed"
+            self._errors[name] = repr(exc)
+            logger.exception("Failed to load model %s", name)
+            return
+        elapsed = time.perf_counter() - started
+        self.mark_ready(name, elapsed)
+        logger.info("Model %s ready in %.1fs", name, elapsed)
+
+    async def load(self, name: str, loader: Callable[[], None]) -> None:
+        """Run ``loader`` on a worker thread so the event loop keeps serving."""
+        await asyncio.to_thread(self.load_sync, name, loader)
+
+    def status(self) -> dict:
+        return {
+            name: {
+                "status": status,
+                "load_seconds": self._load_seconds.get(name),
+                "error": self._errors.get(name),
+            }
+            for name, status in self._status.items()
+        }
+
+
+def require_models(*names: str) -> Callable:
+    """FastAPI dependency that answers 503 until the given models are ready."""
+
+    async def dependency(request: Request) -> None:
+        registry: ModelRegistry = request.app.state.model_registry
+        missing = [name for name in names if not registry.is_ready(name)]
+        if missing:
+            raise HTTPException(
+                status_code=503,
+                detail=f"Models not ready: {', '.join(missing)}",
+                headers={"Retry-After": "5"},
+            )
+
+    return dependency
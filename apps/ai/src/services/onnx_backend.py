@@ -0,0 +1,217 @@
+"""ONNX Runtime backend with dynamic int8 quantization for KR-SBERT and KoBART.
+
+Requires the optional ``onnx`` extra (``pip install .[onnx]``). Models are
+exported from the Hugging Face checkpoints on first use, quantized, and cached
+under ``ONNX_MODEL_DIR`` so later starts only load the ``.onnx`` files.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import shutil
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+ONNX_MODEL_DIR = os.environ.get(
+    "ONNX_MODEL_DIR",
+    os.path.join(os.environ.get("MODEL_CACHE_DIR", "."), "onnx"),
+)
+ONNX_QUANTIZE = os.environ.get("ONNX_QUANTIZE", "1") == "1"
+ONNX_INTRA_OP_THREADS = int(os.environ.get("ONNX_INTRA_OP_THREADS", "0"))
+
+_SEQ2SEQ_PARTS = ("encoder_model", "decoder_model", "decoder_with_past_model")
+# Where SentenceTransformer reads the checkpoint's max_seq_length from
+_SBERT_CONFIG = "sentence_bert_config.json"
+
+
+def backend_tag() -> str:
+    """Suffix that keeps cached results from different backends apart."""
+    return "onnx-int8" if ONNX_QUANTIZE else "onnx-fp32"
+
+
+def _model_dir(model_name: str) -> Path:
+    return Path(ONNX_MODEL_DIR) / model_name.replace("/", "--")
+
+
+def _session_options() -> Any:
+    import onnxruntime as ort
+
+    options = ort.SessionOptions()
+    options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    if ONNX_INTRA_OP_THREADS > 0:
+        options.intra_op_num_threads = ONNX_INTRA_OP_THREADS
+    return options
+
+
+def _quantize(model_dir: Path, file_names: list[str]) -> None:
+    from optimum.onnxruntime import ORTQuantizer
+    from optimum.onnxruntime.configuration import AutoQuantizationConfig
+
+    qconfig = AutoQuantizationConfig.avx2(is_static=False, per_channel=False)
+    for file_name in file_names:
+        quantizer = ORTQuantizer.from_pretrained(model_dir, file_name=f"{file_name}.onnx")
+        quantizer.quantize(save_dir=model_dir, quantization_config=qconfig)
+
+
+def _file_name(part: str) -> str:
+    return f"{part}_quantized.onnx" if ONNX_QUANTIZE else f"{part}.onnx"
+
+
+class OnnxSentenceEncoder:
+    """Drop-in for the subset of ``SentenceTransformer`` the services use.
+
+    KR-SBERT uses mean pooling over the token embeddings, which is
+    reproduced here on top of the exported transformer.
+    """
+
+    def __init__(self, model: Any, tokenizer: Any, max_seq_length: int) -> None:
+        self.model = model
+        self.tokenizer = tokenizer
+        self.max_seq_length = max_seq_length
+
+    def encode(
+        self,
+        sentences: str | list[str],
+        normalize_embeddings: bool = False,
+        batch_size: int = 32,
+        **_: Any,
+    ) -> np.ndarray:
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+
+        outputs: list[np.ndarray] = []
+        for start in range(0, len(texts), batch_size):
+            batch = texts[start:start + batch_size]
+            inputs = self.tokenizer(
+                batch,
+                padding=True,
+                truncation=True,
+                max_length=self.max_seq_length,
+                return_tensors="np",
+            )
+            token_embeddings = self.model(**inputs).last_hidden_state
+            token_embeddings = np.asarray(token_embeddings, dtype=np.float32)
+
+            mask = inputs["attention_mask"][..., None].astype(np.float32)
+            summed = (token_embeddings * mask).sum(axis=1)
+            counts = np.clip(mask.sum(axis=1), 1e-9, None)
+            pooled = summed / counts
+
+            if normalize_embeddings:
+                norms = np.linalg.norm(pooled, axis=1, keepdims=True)
+                pooled = pooled / np.clip(norms, 1e-12, None)
+            outputs.append(pooled)
+
+        if not outputs:
+            return np.zeros((0, 0), dtype=np.float32)
+        embeddings = np.concatenate(outputs, axis=0)
+        return embeddings[0] if single else embeddings
+
+
+def _copy_sbert_config(model_name: str, model_dir: Path) -> None:
+    config_path = model_dir / _SBERT_CONFIG
+    if config_path.exists():
+        return
+    local = Path(model_name) / _SBERT_CONFIG
+    try:
+        if local.is_file():
+            shutil.copy(local, config_path)
+        else:
+            from huggingface_hub import hf_hub_download
+
+            shutil.copy(hf_hub_download(model_name, _SBERT_CONFIG), config_path)
+    except Exception:  # offline, not a hub model, or no such file
+        logger.warning("No %s for %s, using model limits", _SBERT_CONFIG, model_name)
+
+
+def _sbert_max_seq_length(
+    model_name: str,
+    model_dir: Path,
+    model: Any,
+    tokenizer: Any,
+) -> int:
+    """Truncation length as SentenceTransformer picks it for the checkpoint.
+
+    The configured ``max_seq_length`` is copied next to the exported model;
+    without one, the shorter of the position embeddings and the tokenizer
+    limit, as SentenceTransformer falls back to.
+    """
+    _copy_sbert_config(model_name, model_dir)
+    config_path = model_dir / _SBERT_CONFIG
+    if config_path.exists():
+        max_seq_length = json.loads(config_path.read_text()).get("max_seq_length")
+        if max_seq_length:
+            return int(max_seq_length)
+    return min(model.config.max_position_embeddings, tokenizer.model_max_length)
+
+
+def _export(model_name: str, model_dir: Path, task: str) -> None:
+    # main_export only writes files; with validation off it never opens an
+    # ONNX Runtime session, so a preforking master stays free of ORT threads
+    from optimum.exporters.onnx import main_export
+    from transformers import AutoTokenizer
+
+    logger.info("Exporting %s to ONNX at %s", model_name, model_dir)
+    main_export(model_name, output=model_dir, task=task, do_validation=False)
+    AutoTokenizer.from_pretrained(model_name).save_pretrained(model_dir)
+
+
+def prepare_sbert(model_name: str) -> Path:
+    """Export and quantize KR-SBERT into ONNX_MODEL_DIR without loading it."""
+    model_dir = _model_dir(model_name)
+    if not (model_dir / "model.onnx").exists():
+        _export(model_name, model_dir, "feature-extraction")
+    if not (model_dir / _file_name("model")).exists():
+        logger.info("Quantizing %s to int8", model_name)
+        _quantize(model_dir, ["model"])
+    _copy_sbert_config(model_name, model_dir)
+    return model_dir
+
+
+def prepare_kobart(model_name: str) -> Path:
+    """Export and quantize KoBART into ONNX_MODEL_DIR without loading it."""
+    model_dir = _model_dir(model_name)
+    if not (model_dir / "encoder_model.onnx").exists():
+        _export(model_name, model_dir, "text2text-generation-with-past")
+    if not (model_dir / _file_name("encoder_model")).exists():
+        logger.info("Quantizing %s to int8", model_name)
+        _quantize(model_dir, list(_SEQ2SEQ_PARTS))
+    return model_dir
+
+
+def load_sbert(model_name: str) -> OnnxSentenceEncoder:
+    from optimum.onnxruntime import ORTModelForFeatureExtraction
+    from transformers import AutoTokenizer
+
+    model_dir = prepare_sbert(model_name)
+    model = ORTModelForFeatureExtraction.from_pretrained(
+        model_dir,
+        file_name=_file_name("model"),
+        session_options=_session_options(),
+    )
+    tokenizer = AutoTokenizer.from_pretrained(model_dir)
+    max_seq_length = _sbert_max_seq_length(model_name, model_dir, model, tokenizer)
+    return OnnxSentenceEncoder(model, tokenizer, max_seq_length)
+
+
+def load_kobart(model_name: str) -> tuple[Any, Any]:
+    """Return ``(tokenizer, model)``; the model supports ``generate`` like the torch one."""
+    from optimum.onnxruntime import ORTModelForSeq2SeqLM
+    from transformers import AutoTokenizer
+
+    model_dir = prepare_kobart(model_name)
+    model = ORTModelForSeq2SeqLM.from_pretrained(
+        model_dir,
+        encoder_file_name=_file_name("encoder_model"),
+        decoder_file_name=_file_name("decoder_model"),
+        decoder_with_past_file_name=_file_name("decoder_with_past_model"),
+        session_options=_session_options(),
+    )
+    tokenizer = AutoTokenizer.from_pretrained(model_dir)
+    return tokenizer, model
@@ -2,17 +2,130 @@
 
 from __future__ import annotations
 
+import hashlib
 import logging
-import time
+from collections.abc import Hashable
+from dataclasses import dataclass
 
 import numpy as np
 
+from src.services.automaton import AhoCorasick
+
 logger = logging.getLogger(__name__)
 
+# Rounding can only reorder scores that are this close, so the partial sort
+# keeps every candidate within this margin of the k-th best raw score.
+_ROUNDING_MARGIN = 1e-4
+
+# Below this many project and milestone names, per-name str.find (in C) beats
+# walking the pure-Python automaton over the text.
+AUTOMATON_MIN_PATTERNS = 500
+
+
+@dataclass
+class _ProjectIndex:
+    """Everything about a project list that doesn't depend on the page."""
+
+    ids: list[str]
+    names: list[str]
+    centroids: np.ndarray  # (n_projects, dim) float32, rows L2-normalized
+    has_centroid: np.ndarray  # (n_projects,) bool
+    patterns: list[str]  # lowercased project and milestone names
+    automaton: AhoCorasick | None  # over ``patterns``, for long name lists
+    # Per automaton pattern: (project index, keyword score when it occurs)
+    pattern_targets: list[tuple[int, float]]
+    # Empty names are contained in every text
+    always_matched: np.ndarray  # (n_projects,) float64 keyword score
+
+
+def _build_index(projects: list[dict]) -> _ProjectIndex:
+    n = len(projects)
+    patterns: list[str] = []
+    targets: list[tuple[int, float]] = []
+    always = np.zeros(n, dtype=np.float64)
+
+    dim = 0
+    for proj in projects:
+        centroid = proj.get("centroid")
+        if centroid is not None and len(centroid) > 0:
+            dim = len(centroid)
+            break
+    centroids = np.zeros((n, dim), dtype=np.float32)
+    has_centroid = np.zeros(n, dtype=bool)
+
+    for i, proj in enumerate(projects):
+        for name, score in [(proj["name"], 1.0)] + [
+            (ms_name, 0.6) for ms_name in proj.get("milestone_names", [])
+        ]:
+            lowered = name.lower()
+            if lowered:
+                patterns.append(lowered)
+                targets.append((i, score))
+            else:
+                always[i] = max(always[i], score)
+
+        centroid = proj.get("centroid")
+        if centroid is not None and len(centroid) > 0:
+            if len(centroid) != dim:
+                raise ValueError(
+                    f"Project {proj['id']} centroid has {len(centroid)} dims, expected {dim}"
+                )
+            centroids[i] = centroid
+            has_centroid[i] = True
+
+    norms = np.linalg.norm(centroids, axis=1)
+    has_centroid &= norms > 0
+    centroids[has_centroid] /= norms[has_centroid, None]
+
+    return _ProjectIndex(
+        ids=[proj["id"] for proj in projects],
+        names=[proj["name"] for proj in projects],
+        centroids=centroids,
+        has_centroid=has_centroid,
+        patterns=patterns,
+        automaton=(
+            AhoCorasick(patterns) if len(patterns) >= AUTOMATON_MIN_PATTERNS else None
+        ),
+        pattern_targets=targets,
+        always_matched=always,
+    )
+
+
+def _projects_digest(projects: list[dict]) -> str:
+    """Hash everything _build_index reads from the project list."""
+    h = hashlib.sha1()
+    for proj in projects:
+        h.update(repr((proj["id"], proj["name"], proj.get("milestone_names", []))).encode())
+        centroid = proj.get("centroid")
+        if centroid is None:
+            h.update(b"\x00")
+        else:
+            h.update(np.asarray(centroid, dtype=np.float32).tobytes())
+            h.update(b"\x01")
+    return h.hexdigest()
+
 
 class ProjectMatcher:
     """Matches a page to candidate projects using 3-stage weighted scoring."""
 
+    def __init__(self) -> None:
+        self._key: tuple | None = None
+        self._index: _ProjectIndex | None = None
+
+    def _get_index(
+        self, projects: list[dict], version: Hashable | None
+    ) -> _ProjectIndex:
+        """Reuse the cached index while the project list is unchanged."""
+        if version is not None:
+            key = ("version", version)
+        else:
+            key = ("digest", _projects_digest(projects))
+        if self._index is None or self._key != key:
+            self._index = _build_index(projects)
+            self._key = key
+            logger.info("Built project index (%d projects)", len(projects))
+        return self._index
+
     def match(
         self,
         page_text: str,
@@ -20,6 +133,7 @@ class ProjectMatcher:
         projects: list[dict],
         recent_project_ids: list[str] | None = None,
         top_k: int = 3,
+        projects_version: Hashable | None = None,
     ) -> list[dict]:
         """
         Returns top-k project suggestions with confidence scores.
@@ -29,51 +143,65 @@ class ProjectMatcher:
           - name: str
           - milestone_names: list[str]
           - centroid: list[float] | None  (average embedding of project pages)
+
+        ``projects_version`` identifies the project list; while it is
+        unchanged the centroid matrix and name automaton are reused. Without
+        it the list is hashed to decide whether the cached index still holds.
         """
         if not projects:
             return []
 
+        index = self._get_index(projects, projects_version)
+
+        # 1. Keyword matching (0.3): project name 1.0, milestone name 0.6
+        keyword_scores = index.always_matched.copy()
+        text = page_text.lower()
+        if index.automaton is not None:
+            matched = index.automaton.matched(text)
+        else:
+            matched = [i for i, pattern in enumerate(index.patterns) if pattern in text]
+        for pattern in matched:
+            project, score = index.pattern_targets[pattern]
+            if score > keyword_scores[project]:
+                keyword_scores[project] = score
+
+        # 2. Embedding similarity (0.5)
+        embedding_scores = np.zeros(len(index.ids), dtype=np.float64)
+        if index.has_centroid.any():
+            page_vec = np.asarray(page_embedding, dtype=np.float32)
+            page_norm = np.linalg.norm(page_vec)
+            if page_norm > 0:
+                page_vec = page_vec / page_norm
+            sims = (index.centroids @ page_vec).astype(np.float64)
+            embedding_scores = np.where(
+                index.has_centroid, np.maximum(0.0, (sims + 1) / 2), 0.0
+            )
+
+        # 3. Recency context (0.2)
         recent_set = set(recent_project_ids or [])
-        page_vec = np.array(page_embedding)
-        page_norm = np.linalg.norm(page_vec)
-        if page_norm > 0:
-            page_vec = page_vec / page_norm
-
-        scored: list[dict] = []
-
-        for proj in projects:
-            # 1. Keyword matching (0.3)
-            keyword_score = 0.0
-            text_lower = page_text.lower()
-            if proj["name"].lower() in text_lower:
-                keyword_score = 1.0
-            else:
-                for ms_name in proj.get("milestone_names", []):
-                    if ms_name.lower() in text_lower:
-                        keyword_score = max(keyword_score, 0.6)
-
-            # 2. Embedding similarity (0.5)
-            embedding_score = 0.0
-            centroid = proj.get("centroid")
-            if centroid is not None and len(centroid) > 0:
-                c_vec = np.array(centroid)
-                c_norm = np.linalg.norm(c_vec)
-                if c_norm > 0:
-                    c_vec = c_vec / c_norm
-                    embedding_score = float(np.dot(page_vec, c_vec))
-                    embedding_score = max(0, (embedding_score + 1) / 2)
-
-            # 3. Recency context (0.2)
-            recency_score = 1.0 if proj["id"] in recent_set else 0.0
-
-            final = 0.3 * keyword_score + 0.5 * embedding_score + 0.2 * recency_score
-
-            if final > 0.1:
-                scored.append({
-                    "project_id": proj["id"],
-                    "project_name": proj["name"],
-                    "confidence": round(final, 4),
-                })
-
-        scored.sort(key=lambda x: x["confidence"], reverse=True)
+        recency_scores = np.fromiter(
+            (1.0 if pid in recent_set else 0.0 for pid in index.ids),
+            dtype=np.float64,
+            count=len(index.ids),
+        )
+
+        final = 0.3 * keyword_scores + 0.5 * embedding_scores + 0.2 * recency_scores
+
+        candidates = np.flatnonzero(final > 0.1)
+        if 0 < top_k < len(candidates):
+            kth = np.partition(final[candidates], -top_k)[-top_k]
+            candidates = candidates[final[candidates] >= kth - _ROUNDING_MARGIN]
+
+        scored = sorted(
+            (
+                {
+                    "project_id": index.ids[i],
+                    "project_name": index.names[i],
+                    "confidence": round(float(final[i]), 4),
+                }
+                for i in candidates
+            ),
+            key=lambda x: x["confidence"],
+            reverse=True,
+        )
         return scored[:top_k]
@@ -0,0 +1,323 @@
+"""Content-addressed cache for model outputs (embeddings, summaries, tags, types)."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from typing import Any
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+RESULT_CACHE_PATH = os.environ.get(
+    "RESULT_CACHE_PATH",
+    os.path.join(os.environ.get("MODEL_CACHE_DIR", "."), "result_cache.sqlite3"),
+)
+RESULT_CACHE_MEMORY_ITEMS = int(os.environ.get("RESULT_CACHE_MEMORY_ITEMS", "4096"))
+RESULT_CACHE_MAX_BYTES = int(
+    os.environ.get("RESULT_CACHE_MAX_BYTES", str(256 * 1024 * 1024))
+)
+
+# Evict down to this fraction of max_bytes so we don't evict on every write
+_EVICT_TARGET_RATIO = 0.9
+# Access times of disk hits are written at most this often when nothing else is
+_TOUCH_FLUSH_S = 5.0
+# Packed vectors start with a byte JSON never does
+_VECTOR_MAGIC = b"\0f4"
+
+
+def _decode_json(blob: bytes) -> Any:
+    return json.loads(blob)
+
+
+def _decode_vector(blob: bytes) -> np.ndarray:
+    if blob.startswith(_VECTOR_MAGIC):
+        vector = np.frombuffer(blob, dtype=np.float32, offset=len(_VECTOR_MAGIC))
+    else:
+        # Stored as a JSON list before vectors were packed
+        vector = np.asarray(json.loads(blob), dtype=np.float32)
+        vector.flags.writeable = False
+    return vector
+
+
+class ResultCache:
+    """Two-tier cache: an in-memory LRU backed by a size-bounded SQLite store.
+
+    Keys are derived from the stage name, the model name, the stage
+    parameters and a hash of the input text (see ``make_key``). Values must
+    be JSON-serializable; embeddings go through ``get_vector`` /
+    ``set_vector`` and are kept as packed float32, in memory and on disk.
+
+    Lookups read the database on the caller's thread. Writes and the access
+    times of disk hits are queued and committed in batches by a writer
+    thread, so neither ``set`` nor a hit waits for a commit.
+    """
+
+    def __init__(
+        self,
+        path: str | None = RESULT_CACHE_PATH,
+        memory_items: int = RESULT_CACHE_MEMORY_ITEMS,
+        max_bytes: int = RESULT_CACHE_MAX_BYTES,
+    ) -> None:
+        self.path = path
+        self.memory_items = max(0, memory_items)
+        self.max_bytes = max(0, max_bytes)
+        self._memory: OrderedDict[str, Any] = OrderedDict()
+        self._lock = threading.Lock()
+        self._read_lock = threading.Lock()
+        self._conn: sqlite3.Connection | None = None
+        self._writer_conn: sqlite3.Connection | None = None
+        self._disk_bytes = 0
+        # Queued for the writer thread: blobs to store, access times to record
+        self._pending = threading.Condition()
+        self._writes: dict[str, bytes] = {}
+        self._touches: dict[str, float] = {}
+        self._closing = False
+        self._writer: threading.Thread | None = None
+        self._stats = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "writes": 0,
+            "evictions": 0,
+        }
+        if path:
+            self._open(path)
+
+    @staticmethod
+    def make_key(stage: str, model: str, text: str, **params: Any) -> str:
+        header = json.dumps([stage, model, params], sort_keys=True)
+        digest = hashlib.sha256()
+        digest.update(header.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(text.encode("utf-8"))
+        return digest.hexdigest()
+
+    @staticmethod
+    def _connect(path: str) -> sqlite3.Connection:
+        conn = sqlite3.connect(path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _open(self, path: str) -> None:
+        try:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            writer_conn = self._connect(path)
+            writer_conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                " key TEXT PRIMARY KEY,"
+                " value BLOB NOT NULL,"
+                " size INTEGER NOT NULL,"
+                " accessed REAL NOT NULL)"
+            )
+            writer_conn.execute(
+                "CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed)"
+            )
+            writer_conn.commit()
+            row = writer_conn.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM entries"
+            ).fetchone()
+            self._disk_bytes = int(row[0])
+            # WAL lets lookups on this connection run while the writer commits
+            self._conn = self._connect(path)
+            self._writer_conn = writer_conn
+            logger.info(
+                "Result cache opened at %s (%.1f MB)",
+                path,
+                self._disk_bytes / (1024 * 1024),
+            )
+        except sqlite3.Error:
+            logger.exception("Failed to open result cache at %s, using memory only", path)
+            self._conn = None
+            self._writer_conn = None
+            return
+        self._writer = threading.Thread(
+            target=self._write_loop, name="result-cache-writer", daemon=True
+        )
+        self._writer.start()
+
+    def get(self, key: str) -> Any | None:
+        return self._get(key, _decode_json)
+
+    def get_many(self, keys: list[str]) -> dict[str, Any]:
+        found: dict[str, Any] = {}
+        for key in keys:
+            value = self.get(key)
+            if value is not None:
+                found[key] = value
+        return found
+
+    def set(self, key: str, value: Any) -> None:
+        blob = json.dumps(value, ensure_ascii=False).encode("utf-8")
+        self._set(key, value, blob)
+
+    def get_vector(self, key: str) -> list[float] | None:
+        vector = self._get(key, _decode_vector)
+        return None if vector is None else vector.tolist()
+
+    def get_vectors(self, keys: list[str]) -> dict[str, list[float]]:
+        found: dict[str, list[float]] = {}
+        for key in keys:
+            vector = self.get_vector(key)
+            if vector is not None:
+                found[key] = vector
+        return found
+
+    def set_vector(self, key: str, vector: list[float]) -> None:
+        # 4 bytes a value instead of a float object each, about 8x smaller
+        packed = np.asarray(vector, dtype=np.float32)
+        packed.flags.writeable = False
+        self._set(key, packed, _VECTOR_MAGIC + packed.tobytes())
+
+    def _get(self, key: str, decode: Callable[[bytes], Any]) -> Any | None:
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self._stats["memory_hits"] += 1
+                return self._memory[key]
+
+        value = self._disk_get(key, decode)
+        with self._lock:
+            if value is None:
+                self._stats["misses"] += 1
+                return None
+            self._stats["disk_hits"] += 1
+            self._memory_put(key, value)
+        return value
+
+    def _set(self, key: str, value: Any, blob: bytes) -> None:
+        with self._lock:
+            self._memory_put(key, value)
+            self._stats["writes"] += 1
+        if self._writer is None or len(blob) > self.max_bytes:
+            return
+        with self._pending:
+            self._writes[key] = blob
+            self._pending.notify()
+
+    def _memory_put(self, key: str, value: Any) -> None:
+        if self.memory_items == 0:
+            return
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_items:
+            self._memory.popitem(last=False)
+
+    def _disk_get(self, key: str, decode: Callable[[bytes], Any]) -> Any | None:
+        if self._conn is None:
+            return None
+        with self._pending:
+            blob = self._writes.get(key)
+        try:
+            if blob is None:
+                with self._read_lock:
+                    row = self._conn.execute(
+                        "SELECT value FROM entries WHERE key = ?", (key,)
+                    ).fetchone()
+                if row is None:
+                    return None
+                blob = row[0]
+                with self._pending:
+                    self._touches[key] = time.time()
+            return decode(blob)
+        except (sqlite3.Error, ValueError):
+            logger.exception("Result cache read failed")
+            return None
+
+    def _write_loop(self) -> None:
+        while True:
+            with self._pending:
+                if not self._writes and not self._closing:
+                    # Access times alone are flushed every few seconds
+                    self._pending.wait(_TOUCH_FLUSH_S)
+                writes, self._writes = self._writes, {}
+                touches, self._touches = self._touches, {}
+                closing = self._closing
+            if writes or touches:
+                self._flush(writes, touches)
+            if closing:
+                return
+
+    def _flush(self, writes: dict[str, bytes], touches: dict[str, float]) -> None:
+        conn = self._writer_conn
+        now = time.time()
+        try:
+            for key, blob in writes.items():
+                row = conn.execute(
+                    "SELECT size FROM entries WHERE key = ?", (key,)
+                ).fetchone()
+                conn.execute(
+                    "INSERT OR REPLACE INTO entries (key, value, size, accessed)"
+                    " VALUES (?, ?, ?, ?)",
+                    (key, blob, len(blob), now),
+                )
+                self._disk_bytes += len(blob) - (int(row[0]) if row else 0)
+            conn.executemany(
+                "UPDATE entries SET accessed = ? WHERE key = ?",
+                [(accessed, key) for key, accessed in touches.items()],
+            )
+            if self._disk_bytes > self.max_bytes:
+                self._evict()
+            conn.commit()
+        except sqlite3.Error:
+            logger.exception("Result cache write failed")
+            conn.rollback()
+
+    def _evict(self) -> None:
+        target = int(self.max_bytes * _EVICT_TARGET_RATIO)
+        rows = self._writer_conn.execute(
+            "SELECT key, size FROM entries ORDER BY accessed ASC"
+        )
+        victims: list[tuple[str]] = []
+        for key, size in rows:
+            if self._disk_bytes <= target:
+                break
+            victims.append((key,))
+            self._disk_bytes -= int(size)
+        rows.close()
+        self._writer_conn.executemany("DELETE FROM entries WHERE key = ?", victims)
+        with self._lock:
+            self._stats["evictions"] += len(victims)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = (
+                self._stats["memory_hits"]
+                + self._stats["disk_hits"]
+                + self._stats["misses"]
+            )
+            hits = self._stats["memory_hits"] + self._stats["disk_hits"]
+            return {
+                **self._stats,
+                "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+                "memory_items": len(self._memory),
+                "disk_bytes": self._disk_bytes,
+                "pending_writes": len(self._writes),
+                "persistent": self._conn is not None,
+            }
+
+    def close(self) -> None:
+        """Commit queued writes and close the database."""
+        if self._writer is not None:
+            with self._pending:
+                self._closing = True
+                self._pending.notify()
+            self._writer.join()
+            self._writer = None
+            self._writer_conn.close()
+            self._writer_conn = None
+        with self._read_lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
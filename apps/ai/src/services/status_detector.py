@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 import re
+from collections.abc import Iterable, Mapping
 
 # Completion patterns
 _DONE_PATTERNS = re.compile(
@@ -22,6 +23,15 @@ _BLOCK_PATTERNS = re.compile(
     re.IGNORECASE,
 )
 
+# Every pattern detect() scans the whole text with, in scan order, and the
+# signal each one reports
+SCAN_PATTERNS: tuple[re.Pattern[str], ...] = (
+    _DONE_PATTERNS,
+    _START_PATTERNS,
+    _BLOCK_PATTERNS,
+)
+_SIGNALS = ("done", "in_progress", "blocked")
+
 
 class StatusDetector:
     """Detects status change signals from text."""
@@ -33,34 +43,24 @@ class StatusDetector:
         """
         if not text or not text.strip():
             return []
+        return self.detect_from_matches(
+            text, {pattern: pattern.finditer(text) for pattern in SCAN_PATTERNS}
+        )
 
+    def detect_from_matches(
+        self, text: str, matches: Mapping[re.Pattern[str], Iterable[re.Match[str]]]
+    ) -> list[dict]:
+        """Build signals from precomputed ``finditer`` results per SCAN_PATTERNS entry."""
         signals: list[dict] = []
 
-        for m in _DONE_PATTERNS.finditer(text):
-            start = max(0, m.start() - 40)
-            end = min(len(text), m.end() + 40)
-            signals.append({
-                "signal": "done",
-                "keyword": m.group(0),
-                "context": text[start:end].strip(),
-            })
-
-        for m in _START_PATTERNS.finditer(text):
-            start = max(0, m.start() - 40)
-            end = min(len(text), m.end() + 40)
-            signals.append({
-                "signal": "in_progress",
-                "keyword": m.group(0),
-                "context": text[start:end].strip(),
-            })
-
-        for m in _BLOCK_PATTERNS.finditer(text):
-            start = max(0, m.start() - 40)
-            end = min(len(text), m.end() + 40)
-            signals.append({
-                "signal": "blocked",
-                "keyword": m.group(0),
-                "context": text[start:end].strip(),
-            })
+        for pattern, signal in zip(SCAN_PATTERNS, _SIGNALS):
+            for m in matches[pattern]:
+                start = max(0, m.start() - 40)
+                end = min(len(text), m.end() + 40)
+                signals.append({
+                    "signal": signal,
+                    "keyword": m.group(0),
+                    "context": text[start:end].strip(),
+                })
 
         return signals
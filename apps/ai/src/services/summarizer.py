@@ -1,44 +1,340 @@
+from __future__ import annotations
+
 import logging
+import os
+import re
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from src.services.result_cache import ResultCache
 
-from transformers import PreTrainedModel, PreTrainedTokenizerBase
+if TYPE_CHECKING:
+    from transformers import PreTrainedModel, PreTrainedTokenizerBase
 
 logger = logging.getLogger(__name__)
 
+# KoBART's positional embedding limit
+MAX_INPUT_TOKENS = 1024
+
+# Map-reduce settings for documents that don't fit in one window
+SUMMARY_CHUNK_TOKENS = int(os.environ.get("SUMMARY_CHUNK_TOKENS", "768"))
+SUMMARY_CHUNK_MAX_LENGTH = int(os.environ.get("SUMMARY_CHUNK_MAX_LENGTH", "128"))
+SUMMARY_BATCH_SIZE = int(os.environ.get("SUMMARY_BATCH_SIZE", "8"))
+MAX_REDUCE_DEPTH = 3
+
+
+@dataclass(frozen=True)
+class SummaryTier:
+    """Beam search settings plus a wall-clock budget for one summary."""
+
+    num_beams: int
+    max_length: int | None  # upper bound on the caller's max_length
+    min_length: int
+    no_repeat_ngram_size: int
+    deadline_s: float | None  # None means no time limit
+
+
+SUMMARY_TIERS: dict[str, SummaryTier] = {
+    "fast": SummaryTier(
+        num_beams=1,
+        max_length=64,
+        min_length=8,
+        no_repeat_ngram_size=3,
+        deadline_s=float(os.environ.get("SUMMARY_FAST_DEADLINE_S", "2")),
+    ),
+    "balanced": SummaryTier(
+        num_beams=2,
+        max_length=128,
+        min_length=12,
+        no_repeat_ngram_size=3,
+        deadline_s=float(os.environ.get("SUMMARY_BALANCED_DEADLINE_S", "8")),
+    ),
+    "full": SummaryTier(
+        num_beams=4,
+        max_length=None,
+        min_length=12,
+        no_repeat_ngram_size=3,
+        deadline_s=None,
+    ),
+}
+DEFAULT_TIER = "full"
+
+# Generation still finishes its current step after max_time, so never hand
+# generate a budget smaller than this once a deadline is nearly spent.
+_MIN_GENERATE_TIME_S = 0.2
+
+WARMUP_TEXT = "모델 워밍업을 위한 문장입니다. 첫 요청의 지연 시간을 줄이기 위해 실행됩니다."
+
+_PARAGRAPH_SPLIT = re.compile(r"\n\s*\n")
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?。])\s+|\n")
+
 
 class SummarizerService:
     def __init__(
         self,
         tokenizer: PreTrainedTokenizerBase,
         model: PreTrainedModel,
+        cache: ResultCache | None = None,
+        model_name: str = "",
     ) -> None:
         self.tokenizer = tokenizer
         self.model = model
+        self.cache = cache
+        self.model_name = model_name
+
+    def warmup(self) -> None:
+        """Run one uncached fast-tier generation so the first request isn't slow."""
+        self._generate([WARMUP_TEXT], 32, SUMMARY_TIERS["fast"], None)
+
+    def summarize(
+        self,
+        text: str,
+        max_length: int = 128,
+        chunked: bool = True,
+        tier: str = DEFAULT_TIER,
+    ) -> str:
+        """
+        Summarize text with KoBART.
+
+        Inputs longer than the model window are summarized map-reduce style
+        when ``chunked`` is set; otherwise they are truncated at 1024 tokens.
+        ``tier`` names an entry in SUMMARY_TIERS.
+        """
+        return self.summarize_many([text], max_length, chunked=chunked, tier=tier)[0]
+
+    def summarize_many(
+        self,
+        texts: list[str],
+        max_length: int | list[int] = 128,
+        chunked: bool = True,
+        tier: str = DEFAULT_TIER,
+    ) -> list[str]:
+        """
+        Summarize several texts with as few generate calls as possible.
+
+        ``max_length`` is either shared or given per text. Texts that share a
+        max_length are padded into one batched beam search; generate takes a
+        single max_length, so each distinct value costs one call.
+
+        The tier's deadline covers the whole call: when it runs out, generation
+        stops and the best hypothesis found so far is returned. Such cut-off
+        summaries are not cached, so a later call can produce the full one.
+        """
+        summary_tier = SUMMARY_TIERS[tier]
+        deadline = (
+            time.monotonic() + summary_tier.deadline_s
+            if summary_tier.deadline_s is not None
+            else None
+        )
+
+        if isinstance(max_length, int):
+            max_lengths = [max_length] * len(texts)
+        else:
+            max_lengths = list(max_length)
+            if len(max_lengths) != len(texts):
+                raise ValueError("max_length must have one entry per text")
+
+        summaries: list[str | None] = [None] * len(texts)
+        keys: dict[int, str] = {}
+        pending: list[int] = []
+        cut_off: set[int] = set()
 
-    def summarize(self, text: str, max_length: int = 128) -> str:
-        if not text or not text.strip():
-            return ""
+        for i, text in enumerate(texts):
+            if not text or not text.strip():
+                summaries[i] = ""
+                continue
 
-        stripped = text.strip()
-        if len(stripped) < 30:
-            return stripped
+            stripped = text.strip()
+            if len(stripped) < 30:
+                summaries[i] = stripped
+                continue
 
-        inputs = self.tokenizer(
-            stripped,
-            return_tensors="pt",
-            max_length=1024,
-            truncation=True,
+            if self.cache is not None:
+                keys[i] = ResultCache.make_key(
+                    "summary",
+                    self.model_name,
+                    stripped,
+                    max_length=max_lengths[i],
+                    chunked=chunked,
+                    tier=tier,
+                )
+                cached = self.cache.get(keys[i])
+                if cached is not None:
+                    summaries[i] = cached
+                    continue
+
+            pending.append(i)
+
+        if pending:
+            stripped_texts = [texts[i].strip() for i in pending]
+            long_items: set[int] = set()
+            if chunked:
+                token_counts = self._count_tokens(stripped_texts)
+                long_items = {
+                    i for i, count in zip(pending, token_counts)
+                    if count > MAX_INPUT_TOKENS
+                }
+
+            groups: dict[int, list[int]] = {}
+            for i in pending:
+                if i in long_items:
+                    summaries[i], timed_out = self._summarize_long(
+                        texts[i].strip(), max_lengths[i], summary_tier, deadline
+                    )
+                    if timed_out:
+                        cut_off.add(i)
+                else:
+                    groups.setdefault(max_lengths[i], []).append(i)
+
+            for group_length, indices in groups.items():
+                generated, timed_out = self._generate(
+                    [texts[i].strip() for i in indices],
+                    group_length,
+                    summary_tier,
+                    deadline,
+                )
+                for i, summary, hit_deadline in zip(indices, generated, timed_out):
+                    summaries[i] = summary
+                    if hit_deadline:
+                        cut_off.add(i)
+
+            if self.cache is not None:
+                for i in pending:
+                    if i not in cut_off:
+                        self.cache.set(keys[i], summaries[i])
+
+        return summaries
+
+    def _generate(
+        self,
+        texts: list[str],
+        max_length: int,
+        tier: SummaryTier,
+        deadline: float | None,
+    ) -> tuple[list[str], list[bool]]:
+        """Run one padded, batched beam search per SUMMARY_BATCH_SIZE texts.
+
+        Also returns, per text, whether its batch ran out of time, in which
+        case the summary may be cut short.
+        """
+        summaries: list[str] = []
+        timed_out: list[bool] = []
+        batch_size = max(1, SUMMARY_BATCH_SIZE)
+        if tier.max_length is not None:
+            max_length = min(max_length, tier.max_length)
+        min_length = min(tier.min_length, max_length)
+
+        for start in range(0, len(texts), batch_size):
+            batch = texts[start:start + batch_size]
+            inputs = self.tokenizer(
+                batch,
+                return_tensors="pt",
+                max_length=MAX_INPUT_TOKENS,
+                truncation=True,
+                padding=True,
+            )
+            inputs = {k: v.to(self.model.device) for k, v in inputs.items()}
+
+            generate_kwargs = {}
+            started = time.monotonic()
+            if deadline is not None:
+                generate_kwargs["max_time"] = max(
+                    deadline - started, _MIN_GENERATE_TIME_S
+                )
+
+            summary_ids = self.model.generate(
+                **inputs,
+                max_length=max_length,
+                min_length=min_length,
+                num_beams=tier.num_beams,
+                length_penalty=1.0,
+                no_repeat_ngram_size=tier.no_repeat_ngram_size,
+                early_stopping=tier.num_beams > 1,
+                **generate_kwargs,
+            )
+
+            summaries.extend(
+                self.tokenizer.batch_decode(summary_ids, skip_special_tokens=True)
+            )
+            # generate only stops early by checking elapsed time against max_time
+            hit_deadline = (
+                "max_time" in generate_kwargs
+                and time.monotonic() - started >= generate_kwargs["max_time"]
+            )
+            timed_out.extend([hit_deadline] * len(batch))
+
+        return summaries, timed_out
+
+    def _count_tokens(self, texts: list[str]) -> list[int]:
+        encoded = self.tokenizer(texts, add_special_tokens=False)["input_ids"]
+        return [len(ids) for ids in encoded]
+
+    def _split_chunks(self, text: str) -> list[str]:
+        """Greedily pack sentences into chunks of ~SUMMARY_CHUNK_TOKENS tokens.
+
+        Paragraph breaks are kept as newlines inside a chunk. A single sentence
+        longer than the budget becomes its own chunk and is truncated at the
+        model window.
+        """
+        sentences: list[str] = []
+        for paragraph in _PARAGRAPH_SPLIT.split(text):
+            parts = [s.strip() for s in _SENTENCE_SPLIT.split(paragraph)]
+            parts = [s for s in parts if s]
+            if parts:
+                # Mark the paragraph boundary with a newline on its last sentence
+                parts[-1] += "\n"
+                sentences.extend(parts)
+
+        if not sentences:
+            return []
+
+        chunks: list[str] = []
+        current: list[str] = []
+        current_tokens = 0
+        for sentence, tokens in zip(sentences, self._count_tokens(sentences)):
+            if current and current_tokens + tokens > SUMMARY_CHUNK_TOKENS:
+                chunks.append(" ".join(current).strip())
+                current, current_tokens = [], 0
+            current.append(sentence)
+            current_tokens += tokens
+
+        if current:
+            chunks.append(" ".join(current).strip())
+        return chunks
+
+    def _summarize_long(
+        self,
+        text: str,
+        max_length: int,
+        tier: SummaryTier,
+        deadline: float | None,
+        depth: int = 0,
+    ) -> tuple[str, bool]:
+        """Map-reduce summary, and whether any step ran out of time."""
+        chunks = self._split_chunks(text)
+        partials, timed_out = self._generate(
+            chunks, SUMMARY_CHUNK_MAX_LENGTH, tier, deadline
         )
-        inputs = {k: v.to(self.model.device) for k, v in inputs.items()}
-
-        summary_ids = self.model.generate(
-            **inputs,
-            max_length=max_length,
-            min_length=12,
-            num_beams=4,
-            length_penalty=1.0,
-            no_repeat_ngram_size=3,
-            early_stopping=True,
+        combined = "\n".join(p.strip() for p in partials if p.strip())
+
+        logger.debug(
+            "Map-reduce summary level %d: %d chunks -> %d chars",
+            depth,
+            len(chunks),
+            len(combined),
         )
 
-        summary = self.tokenizer.decode(summary_ids[0], skip_special_tokens=True)
-        return summary
+        if (
+            depth + 1 < MAX_REDUCE_DEPTH
+            and len(chunks) > 1
+            and self._count_tokens([combined])[0] > MAX_INPUT_TOKENS
+        ):
+            summary, reduce_timed_out = self._summarize_long(
+                combined, max_length, tier, deadline, depth + 1
+            )
+        else:
+            (summary,), (reduce_timed_out,) = self._generate(
+                [combined], max_length, tier, deadline
+            )
+        return summary, any(timed_out) or reduce_timed_out
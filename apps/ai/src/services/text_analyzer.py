@@ -0,0 +1,182 @@
+"""Rule-based text analysis shared by the /process pipeline."""
+
+from __future__ import annotations
+
+import logging
+import re
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from src.services.classifier import NOTE_TYPES, keyword_counts_from_matches
+from src.services.classifier import SCAN_PATTERNS as KEYWORD_PATTERNS
+from src.services.entity_extractor import SCAN_PATTERNS as ENTITY_PATTERNS
+from src.services.entity_extractor import EntityExtractor
+from src.services.status_detector import SCAN_PATTERNS as STATUS_PATTERNS
+from src.services.status_detector import StatusDetector
+from src.services.todo_extractor import SCAN_PATTERNS as TODO_PATTERNS
+from src.services.todo_extractor import TodoExtractor
+
+logger = logging.getLogger(__name__)
+
+# Non-ASCII characters that re.IGNORECASE treats as equal to an ASCII letter
+# but that str.lower() doesn't map onto it (the Kelvin sign already lowers
+# to "k").
+_IGNORECASE_EXTRA = str.maketrans({"İ": "i", "ı": "i", "ſ": "s"})
+
+# The gates read the parse tree from re's internal parser, which has no
+# stable API. If it moves or changes shape, every pattern is scanned
+# ungated, which gives the same matches as the per-service path.
+try:
+    from re import _constants as sre_constants
+    from re import _parser as sre_parser
+
+    _REPEATS = (
+        sre_constants.MAX_REPEAT,
+        sre_constants.MIN_REPEAT,
+        sre_constants.POSSESSIVE_REPEAT,
+    )
+except (ImportError, AttributeError):
+    sre_constants = sre_parser = None
+
+
+def _sequence_literals(items: list) -> set[str] | None:
+    """Strings of which every match of ``items`` must contain at least one.
+
+    Looks at each element of the sequence (all of them are required) and
+    keeps the most selective set found, i.e. the one whose shortest literal
+    is longest. Returns None when nothing can be guaranteed.
+    """
+    best: set[str] | None = None
+    run: list[str] = []
+
+    def consider(candidate: set[str] | None) -> None:
+        nonlocal best
+        if candidate and all(candidate):
+            if best is None or min(map(len, candidate)) > min(map(len, best)):
+                best = candidate
+
+    for op, av in list(items) + [(None, None)]:
+        if op is sre_constants.LITERAL:
+            run.append(chr(av))
+            continue
+        if run:
+            consider({"".join(run)})
+            run = []
+
+        if op is sre_constants.BRANCH:
+            branches = [_sequence_literals(branch) for branch in av[1]]
+            if all(branches):
+                consider(set().union(*branches))
+        elif op is sre_constants.SUBPATTERN:
+            _group, add_flags, del_flags, sub = av
+            if not add_flags and not del_flags:
+                consider(_sequence_literals(sub))
+        elif op is sre_constants.ATOMIC_GROUP:
+            consider(_sequence_literals(av))
+        elif op in _REPEATS:
+            low, _high, sub = av
+            if low >= 1:
+                consider(_sequence_literals(sub))
+
+    return best
+
+
+def _required_literals(pattern: re.Pattern[str]) -> tuple[str, ...] | None:
+    """Literal gate for ``pattern``: if none occurs in the text, it can't match.
+
+    Literals of IGNORECASE patterns are lowercased and only used when every
+    character is ASCII or uncased (e.g. Hangul), which keeps the gate exact
+    against the folded text built in TextAnalyzer.analyze. Returns None,
+    i.e. always scan, when re's parser isn't available.
+    """
+    if sre_parser is None:
+        return None
+    try:
+        parsed = sre_parser.parse(pattern.pattern, pattern.flags)
+        literals = _sequence_literals(list(parsed))
+    except Exception:
+        return None
+    if not literals:
+        return None
+    if pattern.flags & re.IGNORECASE:
+        if not all(ch.isascii() or ch.lower() == ch.upper() for lit in literals for ch in lit):
+            return None
+        literals = {lit.lower() for lit in literals}
+    return tuple(sorted(literals))
+
+
+@dataclass
+class TextAnalysis:
+    entities: list[dict] = field(default_factory=list)
+    todos: list[dict] = field(default_factory=list)
+    status_signals: list[dict] = field(default_factory=list)
+    # Per-note-type keyword match counts for ClassifierService.classify_many
+    keyword_counts: np.ndarray = field(
+        default_factory=lambda: np.zeros(len(NOTE_TYPES), dtype=np.float64)
+    )
+
+
+class TextAnalyzer:
+    """Runs the entity, todo, status and note-type keyword rules together.
+
+    The whole-text regexes of every service (their SCAN_PATTERNS) are
+    deduplicated and handed, with their matches, to the services'
+    ``*_from_matches`` methods, so the output is identical to calling
+    ``extract``/``detect`` on each service separately and the classifier
+    gets its keyword counts without rescanning the text.
+
+    Most notes only hit a few of the ~25 patterns, so each pattern carries a
+    gate of literals derived from its parse tree; cheap substring checks
+    skip the regex scan entirely when none of them occurs. Patterns are
+    still scanned one ``finditer`` at a time: joining them into a single
+    alternation or lookahead scanner defeats ``re``'s literal prefix search
+    and measured slower (see scripts/verify_text_analyzer.py).
+    """
+
+    def __init__(
+        self,
+        entity_extractor: EntityExtractor,
+        todo_extractor: TodoExtractor,
+        status_detector: StatusDetector,
+    ) -> None:
+        self.entity_extractor = entity_extractor
+        self.todo_extractor = todo_extractor
+        self.status_detector = status_detector
+        patterns = dict.fromkeys(
+            ENTITY_PATTERNS + TODO_PATTERNS + STATUS_PATTERNS + KEYWORD_PATTERNS
+        )
+        self._gates: list[tuple[re.Pattern[str], tuple[str, ...] | None, bool]] = [
+            (pattern, _required_literals(pattern), bool(pattern.flags & re.IGNORECASE))
+            for pattern in patterns
+        ]
+        logger.debug(
+            "Text analyzer: %d patterns, %d gated",
+            len(self._gates),
+            sum(1 for _, gate, _ in self._gates if gate),
+        )
+
+    def analyze(self, text: str) -> TextAnalysis:
+        if not text or not text.strip():
+            return TextAnalysis()
+
+        folded: str | None = None
+        matches: dict[re.Pattern[str], list[re.Match[str]]] = {}
+        for pattern, gate, ignore_case in self._gates:
+            if gate is not None:
+                haystack = text
+                if ignore_case:
+                    if folded is None:
+                        folded = text.translate(_IGNORECASE_EXTRA).lower()
+                    haystack = folded
+                if not any(literal in haystack for literal in gate):
+                    matches[pattern] = []
+                    continue
+            matches[pattern] = list(pattern.finditer(text))
+
+        return TextAnalysis(
+            entities=self.entity_extractor.extract_from_matches(text, matches),
+            todos=self.todo_extractor.extract_from_matches(matches),
+            status_signals=self.status_detector.detect_from_matches(text, matches),
+            keyword_counts=keyword_counts_from_matches(matches),
+        )
@@ -0,0 +1,143 @@
+"""Process pool for the CPU-bound, pure-Python text stages (YAKE and regex rules)."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from src.services.entity_extractor import EntityExtractor
+from src.services.keyword import KeywordService
+from src.services.status_detector import StatusDetector
+from src.services.text_analyzer import TextAnalysis, TextAnalyzer
+from src.services.todo_extractor import TodoExtractor
+
+logger = logging.getLogger(__name__)
+
+# 0 keeps the text stages in-process on the event loop thread
+TEXT_POOL_WORKERS = int(os.environ.get("TEXT_POOL_WORKERS", "0"))
+
+# Built once per worker process by _init_worker
+_worker_keywords: KeywordService | None = None
+_worker_analyzer: TextAnalyzer | None = None
+
+
+def _init_worker() -> None:
+    global _worker_keywords, _worker_analyzer
+    _worker_keywords = KeywordService()
+    _worker_analyzer = TextAnalyzer(EntityExtractor(), TodoExtractor(), StatusDetector())
+
+
+def _extract_keywords(text: str, top_n: int) -> list[dict]:
+    return _worker_keywords.extract(text, top_n=top_n)
+
+
+def _extract_keywords_batch(texts: list[str], top_n: int) -> list[list[dict]]:
+    return _worker_keywords.extract_many(texts, top_n=top_n)
+
+
+def _analyze(text: str, known_projects: tuple[str, ...]) -> TextAnalysis:
+    extractor = _worker_analyzer.entity_extractor
+    if tuple(extractor.known_projects) != known_projects:
+        extractor.set_known_projects(list(known_projects))
+    return _worker_analyzer.analyze(text)
+
+
+class TextPool:
+    """Runs keyword extraction and text analysis in worker processes.
+
+    YAKE and the regex extractors are pure Python and hold the GIL, so on
+    threads they stall the event loop and the inference threads alike. With
+    ``workers > 0`` they run in a spawned process pool whose workers build
+    their own extractors once at startup; with 0 they run inline exactly as
+    before. Cache lookups stay in this process so hits never cross the pool.
+    """
+
+    def __init__(
+        self,
+        keyword_service: KeywordService,
+        text_analyzer: TextAnalyzer,
+        workers: int = TEXT_POOL_WORKERS,
+    ) -> None:
+        self.keyword_service = keyword_service
+        self.text_analyzer = text_analyzer
+        self.workers = max(0, workers)
+        self._executor: ProcessPoolExecutor | None = None
+        if self.workers:
+            # spawn, not fork: the parent already runs the event loop and
+            # inference threads, which a forked child would inherit broken.
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+            )
+            logger.info("Text process pool started with %d workers", self.workers)
+
+    async def extract_keywords(self, text: str, top_n: int = 10) -> list[dict]:
+        if self._executor is None:
+            return self.keyword_service.extract(text, top_n=top_n)
+        if not text or not text.strip():
+            return []
+
+        # Cache lookups may read SQLite, so they run on a thread as well
+        loop = asyncio.get_running_loop()
+        cached = await loop.run_in_executor(
+            None, self.keyword_service.get_cached, text, top_n
+        )
+        if cached is not None:
+            return cached
+
+        tags = await loop.run_in_executor(self._executor, _extract_keywords, text, top_n)
+        self.keyword_service.set_cached(text, top_n, tags)
+        return tags
+
+    async def extract_keywords_many(self, texts: list[str], top_n: int = 10) -> list[list[dict]]:
+        """Tags for each text, in order; misses are split evenly across workers."""
+        if self._executor is None:
+            return self.keyword_service.extract_many(texts, top_n=top_n)
+
+        loop = asyncio.get_running_loop()
+        unique = [text for text in dict.fromkeys(texts) if text and text.strip()]
+        cached = await loop.run_in_executor(None, self._get_cached_many, unique, top_n)
+
+        results: dict[str, list[dict]] = {
+            text: [] for text in texts if not text or not text.strip()
+        }
+        misses: list[str] = []
+        for text, tags in zip(unique, cached):
+            if tags is not None:
+                results[text] = tags
+            else:
+                misses.append(text)
+
+        if misses:
+            chunks = [misses[i::self.workers] for i in range(min(self.workers, len(misses)))]
+            batches = await asyncio.gather(*(
+                loop.run_in_executor(self._executor, _extract_keywords_batch, chunk, top_n)
+                for chunk in chunks
+            ))
+            for chunk, tags_list in zip(chunks, batches):
+                for text, tags in zip(chunk, tags_list):
+                    self.keyword_service.set_cached(text, top_n, tags)
+                    results[text] = tags
+
+        return [results[text] for text in texts]
+
+    def _get_cached_many(self, texts: list[str], top_n: int) -> list[list[dict] | None]:
+        return [self.keyword_service.get_cached(text, top_n) for text in texts]
+
+    async def analyze(self, text: str) -> TextAnalysis:
+        if self._executor is None:
+            return self.text_analyzer.analyze(text)
+        if not text or not text.strip():
+            return TextAnalysis()
+
+        known_projects = tuple(self.text_analyzer.entity_extractor.known_projects)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, _analyze, text, known_projects)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,225 @@
+"""Corpus-aware TF-IDF tagging, a fast alternative to YAKE."""
+
+from __future__ import annotations
+
+import logging
+import os
+import re
+
+import numpy as np
+from scipy import sparse
+
+logger = logging.getLogger(__name__)
+
+_SENTENCE_SPLIT = re.compile(r"[.!?。\n]+")
+_WORD = re.compile(r"[0-9A-Za-z가-힣]+")
+_HANGUL = re.compile(r"[가-힣]")
+
+# Particles and common verb endings stripped from Hangul words, longest first
+_SUFFIXES = tuple(sorted(
+    (
+        "에서는", "으로는", "에게는", "이라는", "에서", "으로", "에게", "까지", "부터",
+        "보다", "처럼", "이나", "라는", "하는", "하기", "하고", "했다", "한다", "하여",
+        "해서", "은", "는", "이", "가", "을", "를", "에", "의", "로", "와", "과", "도", "만",
+    ),
+    key=len,
+    reverse=True,
+))
+
+# Term ids grow in chunks so document-frequency updates stay amortized O(1)
+_INITIAL_CAPACITY = 4096
+# Most distinct terms kept in the statistics. Past this, terms no page uses
+# any more are dropped, then the rarest, down to three quarters of the cap.
+TFIDF_MAX_TERMS = int(os.environ.get("TFIDF_MAX_TERMS", "200000"))
+
+
+_NO_TERMS = np.empty(0, dtype=np.int64)
+
+
+def _normalize(word: str) -> str:
+    if not _HANGUL.search(word):
+        return word.lower()
+    for suffix in _SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 2:
+            return word[: -len(suffix)]
+    return word
+
+
+def _candidates(text: str) -> list[str]:
+    """Word unigrams and in-sentence bigrams, after particle stripping."""
+    terms: list[str] = []
+    for sentence in _SENTENCE_SPLIT.split(text):
+        words = [
+            _normalize(w) for w in _WORD.findall(sentence)
+            if len(w) >= 2 and not w.isdigit()
+        ]
+        terms.extend(words)
+        terms.extend(f"{a} {b}" for a, b in zip(words, words[1:]) if a != b)
+    return terms
+
+
+class TfidfTagger:
+    """Tags pages by TF-IDF against document frequencies of the workspace.
+
+    Every tagged or observed page updates the document frequencies, keyed by
+    page id, so re-processing a page replaces its previous terms instead of
+    counting them twice, and a page whose text is now empty drops out. Texts
+    without a page id (the /tag endpoints) are scored against the statistics
+    but don't change them. Terms that appear on most pages, like template
+    headings, sink below the ones that distinguish a page.
+
+    A batch is scored at once as a sparse (documents x terms) matrix with
+    sublinear term frequency, smoothed idf and L2 row normalization, the
+    same weighting as sklearn's TfidfVectorizer. Statistics live in memory
+    and are rebuilt as pages are processed; each worker process keeps its
+    own. Not thread-safe: call it from the event loop.
+    """
+
+    def __init__(self) -> None:
+        self._vocab: dict[str, int] = {}
+        self._terms: list[str] = []
+        self._df = np.zeros(_INITIAL_CAPACITY, dtype=np.int64)
+        self._doc_terms: dict[str, np.ndarray] = {}
+
+    @property
+    def document_count(self) -> int:
+        return len(self._doc_terms)
+
+    def _term_ids(self, text: str, unseen: dict[str, int] | None = None) -> np.ndarray:
+        """Term ids of ``text``, adding new terms to the vocabulary.
+
+        With ``unseen``, new terms are numbered after the vocabulary in that
+        dict instead, leaving the statistics untouched.
+        """
+        ids = []
+        for term in _candidates(text):
+            index = self._vocab.get(term)
+            if index is None:
+                if unseen is not None:
+                    index = unseen.setdefault(term, len(self._terms) + len(unseen))
+                else:
+                    index = len(self._terms)
+                    self._vocab[term] = index
+                    self._terms.append(term)
+            ids.append(index)
+        if len(self._terms) > len(self._df):
+            grown = np.zeros(max(len(self._terms), 2 * len(self._df)), dtype=np.int64)
+            grown[: len(self._df)] = self._df
+            self._df = grown
+        return np.asarray(ids, dtype=np.int64)
+
+    def _update(self, doc_id: str, term_ids: np.ndarray) -> None:
+        previous = self._doc_terms.pop(doc_id, None)
+        if previous is not None:
+            self._df[previous] -= 1
+        if not len(term_ids):
+            return
+        unique = np.unique(term_ids)
+        self._df[unique] += 1
+        self._doc_terms[doc_id] = unique
+
+    def _prune(self) -> None:
+        if len(self._terms) <= TFIDF_MAX_TERMS:
+            return
+        df = self._df[: len(self._terms)]
+        keep = np.flatnonzero(df)
+        target = TFIDF_MAX_TERMS * 3 // 4
+        if len(keep) > target:
+            keep = np.sort(keep[np.argsort(-df[keep], kind="stable")[:target]])
+
+        remap = np.full(len(self._terms), -1, dtype=np.int64)
+        remap[keep] = np.arange(len(keep))
+        for doc_id, ids in self._doc_terms.items():
+            ids = remap[ids]
+            self._doc_terms[doc_id] = ids[ids >= 0]
+        dropped = len(self._terms) - len(keep)
+        self._terms = [self._terms[i] for i in keep]
+        self._vocab = {term: i for i, term in enumerate(self._terms)}
+        pruned_df = np.zeros(max(_INITIAL_CAPACITY, 2 * len(keep)), dtype=np.int64)
+        pruned_df[: len(keep)] = df[keep]
+        self._df = pruned_df
+        logger.info("TF-IDF vocabulary pruned: %d terms dropped, %d kept", dropped, len(keep))
+
+    def observe_many(self, texts: list[str], doc_ids: list[str]) -> None:
+        """Add pages to the statistics without tagging them."""
+        for doc_id, text in zip(doc_ids, texts):
+            has_text = bool(text and text.strip())
+            self._update(doc_id, self._term_ids(text) if has_text else _NO_TERMS)
+        self._prune()
+
+    def extract_many(
+        self,
+        texts: list[str],
+        top_n: int = 10,
+        doc_ids: list[str] | None = None,
+    ) -> list[list[dict]]:
+        """Tags for each text, in the same ``{"name", "score"}`` shape as YAKE.
+
+        Only texts with ``doc_ids`` update the statistics.
+        """
+        unseen: dict[str, int] | None = {} if doc_ids is None else None
+        rows: list[np.ndarray] = []
+        for i, text in enumerate(texts):
+            term_ids = self._term_ids(text, unseen) if text and text.strip() else _NO_TERMS
+            if doc_ids is not None:
+                self._update(doc_ids[i], term_ids)
+            rows.append(term_ids)
+
+        try:
+            return self._score(rows, top_n, list(unseen or ()))
+        finally:
+            self._prune()
+
+    def _score(self, rows: list[np.ndarray], top_n: int, unseen: list[str]) -> list[list[dict]]:
+        lengths = np.fromiter((len(r) for r in rows), dtype=np.int64, count=len(rows))
+        if not lengths.sum() or top_n < 1:
+            return [[] for _ in rows]
+
+        # Duplicate (row, term) entries are summed into term counts
+        counts = sparse.csr_matrix(
+            (
+                np.ones(int(lengths.sum()), dtype=np.float64),
+                (np.repeat(np.arange(len(rows)), lengths), np.concatenate(rows)),
+            ),
+            shape=(len(rows), len(self._terms) + len(unseen)),
+        )
+        counts.sum_duplicates()
+
+        n_docs = self.document_count
+        df = self._df[: len(self._terms)]
+        if unseen:
+            df = np.concatenate([df, np.zeros(len(unseen), dtype=np.int64)])
+        idf = np.log((1 + n_docs) / (1 + df)) + 1.0
+        weights = counts.copy()
+        weights.data = (1.0 + np.log(weights.data)) * idf[weights.indices]
+        norms = np.sqrt(np.asarray(weights.multiply(weights).sum(axis=1)).ravel())
+        weights = sparse.diags(1.0 / np.where(norms > 0, norms, 1.0)) @ weights
+        weights = weights.tocsr()
+
+        results = []
+        for row in range(len(rows)):
+            start, end = weights.indptr[row], weights.indptr[row + 1]
+            results.append(self._top_terms(
+                weights.indices[start:end], weights.data[start:end], top_n, unseen
+            ))
+        return results
+
+    def _top_terms(
+        self, term_ids: np.ndarray, scores: np.ndarray, top_n: int, unseen: list[str]
+    ) -> list[dict]:
+        # Best first, ties in first-seen order; a term sharing a word with an
+        # already chosen tag is a near-duplicate of it and is skipped
+        chosen: list[dict] = []
+        chosen_words: set[str] = set()
+        known = len(self._terms)
+        for i in np.lexsort((term_ids, -scores)):
+            index = term_ids[i]
+            term = self._terms[index] if index < known else unseen[index - known]
+            words = term.split(" ")
+            if chosen_words.intersection(words):
+                continue
+            chosen.append({"name": term, "score": round(float(scores[i]), 4)})
+            chosen_words.update(words)
+            if len(chosen) == top_n:
+                break
+        return chosen
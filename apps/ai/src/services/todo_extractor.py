@@ -5,6 +5,7 @@ from __future__ import annotations
 import json
 import logging
 import re
+from collections.abc import Iterable, Mapping
 
 logger = logging.getLogger(__name__)
 
@@ -15,6 +16,9 @@ _TODO_PATTERNS = [
     re.compile(r"^[\s]*[-*]\s*(.+(?:해야\s*함|필요|할\s*것|하기))", re.MULTILINE),  # Korean patterns
 ]
 
+# Every pattern extract() scans the whole text with, in scan order
+SCAN_PATTERNS: tuple[re.Pattern[str], ...] = tuple(_TODO_PATTERNS)
+
 # Priority keywords
 _PRIORITY_KEYWORDS = {
     "urgent": re.compile(r"긴급|urgent|ASAP|즉시|바로", re.I),
@@ -38,12 +42,19 @@ class TodoExtractor:
     def extract(self, plain_text: str) -> list[dict]:
         if not plain_text or not plain_text.strip():
             return []
-
+        return self.extract_from_matches(
+            {pattern: pattern.finditer(plain_text) for pattern in SCAN_PATTERNS}
+        )
+
+    def extract_from_matches(
+        self, matches: Mapping[re.Pattern[str], Iterable[re.Match[str]]]
+    ) -> list[dict]:
+        """Build todos from precomputed ``finditer`` results per SCAN_PATTERNS entry."""
         todos: list[dict] = []
         seen_titles: set[str] = set()
 
-        for pattern in _TODO_PATTERNS:
-            for m in pattern.finditer(plain_text):
+        for pattern in SCAN_PATTERNS:
+            for m in matches[pattern]:
                 raw_title = m.group(1).strip()
                 title = self._clean_title(raw_title)
 
@@ -0,0 +1,33 @@
+"""Packed float vectors on the wire between the sidecar and the web app."""
+
+from __future__ import annotations
+
+import base64
+from collections.abc import Sequence
+
+import numpy as np
+
+from src.models.schemas import VectorEncoding
+
+# The web app stores vectors as little-endian float32 blobs
+_F32 = np.dtype("<f4")
+_DTYPES = {"f32": _F32, "f16": np.dtype("<f2")}
+
+
+def encode_vector(
+    vector: Sequence[float],
+    encoding: VectorEncoding = "json",
+) -> list[float] | str:
+    """``vector`` as sent for ``encoding``: the float list itself for "json"."""
+    if encoding == "json":
+        return vector if isinstance(vector, list) else list(map(float, vector))
+    packed = np.asarray(vector, dtype=_DTYPES[encoding]).tobytes()
+    return base64.b64encode(packed).decode("ascii")
+
+
+def decode_f32(data: str, dim: int) -> np.ndarray:
+    """(N x dim) read-only view over base64-packed little-endian float32 rows."""
+    raw = base64.b64decode(data)
+    if dim <= 0 or len(raw) % (dim * _F32.itemsize):
+        raise ValueError(f"{len(raw)} bytes is not a whole number of {dim}-d float32 rows")
+    return np.frombuffer(raw, dtype=_F32).reshape(-1, dim)
@@ -0,0 +1,73 @@
+import asyncio
+
+import pytest
+
+from src.services.batcher import EmbeddingBatcher
+
+
+class _Embeddings:
+    def __init__(self):
+        self.batches = []
+
+    def encode_batch(self, texts):
+        self.batches.append(list(texts))
+        return [[float(len(text))] for text in texts]
+
+
+class _Executor:
+    def __init__(self, gate=None):
+        self.gate = gate
+
+    async def run(self, fn, *args):
+        if self.gate is not None:
+            await self.gate.wait()
+        return fn(*args)
+
+
+def test_concurrent_calls_share_a_batch():
+    embeddings = _Embeddings()
+
+    async def run():
+        batcher = EmbeddingBatcher(embeddings, _Executor(), max_wait_ms=20)
+        vectors = await asyncio.gather(*(batcher.encode(t) for t in ["a", "bb", "a"]))
+        await batcher.close()
+        return vectors
+
+    assert asyncio.run(run()) == [[1.0], [2.0], [1.0]]
+    assert embeddings.batches == [["a", "bb"]]
+
+
+def test_close_fails_waiting_callers():
+    async def run():
+        batcher = EmbeddingBatcher(_Embeddings(), _Executor(gate=asyncio.Event()), max_batch_size=1)
+        # The first text is stuck in a flush, the second still queued
+        calls = [asyncio.create_task(batcher.encode(t)) for t in ["a", "b"]]
+        await asyncio.sleep(0.01)
+        await batcher.close()
+        results = await asyncio.wait_for(asyncio.gather(*calls, return_exceptions=True), 1)
+        with pytest.raises(RuntimeError):
+            await batcher.encode("c")
+        return results
+
+    results = asyncio.run(run())
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+
+def test_dead_worker_fails_its_callers_and_restarts():
+    embeddings = _Embeddings()
+
+    async def run():
+        gate = asyncio.Event()
+        batcher = EmbeddingBatcher(embeddings, _Executor(gate=gate), max_wait_ms=0)
+        stuck = asyncio.create_task(batcher.encode("a"))
+        await asyncio.sleep(0.01)
+        batcher._worker.cancel()
+        result = await asyncio.wait_for(asyncio.gather(stuck, return_exceptions=True), 1)
+        gate.set()
+        vector = await asyncio.wait_for(batcher.encode("bb"), 1)
+        await batcher.close()
+        return result[0], vector
+
+    error, vector = asyncio.run(run())
+    assert isinstance(error, RuntimeError)
+    assert vector == [2.0]
@@ -0,0 +1,269 @@
+import asyncio
+import base64
+import json
+import sqlite3
+
+import httpx
+import numpy as np
+import pytest
+
+from src.models.schemas import AIProcessingResult
+from src.services import callback
+from src.services.callback import CallbackService
+from src.services.callback_outbox import CallbackOutbox
+
+URL = "http://web/api/ai/callback"
+
+
+@pytest.fixture(autouse=True)
+def fast_timings(monkeypatch):
+    monkeypatch.setattr(callback, "CALLBACK_BACKOFF_BASE_S", 0.01)
+    monkeypatch.setattr(callback, "CALLBACK_BACKOFF_MAX_S", 0.05)
+    monkeypatch.setattr(callback, "CALLBACK_BREAKER_COOLDOWN_S", 0.1)
+    monkeypatch.setattr(callback, "CALLBACK_DRAIN_TIMEOUT_S", 0.1)
+    monkeypatch.setattr(callback, "_POLL_S", 0.05)
+
+
+class _WebApp:
+    """Transport handler playing the web app."""
+
+    def __init__(self, up=True, latency=0.0, failures=0):
+        self.up = up
+        self.latency = latency
+        self.failures = failures
+        self.active = 0
+        self.peak = 0
+        self.received = []
+
+    async def __call__(self, request):
+        if not self.up:
+            raise httpx.ConnectError("connection refused", request=request)
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(self.latency)
+            if self.failures > 0:
+                self.failures -= 1
+                return httpx.Response(503)
+            self.received.append(json.loads(request.content))
+            return httpx.Response(200)
+        finally:
+            self.active -= 1
+
+
+def _service(path, web):
+    service = CallbackService(outbox_path=path)
+    service.client = httpx.AsyncClient(transport=httpx.MockTransport(web))
+    return service
+
+
+def _result(page_id, summary="요약"):
+    return AIProcessingResult(
+        page_id=page_id, note_type="idea", tags=[], summary=summary,
+        embedding=[0.1] * 4, confidence=0.5,
+    )
+
+
+async def _wait_delivered(service, timeout=5.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while service.stats()["pending"] and asyncio.get_running_loop().time() < deadline:
+        await asyncio.sleep(0.01)
+
+
+def test_callbacks_survive_an_outage_and_a_restart(tmp_path):
+    path = str(tmp_path / "outbox.sqlite3")
+    web = _WebApp(up=False)
+
+    async def run():
+        service = _service(path, web)
+        for i in range(20):
+            assert await service.send_ai_results(URL, _result(f"page-{i}"))
+        assert await service.send_report(URL, {"type": "daily"})
+        await asyncio.sleep(0.2)
+        stats = service.stats()
+        await service.close()
+        assert stats["open_circuits"] == ["web"]
+        assert stats["pending"] == 21
+
+        web.up = True
+        web.failures = 3
+        service = _service(path, web)
+        service.start()
+        await _wait_delivered(service)
+        stats = service.stats()
+        await service.close()
+        return stats
+
+    stats = asyncio.run(run())
+    assert stats["pending"] == 0 and stats["dead"] == 0
+    page_ids = sorted(body["pageId"] for body in web.received if "pageId" in body)
+    assert page_ids == sorted(f"page-{i}" for i in range(20))
+    assert {"type": "daily"} in web.received
+
+
+def test_newer_result_for_a_page_replaces_the_queued_one():
+    web = _WebApp(up=False)
+
+    async def run():
+        service = _service(None, web)
+        await service.send_ai_results(URL, _result("page", summary="first"))
+        await service.send_ai_results(URL, _result("page", summary="second"))
+        assert service.stats()["pending"] == 1
+        web.up = True
+        await _wait_delivered(service)
+        await service.close()
+
+    asyncio.run(run())
+    assert [body["summary"] for body in web.received] == ["second"]
+
+
+def test_client_errors_are_kept_as_dead_entries():
+    async def reject(request):
+        return httpx.Response(400)
+
+    async def run():
+        service = _service(None, reject)
+        await service.send_report(URL, {"type": "daily"})
+        await _wait_delivered(service)
+        stats = service.stats()
+        await service.close()
+        return stats
+
+    stats = asyncio.run(run())
+    assert stats["pending"] == 0 and stats["dead"] == 1
+
+
+@pytest.mark.parametrize("url", ["http://web:port/callback", "ftp://web/callback", "/callback"])
+def test_unsendable_urls_are_not_queued(url):
+    async def run():
+        service = _service(None, _WebApp())
+        assert not await service.send_report(url, {"type": "daily"})
+        stats = service.stats()
+        await service.close()
+        return stats
+
+    stats = asyncio.run(run())
+    assert stats["pending"] == 0 and stats["dead"] == 0
+
+
+def test_unsendable_queued_entries_are_kept_as_dead_entries(tmp_path):
+    path = str(tmp_path / "outbox.sqlite3")
+    # Queued by an older version that didn't check the URL
+    outbox = CallbackOutbox(path)
+    outbox.add("http://web:port/callback", "web:port", b"{}", {})
+    outbox.close()
+    web = _WebApp()
+
+    async def run():
+        service = _service(path, web)
+        service.start()
+        await _wait_delivered(service)
+        stats = service.stats()
+        await service.close()
+        return stats
+
+    stats = asyncio.run(run())
+    assert stats["pending"] == 0 and stats["dead"] == 1
+    assert web.received == []
+
+
+def test_host_limit_holds_within_a_worker(monkeypatch):
+    monkeypatch.setattr(callback, "CALLBACK_HOST_CONCURRENCY", 3)
+    web = _WebApp(latency=0.02)
+
+    async def run():
+        service = _service(None, web)
+        for i in range(30):
+            await service.send_ai_results(URL, _result(f"page-{i}"))
+        await _wait_delivered(service)
+        await service.close()
+
+    asyncio.run(run())
+    assert len(web.received) == 30
+    assert web.peak == 3
+
+
+def test_host_limit_is_shared_by_workers_on_one_outbox(tmp_path, monkeypatch):
+    monkeypatch.setattr(callback, "CALLBACK_HOST_CONCURRENCY", 3)
+    path = str(tmp_path / "outbox.sqlite3")
+    web = _WebApp(latency=0.02)
+
+    async def run():
+        # Two services on one file stand in for two prefork workers
+        workers = [_service(path, web), _service(path, web)]
+        for i in range(30):
+            await workers[i % 2].send_ai_results(URL, _result(f"page-{i}"))
+        for worker in workers:
+            await _wait_delivered(worker)
+        for worker in workers:
+            await worker.close()
+
+    asyncio.run(run())
+    assert len(web.received) == 30
+    assert web.peak <= 3
+
+
+def test_outbox_lock_waits_do_not_block_the_event_loop(tmp_path):
+    path = str(tmp_path / "outbox.sqlite3")
+    web = _WebApp()
+
+    async def run():
+        service = _service(path, web)
+        # Another worker holding the write lock for a while
+        other = sqlite3.connect(path, isolation_level=None)
+        other.execute("BEGIN IMMEDIATE")
+        loop = asyncio.get_running_loop()
+        loop.call_later(0.3, other.execute, "COMMIT")
+
+        ticks = []
+
+        async def tick():
+            while len(ticks) < 20:
+                ticks.append(loop.time())
+                await asyncio.sleep(0.01)
+
+        ticker = asyncio.create_task(tick())
+        assert await service.send_report(URL, {"type": "daily"})
+        await ticker
+        await _wait_delivered(service)
+        await service.close()
+        other.close()
+        return max(b - a for a, b in zip(ticks, ticks[1:]))
+
+    assert asyncio.run(run()) < 0.2
+    assert web.received == [{"type": "daily"}]
+
+
+def test_claim_respects_leases_held_by_other_senders(tmp_path):
+    path = str(tmp_path / "outbox.sqlite3")
+    first, second = CallbackOutbox(path), CallbackOutbox(path)
+    ids = [first.add(URL, "web", b"{}", {}) for _ in range(3)]
+    now = 1e12
+    assert first.claim(ids[0], "web", now, now + 60, host_limit=2)
+    assert second.claim(ids[1], "web", now, now + 60, host_limit=2)
+    assert not first.claim(ids[2], "web", now, now + 60, host_limit=2)
+    assert second.leased("web", now) == 2
+    # A lapsed lease no longer counts
+    assert first.claim(ids[2], "web", now + 61, now + 120, host_limit=2)
+    first.close()
+    second.close()
+
+
+@pytest.mark.parametrize("encoding", ["f32", "f16"])
+def test_ai_results_can_carry_a_packed_embedding(encoding):
+    web = _WebApp()
+    embedding = [0.1, -2.5, 3.0, 0.0]
+
+    async def run():
+        service = _service(None, web)
+        result = _result("page").model_copy(update={"embedding": embedding})
+        assert await service.send_ai_results(URL, result, embedding_encoding=encoding)
+        await _wait_delivered(service)
+        await service.close()
+
+    asyncio.run(run())
+    [body] = web.received
+    assert body["embeddingEncoding"] == encoding
+    dtype = "<f4" if encoding == "f32" else "<f2"
+    packed = np.frombuffer(base64.b64decode(body["embedding"]), dtype=dtype)
+    assert packed.tolist() == np.array(embedding, dtype=dtype).tolist()
@@ -0,0 +1,33 @@
+import re
+
+from src.services import classifier
+from src.services.classifier import ClassifierService
+from src.services.result_cache import ResultCache
+
+TEXT = "회의록: 참석자와 안건을 정리했다."
+
+
+def test_rules_digest_follows_patterns_and_prototypes():
+    patterns = {"todo": [re.compile("TODO", re.I)]}
+    prototypes = {"todo": "할 일 목록"}
+    digest = classifier._rules_digest(patterns, prototypes)
+    assert digest == classifier._rules_digest(patterns, dict(prototypes))
+    assert digest != classifier._rules_digest({"todo": [re.compile("TODO")]}, prototypes)
+    assert digest != classifier._rules_digest(patterns, {"todo": "체크리스트"})
+
+
+def test_changed_rules_miss_the_cache(monkeypatch):
+    cache = ResultCache(None)
+    service = ClassifierService(cache=cache)
+    assert service.classify(TEXT)[0] == "meeting_note"
+
+    calls = []
+    classify = service._classify
+    monkeypatch.setattr(service, "_classify", lambda *a: calls.append(1) or classify(*a))
+    service.classify(TEXT)
+    assert calls == []
+
+    monkeypatch.setattr(classifier, "_RULES_DIGEST", "changed")
+    service.classify(TEXT)
+    assert calls == [1]
+    cache.close()
@@ -0,0 +1,43 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.routers import cluster
+
+
+class _Executor:
+    async def run(self, fn, *args, wait=True):
+        return fn(*args)
+
+
+class _Service:
+    def cluster_matrix(self, page_ids, matrix):
+        return {"clusters": [], "noise": list(page_ids)}
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.include_router(cluster.router)
+    app.state.clustering_service = _Service()
+    app.state.inference_executor = _Executor()
+    return TestClient(app)
+
+
+@pytest.mark.parametrize("vectors", [
+    [[0.1, None], [0.2, 0.3]],
+    [[0.1, 0.2], [0.3]],
+    [[0.1, 1e39], [0.2, 0.3]],
+    [[0.1, "x"], [0.2, 0.3]],
+])
+def test_bad_vectors_are_rejected(client, vectors):
+    body = {"embeddings": [{"page_id": f"p{i}", "vector": v} for i, v in enumerate(vectors)]}
+    response = client.post("/cluster", json=body)
+    assert response.status_code == 422
+
+
+def test_valid_vectors_are_clustered(client):
+    body = {"embeddings": [{"page_id": "p0", "vector": [0.1, 0.2]}]}
+    response = client.post("/cluster", json=body)
+    assert response.status_code == 200
+    assert response.json() == {"clusters": [], "noise": ["p0"]}
@@ -0,0 +1,271 @@
+import numpy as np
+import pytest
+
+from src.services import clustering
+from src.services.clustering import ClusteringService
+
+
+def _corpus(n_blobs, seed=0, size=60, dim=16):
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((n_blobs, dim)) * 10
+    matrix = np.vstack([c + rng.standard_normal((size, dim)) for c in centers])
+    page_ids = [f"b{i}-{j}" for i in range(n_blobs) for j in range(size)]
+    return page_ids, matrix.astype(np.float32), centers, rng
+
+
+def _shape(result):
+    return sorted(len(c["page_ids"]) for c in result["clusters"]), len(result["noise"])
+
+
+def _grown(n_blobs):
+    """15 pages added to one cluster."""
+    page_ids, matrix, centers, rng = _corpus(n_blobs)
+    extra = centers[2] + rng.standard_normal((15, matrix.shape[1]))
+    return page_ids + [f"new-{j}" for j in range(15)], np.vstack([matrix, extra]).astype(np.float32)
+
+
+def _shrunk(n_blobs):
+    """20 pages removed from one cluster and every page of another."""
+    page_ids, matrix, _, _ = _corpus(n_blobs)
+    keep = [
+        row for row, page_id in enumerate(page_ids)
+        if not page_id.startswith("b4-")
+        and not (page_id.startswith("b3-") and int(page_id[3:]) < 20)
+    ]
+    return [page_ids[row] for row in keep], matrix[keep]
+
+
+def _recluster(n_blobs, page_ids, matrix):
+    service = ClusteringService(snapshot_path=None)
+    service.recluster_matrix(*_corpus(n_blobs)[:2])
+    return service.recluster_matrix(page_ids, matrix)
+
+
+@pytest.mark.parametrize("n_blobs", [8, 20])
+@pytest.mark.parametrize("change", [_grown, _shrunk])
+def test_partial_refit_matches_a_full_refit(n_blobs, change):
+    page_ids, matrix = change(n_blobs)
+    full = ClusteringService(snapshot_path=None).cluster_matrix(page_ids, matrix)
+    result = _recluster(n_blobs, page_ids, matrix)
+    if n_blobs == 20:
+        assert result["_mode"] == "partial"
+    assert _shape(result) == _shape(full)
+
+
+def test_untouched_clusters_keep_their_ids():
+    page_ids, matrix = _grown(20)
+    service = ClusteringService(snapshot_path=None)
+    before = service.recluster_matrix(*_corpus(20)[:2])
+    after = service.recluster_matrix(page_ids, matrix)
+    assert after["_mode"] == "partial"
+    unchanged = [c for c in before["clusters"] if not c["page_ids"][0].startswith("b2-")]
+    assert len(unchanged) == 19
+    assert all(c in after["clusters"] for c in unchanged)
+
+
+def test_refit_that_loses_its_cluster_falls_back_to_full(monkeypatch):
+    monkeypatch.setattr(clustering, "RECLUSTER_CONTEXT_CLUSTERS", 0)
+    page_ids, matrix = _grown(20)
+    result = _recluster(20, page_ids, matrix)
+    assert result["_mode"] == "full"
+    assert _shape(result) == ([60] * 19 + [75], 0)
+
+
+def test_state_does_not_share_the_callers_inputs():
+    page_ids, matrix, centers, rng = _corpus(8)
+    ids_before, matrix_before = list(page_ids), matrix.copy()
+    service = ClusteringService(snapshot_path=None)
+    service.recluster_matrix(page_ids, matrix)
+
+    moved = (centers[1] + rng.standard_normal(matrix.shape[1])).astype(np.float32)
+    service.assign_batch(["new-page", page_ids[0]], np.stack([moved, moved]))
+    assert page_ids == ids_before
+    assert np.array_equal(matrix, matrix_before)
+
+    result = service.recluster_matrix(page_ids, matrix)
+    assert sum(len(c["page_ids"]) for c in result["clusters"]) + len(result["noise"]) == 480
+    service.assign_batch(["other-page"], moved[None, :])
+    assert page_ids == ids_before
+    assert np.array_equal(matrix, matrix_before)
+
+
+def test_cluster_leaves_the_state_alone():
+    page_ids, matrix, centers, rng = _corpus(8)
+    service = ClusteringService(snapshot_path=None)
+    service.recluster_matrix(page_ids, matrix)
+    state, version = service._state, service.version
+
+    other_ids, other, _, _ = _corpus(2, seed=1, size=6)
+    result = service.cluster_matrix(other_ids, other)
+    assert sum(len(c["page_ids"]) for c in result["clusters"]) + len(result["noise"]) == 12
+    assert service._state is state and service.version == version
+    assert len(state.page_ids) == 480
+
+    near = (centers[3] + rng.standard_normal(matrix.shape[1])).astype(np.float32)
+    assert service.assign("new-page", near.tolist()) == state.labels[page_ids.index("b3-0")]
+
+
+def _assert_same_state(a, b):
+    size = len(a.page_ids)
+    assert a.page_ids == b.page_ids
+    for name in ("vectors", "labels", "core_distances", "dirty"):
+        assert np.array_equal(getattr(a, name)[:size], getattr(b, name)[:size]), name
+    assert a.regions.keys() == b.regions.keys()
+    for cluster_id, region in a.regions.items():
+        other = b.regions[cluster_id]
+        assert np.array_equal(region.centroid, other.centroid)
+        assert (region.size, region.spread, region.extent, region.reach) == (
+            other.size, other.spread, other.extent, other.reach
+        )
+    assert a.churn == b.churn
+    assert (a.next_cluster_id, a.fitted_size) == (b.next_cluster_id, b.fitted_size)
+
+
+def test_snapshot_round_trip(tmp_path):
+    path = str(tmp_path / "clusters.npz")
+    service = ClusteringService(snapshot_path=path)
+    page_ids, matrix, centers, rng = _corpus(8)
+    service.recluster_matrix(page_ids, matrix)
+    near = (centers[1] + rng.standard_normal(matrix.shape[1])).astype(np.float32)
+    service.assign_batch(["new-page"], near[None, :])
+    service.recluster_matrix(page_ids + ["new-page"], np.vstack([matrix, near]))
+
+    state, version = clustering._load_snapshot(path)
+    assert version == service.version
+    assert state.projection is None
+    _assert_same_state(service._state, state)
+
+    restarted = ClusteringService(snapshot_path=path)
+    assert restarted.version == service.version
+    _assert_same_state(service._state, restarted._state)
+
+
+def test_snapshot_keeps_the_projection(tmp_path, monkeypatch):
+    monkeypatch.setattr(clustering, "CLUSTER_REDUCE_MIN_ITEMS", 100)
+    monkeypatch.setattr(clustering, "CLUSTER_REDUCE_DIM", 8)
+    path = str(tmp_path / "clusters.npz")
+    service = ClusteringService(snapshot_path=path)
+    page_ids, matrix, centers, rng = _corpus(8)
+    service.recluster_matrix(page_ids, matrix)
+    assert service._state.vectors.shape[1] == 8
+
+    restarted = ClusteringService(snapshot_path=path)
+    projection = restarted._state.projection
+    assert np.array_equal(projection.mean, service._state.projection.mean)
+    assert np.array_equal(projection.components, service._state.projection.components)
+    _assert_same_state(service._state, restarted._state)
+
+    queries = (centers[:, None, :] + rng.standard_normal((8, 5, 16))).reshape(-1, 16)
+    queries = queries.astype(np.float32)
+    ids = [f"q{i}" for i in range(len(queries))]
+    expected = service.assign_batch(ids, queries)
+    actual = restarted.assign_batch(ids, queries)
+    assert np.array_equal(expected[0], actual[0])
+    assert np.allclose(expected[1], actual[1])
+
+
+def test_snapshot_with_an_old_format_is_ignored(tmp_path, monkeypatch):
+    path = str(tmp_path / "clusters.npz")
+    ClusteringService(snapshot_path=path).recluster_matrix(*_corpus(8)[:2])
+    monkeypatch.setattr(clustering, "_SNAPSHOT_FORMAT", clustering._SNAPSHOT_FORMAT + 1)
+    assert clustering._load_snapshot(path) is None
+    restarted = ClusteringService(snapshot_path=path)
+    assert restarted._state is None and restarted.version == 0
+
+
+def test_corrupt_snapshot_is_skipped(tmp_path):
+    path = tmp_path / "clusters.npz"
+    path.write_bytes(b"not a snapshot")
+    service = ClusteringService(snapshot_path=str(path))
+    assert service._state is None
+    # The bad file is replaced by the next fit
+    service.recluster_matrix(*_corpus(8)[:2])
+    assert clustering._load_snapshot(str(path))[1] == service.version
+
+
+def test_other_workers_pick_up_a_newer_snapshot(tmp_path):
+    path = str(tmp_path / "clusters.npz")
+    writer = ClusteringService(snapshot_path=path)
+    reader = ClusteringService(snapshot_path=path)
+    writer.recluster_matrix(*_corpus(8)[:2])
+
+    reader._maybe_reload(force=True)
+    assert reader.version == writer.version
+    _assert_same_state(writer._state, reader._state)
+
+    page_ids, matrix = _grown(8)
+    writer.recluster_matrix(page_ids, matrix)
+    assert writer.version > reader.version
+    reader._maybe_reload(force=True)
+    assert reader.version == writer.version
+    _assert_same_state(writer._state, reader._state)
+
+
+def test_cluster_does_not_write_a_snapshot(tmp_path):
+    path = tmp_path / "clusters.npz"
+    service = ClusteringService(snapshot_path=str(path))
+    service.cluster_matrix(*_corpus(8)[:2])
+    assert not path.exists() and service.version == 0
+
+
+def _queries(centers, rng, per_blob=20):
+    """Held-out points around every blob, then one far outlier per blob."""
+    dim = centers.shape[1]
+    held_out = centers[:, None, :] + rng.standard_normal((len(centers), per_blob, dim))
+    outliers = centers * 3
+    return np.vstack([held_out.reshape(-1, dim), outliers]).astype(np.float32)
+
+
+def test_assign_labels_and_strengths():
+    page_ids, matrix, centers, rng = _corpus(8)
+    service = ClusteringService(snapshot_path=None)
+    service.recluster_matrix(page_ids, matrix)
+    state = service._state
+    member = int(state.members[0])
+    queries = np.vstack([state.vectors[member], _queries(centers, rng)])
+    ids = [f"q{i}" for i in range(len(queries))]
+
+    labels, strengths = service.assign_batch(ids, queries)
+    assert labels[0] == state.labels[member]
+    assert strengths[0] == pytest.approx(1.0, abs=1e-2)
+    assert np.all((strengths >= 0) & (strengths <= 1))
+    assert np.all(strengths[labels == clustering.NOISE] == 0)
+    assert np.all(labels[-8:] == clustering.NOISE)
+    held_out = labels[1:-8].reshape(8, -1)
+    assert (held_out >= 0).mean() > 0.9
+    for blob, row in zip(held_out, page_ids[::60]):
+        assert set(blob[blob >= 0]) == {state.labels[state.index[row]]}
+
+
+def test_exemplars_agree_with_the_exact_path(monkeypatch):
+    page_ids, matrix, centers, rng = _corpus(8)
+    service = ClusteringService(snapshot_path=None)
+    service.recluster_matrix(page_ids, matrix)
+    state = service._state
+    queries = _queries(centers, rng)
+    exact, _, exact_strengths = clustering._assign(state, queries)
+
+    monkeypatch.setattr(clustering, "CLUSTER_ASSIGN_EXACT_MAX", 10)
+    state._reference = None
+    assert len(state.reference().labels) == 8 * clustering.CLUSTER_EXEMPLARS
+    labels, _, strengths = clustering._assign(state, queries)
+
+    clustered = exact >= 0
+    assert clustered.mean() > 0.9
+    assert np.array_equal(labels[clustered], exact[clustered])
+    assert np.all(labels[-8:] == clustering.NOISE)
+    assert np.all((strengths >= 0) & (strengths <= 1))
+    assert np.all(exact_strengths[-8:] == 0) and np.all(strengths[-8:] == 0)
+
+
+def test_batched_and_single_assignment_agree():
+    page_ids, matrix, centers, rng = _corpus(8)
+    queries = _queries(centers, rng)
+    ids = [f"q{i}" for i in range(len(queries))]
+    batched, single = ClusteringService(snapshot_path=None), ClusteringService(snapshot_path=None)
+    batched.recluster_matrix(page_ids, matrix)
+    single.recluster_matrix(page_ids, matrix)
+
+    labels, _ = batched.assign_batch(ids, queries)
+    one_by_one = [single.assign(page_id, query.tolist()) for page_id, query in zip(ids, queries)]
+    assert labels.tolist() == one_by_one
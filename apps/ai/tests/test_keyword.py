@@ -0,0 +1,27 @@
+from src.services import keyword
+from src.services.keyword import KeywordService
+
+TEXT = (
+    "검색 품질 개선을 위해 형태소 분석기를 교체했다. 형태소 분석기 교체 후 "
+    "검색 재현율과 검색 정확도를 다시 측정하고, 분석기 설정을 문서로 남긴다."
+)
+
+
+def test_top_n_is_a_prefix_of_the_full_list():
+    service = KeywordService()
+    full = service.extract(TEXT, top_n=keyword.YAKE_MAX_KEYWORDS)
+    assert len(full) > 3
+    assert service.extract(TEXT, top_n=3) == full[:3]
+
+
+class _OldExtractor:
+    """Shape of YAKE releases that keep settings as attributes."""
+
+    def __init__(self):
+        self.top = keyword.YAKE_MAX_KEYWORDS
+
+
+def test_top_is_set_on_extractors_without_config():
+    extractor = _OldExtractor()
+    keyword._set_top(extractor, 5)
+    assert extractor.top == 5
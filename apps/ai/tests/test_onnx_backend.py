@@ -0,0 +1,35 @@
+import json
+from types import SimpleNamespace
+
+from src.services import onnx_backend
+
+_MODEL = SimpleNamespace(config=SimpleNamespace(max_position_embeddings=512))
+_TOKENIZER = SimpleNamespace(model_max_length=1024)
+
+
+def test_max_seq_length_comes_from_the_checkpoint_config(tmp_path):
+    checkpoint = tmp_path / "checkpoint"
+    checkpoint.mkdir()
+    (checkpoint / "sentence_bert_config.json").write_text(
+        json.dumps({"max_seq_length": 128, "do_lower_case": False})
+    )
+    model_dir = tmp_path / "onnx"
+    model_dir.mkdir()
+
+    length = onnx_backend._sbert_max_seq_length(
+        str(checkpoint), model_dir, _MODEL, _TOKENIZER
+    )
+
+    assert length == 128
+    # Copied next to the export, so later starts don't need the checkpoint
+    assert (model_dir / "sentence_bert_config.json").exists()
+
+
+def test_max_seq_length_falls_back_to_model_limits(tmp_path):
+    (tmp_path / "sentence_bert_config.json").write_text(json.dumps({}))
+
+    length = onnx_backend._sbert_max_seq_length(
+        "unused", tmp_path, _MODEL, _TOKENIZER
+    )
+
+    assert length == 512
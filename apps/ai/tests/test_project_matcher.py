@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+
+from src.services import project_matcher
+from src.services.project_matcher import ProjectMatcher
+
+
+def _projects(n, dim=16, seed=0):
+    rng = np.random.default_rng(seed)
+    return [
+        {
+            "id": f"p{i}",
+            "name": f"프로젝트{i}",
+            "milestone_names": [f"마일스톤{i}"],
+            "centroid": rng.standard_normal(dim).tolist() if i % 3 else None,
+        }
+        for i in range(n)
+    ]
+
+
+@pytest.mark.parametrize("n", [5, 40])
+def test_automaton_and_find_paths_agree(monkeypatch, n):
+    projects = _projects(n)
+    page = "이번 주 프로젝트3 회의, 마일스톤7 일정과 PROJECT 정리"
+    embedding = np.random.default_rng(1).standard_normal(16).tolist()
+
+    monkeypatch.setattr(project_matcher, "AUTOMATON_MIN_PATTERNS", 10**6)
+    with_find = ProjectMatcher().match(page, embedding, projects, ["p2"], top_k=5)
+    monkeypatch.setattr(project_matcher, "AUTOMATON_MIN_PATTERNS", 0)
+    with_automaton = ProjectMatcher().match(page, embedding, projects, ["p2"], top_k=5)
+
+    assert with_find == with_automaton
+    assert with_find[0]["project_id"] in {"p3", "p2"}
+
+
+def test_name_match_lifts_a_project():
+    projects = _projects(4)
+    embedding = [0.0] * 16
+    projects[1]["centroid"] = None
+    matches = ProjectMatcher().match("프로젝트1 진행 상황", embedding, projects)
+    assert matches[0] == {"project_id": "p1", "project_name": "프로젝트1", "confidence": 0.3}
+
+
+def test_index_is_reused_until_the_projects_change(monkeypatch):
+    builds = []
+    build = project_matcher._build_index
+    monkeypatch.setattr(
+        project_matcher, "_build_index", lambda projects: builds.append(1) or build(projects)
+    )
+    matcher = ProjectMatcher()
+    projects = _projects(6)
+    embedding = [0.0] * 16
+
+    matcher.match("프로젝트1", embedding, projects)
+    matcher.match("프로젝트2", embedding, _projects(6))
+    assert len(builds) == 1
+
+    projects[2]["name"] = "새 이름"
+    assert matcher.match("새 이름", embedding, projects)[0]["project_id"] == "p2"
+    assert len(builds) == 2
+
+    matcher.match("프로젝트1", embedding, projects, projects_version=7)
+    matcher.match("프로젝트1", embedding, _projects(6), projects_version=7)
+    assert len(builds) == 3
@@ -0,0 +1,84 @@
+import asyncio
+import base64
+import json
+
+import httpx
+import numpy as np
+import pytest
+
+from src.jobs.recluster import fetch_embeddings
+
+URL = "http://web/ai/trigger-recluster"
+
+
+def _corpus(pages, dim=8):
+    matrix = np.random.default_rng(0).standard_normal((pages, dim)).astype(np.float32)
+    return [f"page-{i:05d}" for i in range(pages)], matrix
+
+
+def _paged(page_ids, matrix, total=None):
+    """Handler playing the web app's keyset-paged endpoint."""
+
+    def handler(request):
+        limit = int(request.url.params["limit"])
+        after = request.url.params.get("after")
+        start = 0 if after is None else page_ids.index(after) + 1
+        end = min(len(page_ids), start + limit)
+        body = {
+            "page_ids": page_ids[start:end],
+            "dim": matrix.shape[1],
+            "vectors": base64.b64encode(matrix[start:end].astype("<f4").tobytes()).decode(),
+            "next_after": page_ids[end - 1] if end - start == limit else None,
+        }
+        if after is None:
+            body["total"] = len(page_ids) if total is None else total
+        return httpx.Response(200, json=body)
+
+    return handler
+
+
+def _fetch(handler, page_size):
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            return await fetch_embeddings(client, URL, page_size=page_size)
+
+    return asyncio.run(run())
+
+
+@pytest.mark.parametrize("page_size", [1, 7, 50, 1000])
+def test_paged_fetch_matches_the_corpus(page_size):
+    expected_ids, expected = _corpus(50)
+    page_ids, matrix = _fetch(_paged(expected_ids, expected), page_size)
+    assert page_ids == expected_ids
+    assert matrix.dtype == np.float32 and np.array_equal(matrix, expected)
+
+
+def test_pages_added_after_the_first_request_are_kept():
+    expected_ids, expected = _corpus(50)
+    page_ids, matrix = _fetch(_paged(expected_ids, expected, total=10), page_size=8)
+    assert page_ids == expected_ids
+    assert np.array_equal(matrix, expected)
+
+
+def test_unpaged_web_app_is_read_as_float_lists():
+    expected_ids, expected = _corpus(20)
+
+    def legacy(request):
+        return httpx.Response(200, content=json.dumps({"embeddings": [
+            {"page_id": pid, "vector": row} for pid, row in zip(expected_ids, expected.tolist())
+        ]}))
+
+    page_ids, matrix = _fetch(legacy, page_size=8)
+    assert page_ids == expected_ids
+    assert np.array_equal(matrix, expected)
+
+
+def test_empty_corpus():
+    page_ids, matrix = _fetch(_paged([], np.empty((0, 8), dtype=np.float32)), page_size=8)
+    assert page_ids == [] and matrix.shape == (0, 0)
+
+
+def test_row_count_mismatch_is_an_error():
+    expected_ids, expected = _corpus(5)
+    with pytest.raises(ValueError):
+        _fetch(_paged(expected_ids + ["extra"], expected), page_size=100)
@@ -0,0 +1,109 @@
+import json
+import sqlite3
+
+import numpy as np
+
+from src.services.result_cache import ResultCache
+
+
+def _row(path, key):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute(
+            "SELECT value, accessed FROM entries WHERE key = ?", (key,)
+        ).fetchone()
+    finally:
+        conn.close()
+
+
+def test_values_survive_reopen(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    cache = ResultCache(path)
+    cache.set("summary", "요약입니다")
+    cache.set("tags", [{"name": "검색", "score": 0.5}])
+    cache.close()
+
+    cache = ResultCache(path, memory_items=0)
+    assert cache.get("summary") == "요약입니다"
+    assert cache.get("tags") == [{"name": "검색", "score": 0.5}]
+    assert cache.get("missing") is None
+    assert cache.stats()["disk_hits"] == 2
+    cache.close()
+
+
+def test_queued_write_is_visible_before_commit(tmp_path):
+    cache = ResultCache(str(tmp_path / "cache.sqlite3"), memory_items=0)
+    with cache._pending:
+        # Holding the queue keeps the writer thread from committing
+        cache._writes["key"] = json.dumps([1, 2]).encode()
+        assert cache.get("key") == [1, 2]
+    cache.close()
+
+
+def test_vectors_are_packed_float32(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    vector = np.random.default_rng(0).standard_normal(768).astype(np.float32).tolist()
+    cache = ResultCache(path)
+    cache.set_vector("embedding", vector)
+
+    in_memory = cache._memory["embedding"]
+    assert isinstance(in_memory, np.ndarray) and in_memory.nbytes == 768 * 4
+    returned = cache.get_vector("embedding")
+    assert returned == vector
+    returned[0] = 99.0
+    assert cache.get_vector("embedding") == vector
+    cache.close()
+
+    blob, _ = _row(path, "embedding")
+    assert len(blob) == 3 + 768 * 4
+    cache = ResultCache(path, memory_items=0)
+    assert cache.get_vector("embedding") == vector
+    assert cache.get_vectors(["embedding", "missing"]) == {"embedding": vector}
+    cache.close()
+
+
+def test_json_vectors_from_older_caches_still_read(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    cache = ResultCache(path)
+    cache.set("embedding", [0.5, -0.25])
+    cache.close()
+
+    cache = ResultCache(path, memory_items=0)
+    assert cache.get_vector("embedding") == [0.5, -0.25]
+    cache.close()
+
+
+def test_disk_hits_update_access_time_on_flush(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    cache = ResultCache(path)
+    cache.set("key", "value")
+    cache.close()
+    _, written = _row(path, "key")
+
+    cache = ResultCache(path, memory_items=0)
+    assert cache.get("key") == "value"
+    assert cache._touches
+    cache.close()
+    _, accessed = _row(path, "key")
+    assert accessed > written
+
+
+def test_eviction_keeps_disk_under_budget(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    cache = ResultCache(path, memory_items=0, max_bytes=2000)
+    for i in range(50):
+        cache.set(f"key-{i}", "x" * 100)
+    cache.close()
+
+    cache = ResultCache(path, memory_items=0, max_bytes=2000)
+    assert cache.stats()["disk_bytes"] <= 2000
+    assert cache.get("key-49") == "x" * 100
+    cache.close()
+
+
+def test_memory_only_without_path():
+    cache = ResultCache(None)
+    cache.set("key", {"a": 1})
+    assert cache.get("key") == {"a": 1}
+    assert cache.stats()["persistent"] is False
+    cache.close()
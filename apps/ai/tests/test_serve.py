@@ -0,0 +1,33 @@
+from src import main, serve
+from src.services import onnx_backend
+
+
+def test_onnx_preload_prepares_files_without_opening_sessions(monkeypatch):
+    prepared = []
+    monkeypatch.setattr(main, "INFERENCE_BACKEND", "onnx")
+    monkeypatch.setattr(main, "PRELOADED_MODELS", {})
+    monkeypatch.setattr(onnx_backend, "prepare_sbert", prepared.append)
+    monkeypatch.setattr(onnx_backend, "prepare_kobart", prepared.append)
+
+    def no_sessions(model_name):
+        raise AssertionError("ONNX Runtime session opened before fork")
+
+    monkeypatch.setattr(onnx_backend, "load_sbert", no_sessions)
+    monkeypatch.setattr(onnx_backend, "load_kobart", no_sessions)
+
+    main.preload_models()
+
+    assert prepared == [main.SBERT_MODEL_NAME, main.KOBART_MODEL_NAME]
+    assert main.PRELOADED_MODELS == {}
+
+
+def test_workers_size_onnx_threads_after_fork(monkeypatch):
+    monkeypatch.delenv("ONNX_INTRA_OP_THREADS", raising=False)
+    monkeypatch.setattr(onnx_backend, "ONNX_INTRA_OP_THREADS", 0)
+    serve._set_onnx_threads(3)
+    assert onnx_backend.ONNX_INTRA_OP_THREADS == 3
+
+    monkeypatch.setenv("ONNX_INTRA_OP_THREADS", "2")
+    monkeypatch.setattr(onnx_backend, "ONNX_INTRA_OP_THREADS", 2)
+    serve._set_onnx_threads(3)
+    assert onnx_backend.ONNX_INTRA_OP_THREADS == 2
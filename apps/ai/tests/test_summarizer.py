@@ -0,0 +1,70 @@
+import time
+
+from src.services import summarizer
+from src.services.result_cache import ResultCache
+from src.services.summarizer import SummarizerService, SummaryTier
+
+TEXT = "검색 품질 개선을 위해 형태소 분석기를 교체하고 재현율을 측정하기로 했다."
+
+
+class _Ids(list):
+    def to(self, device):
+        return self
+
+
+class _Tokenizer:
+    def __call__(self, texts, **kwargs):
+        if kwargs.get("return_tensors"):
+            return {"input_ids": _Ids(texts)}
+        return {"input_ids": [text.split() for text in texts]}
+
+    def batch_decode(self, ids, skip_special_tokens=True):
+        return list(ids)
+
+
+class _SlowModel:
+    """Takes ``work_s`` per generate call unless max_time stops it first."""
+
+    device = "cpu"
+
+    def __init__(self, work_s):
+        self.work_s = work_s
+        self.calls = 0
+
+    def generate(self, input_ids, max_time=None, **kwargs):
+        self.calls += 1
+        if max_time is not None and max_time < self.work_s:
+            time.sleep(max_time)
+            return [f"cut off {self.calls}" for _ in input_ids]
+        time.sleep(self.work_s)
+        return [f"summary {self.calls}" for _ in input_ids]
+
+
+def _service(model, monkeypatch, deadline_s):
+    tier = SummaryTier(
+        num_beams=1, max_length=64, min_length=8, no_repeat_ngram_size=3,
+        deadline_s=deadline_s,
+    )
+    monkeypatch.setitem(summarizer.SUMMARY_TIERS, "fast", tier)
+    monkeypatch.setattr(summarizer, "_MIN_GENERATE_TIME_S", 0.0)
+    return SummarizerService(_Tokenizer(), model, cache=ResultCache(None))
+
+
+def test_summaries_cut_off_by_the_deadline_are_not_cached(monkeypatch):
+    model = _SlowModel(work_s=0.05)
+    service = _service(model, monkeypatch, deadline_s=0.01)
+
+    assert service.summarize(TEXT, tier="fast") == "cut off 1"
+    model.work_s = 0.0
+    assert service.summarize(TEXT, tier="fast") == "summary 2"
+    assert service.summarize(TEXT, tier="fast") == "summary 2"
+    assert model.calls == 2
+
+
+def test_summaries_within_the_deadline_are_cached(monkeypatch):
+    model = _SlowModel(work_s=0.0)
+    service = _service(model, monkeypatch, deadline_s=5.0)
+
+    assert service.summarize(TEXT, tier="fast") == "summary 1"
+    assert service.summarize(TEXT, tier="fast") == "summary 1"
+    assert model.calls == 1
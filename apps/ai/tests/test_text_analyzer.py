@@ -0,0 +1,109 @@
+import random
+
+import numpy as np
+import pytest
+
+from src.services import text_analyzer
+from src.services.classifier import KEYWORD_PATTERNS, NOTE_TYPES
+from src.services.entity_extractor import EntityExtractor
+from src.services.status_detector import StatusDetector
+from src.services.text_analyzer import TextAnalyzer
+from src.services.todo_extractor import TodoExtractor
+
+FRAGMENTS = [
+    # entities
+    "@홍길동", "@김철수님", "@이", "2024-03-12", "2024/3/5", "3/15", "13/40",
+    "3월 12일", "마감: 2024-04-01", "deadline 5/1", "~까지 4월 3일", "due:2024.1.2",
+    "https://example.com/a?b=1", "http://x.y)", "NotionFlow", "알파 프로젝트",
+    # todos
+    "- [ ] 배포 스크립트 정리", "* [ ] 긴급 서버 점검 @박민수 마감 2024-05-01",
+    "TODO: 문서 업데이트", "todo 리뷰 요청 high", "- 테스트 추가 해야 함",
+    "* 모니터링 필요", "- 나중에 정리할 것", "- [x] 완료된 항목", "  - 회의 준비하기",
+    # status
+    "완료", "끝남", "done", "in progress", "진행 중", "작업중", "blocked", "on hold",
+    "보류", "중단", "해결", "resolved",
+    # note-type keywords (some overlap each other)
+    "회의록", "참석자", "안건", "최종 결정 사항", "결정:", "합의", "decision", "[ ]",
+    "[x]", "☑", "✅", "아이디어", "어떨까", "참고 자료", "가이드", "log", "catalog",
+    "작업 일지", "2024-01-01 기록", "진행 상황", "journal",
+    # characters re.IGNORECASE folds onto ASCII letters
+    "fınıshed", "ſtarted", "İN PROGRESS", "DONE", "Blocked", "\u212aorea", "LOG",
+    # glue
+    " ", " ", " ", "\n", "\n", "\n\n", ".", ",", "그리고", "abc", "Ab", "-", "*", ":",
+]
+FILLER = "가나다라마바사아자차카타파하개발기획서버모델검색데이터"
+
+
+def _notes(seed=0, count=400):
+    rng = random.Random(seed)
+    notes = ["", "   \n"]
+    for _ in range(count):
+        notes.append("".join(rng.choice(FRAGMENTS) for _ in range(rng.randint(1, 40))))
+    for _ in range(count // 10):
+        words = [
+            rng.choice(FRAGMENTS) if rng.random() < 0.01
+            else "".join(rng.choice(FILLER) for _ in range(rng.randint(1, 5)))
+            for _ in range(400)
+        ]
+        notes.append(" ".join(words))
+    return notes
+
+
+def _services():
+    return EntityExtractor(["NotionFlow", "알파 프로젝트"]), TodoExtractor(), StatusDetector()
+
+
+def _expected(services, note):
+    entity_extractor, todo_extractor, status_detector = services
+    counts = np.zeros(len(NOTE_TYPES))
+    if note.strip():
+        counts = np.array([
+            sum(len(p.findall(note)) for p in KEYWORD_PATTERNS[note_type])
+            for note_type in NOTE_TYPES
+        ])
+    return (
+        entity_extractor.extract(note),
+        todo_extractor.extract(note),
+        status_detector.detect(note),
+        counts.tolist(),
+    )
+
+
+def _analyzed(analyzer, note):
+    analysis = analyzer.analyze(note)
+    return (
+        analysis.entities,
+        analysis.todos,
+        analysis.status_signals,
+        analysis.keyword_counts.tolist(),
+    )
+
+
+@pytest.mark.parametrize("gated", [True, False])
+def test_matches_the_individual_services(monkeypatch, gated):
+    if not gated:
+        # What happens when re's internal parser can't be imported
+        monkeypatch.setattr(text_analyzer, "sre_parser", None)
+    services = _services()
+    analyzer = TextAnalyzer(*services)
+    assert any(gate for _, gate, _ in analyzer._gates) == gated
+
+    for note in _notes():
+        assert _analyzed(analyzer, note) == _expected(services, note), note
+
+
+def test_ungated_path_matches_the_gated_one(monkeypatch):
+    gated = TextAnalyzer(*_services())
+    monkeypatch.setattr(text_analyzer, "sre_parser", None)
+    ungated = TextAnalyzer(*_services())
+    assert not any(gate for _, gate, _ in ungated._gates)
+
+    for note in _notes(seed=1):
+        assert _analyzed(ungated, note) == _analyzed(gated, note), note
+
+
+def test_gates_are_exact_for_ignorecase_folding():
+    services = _services()
+    analyzer = TextAnalyzer(*services)
+    for note in ["fınıshed", "ſtarted", "İN PROGRESS", "Korea LOG", "DONE"]:
+        assert _analyzed(analyzer, note) == _expected(services, note), note
@@ -0,0 +1,51 @@
+from src.services import tfidf_tagger
+from src.services.tfidf_tagger import TfidfTagger
+
+PAGES = {
+    "a": "검색 품질 개선. 형태소 분석기 교체 후 재현율 측정.",
+    "b": "배포 일정 정리. 서버 점검 후 모니터링 추가.",
+    "c": "회의록 작성. 검색 서버 배포 일정 공유.",
+}
+
+
+def _tagger():
+    tagger = TfidfTagger()
+    tagger.observe_many(list(PAGES.values()), doc_ids=list(PAGES))
+    return tagger
+
+
+def test_texts_without_page_ids_leave_statistics_alone():
+    tagger = _tagger()
+    df = tagger._df.copy()
+    terms = list(tagger._terms)
+
+    tags = tagger.extract_many(["완전히 새로운 단어들 등장. 검색 서버"], top_n=3)[0]
+    assert tags and all(t["name"] for t in tags)
+    assert tagger.document_count == 3
+    assert tagger._terms == terms
+    assert (tagger._df == df).all()
+
+
+def test_page_with_empty_text_drops_its_terms():
+    tagger = _tagger()
+    tagger.extract_many(["", "   "], doc_ids=["a", "b"])
+    assert tagger.document_count == 1
+    expected = TfidfTagger()
+    expected.observe_many([PAGES["c"]], doc_ids=["c"])
+    for term, index in expected._vocab.items():
+        assert tagger._df[tagger._vocab[term]] == expected._df[index]
+    assert tagger._df.sum() == expected._df.sum()
+
+
+def test_vocabulary_is_capped(monkeypatch):
+    monkeypatch.setattr(tfidf_tagger, "TFIDF_MAX_TERMS", 40)
+    tagger = TfidfTagger()
+    for i in range(60):
+        tagger.observe_many([f"공통 단어 고유{i} 표현{i}"], doc_ids=[f"p{i}"])
+        assert len(tagger._terms) <= 40
+    assert tagger._vocab["공통"] == tagger._terms.index("공통")
+    assert tagger._df[tagger._vocab["공통"]] == 60
+    assert all(len(ids) and (ids < len(tagger._terms)).all()
+               for ids in tagger._doc_terms.values())
+    tags = tagger.extract_many(["공통 단어 고유59 새로움"], top_n=2, doc_ids=["p59"])[0]
+    assert tags[0]["name"] != "공통"
@@ -0,0 +1,32 @@
+import base64
+
+import numpy as np
+import pytest
+
+from src.services.vector_codec import decode_f32, encode_vector
+
+
+def test_json_is_the_float_list():
+    assert encode_vector([0.5, -1.0]) == [0.5, -1.0]
+    assert encode_vector(np.array([0.5, -1.0], dtype=np.float32)) == [0.5, -1.0]
+
+
+def test_f32_round_trip():
+    matrix = np.random.default_rng(0).standard_normal((3, 8)).astype(np.float32)
+    assert len(base64.b64decode(encode_vector(matrix[0].tolist(), "f32"))) == 32
+    assert np.array_equal(decode_f32(encode_vector(matrix.ravel(), "f32"), 8), matrix)
+
+
+def test_f16_round_trip():
+    vector = np.random.default_rng(0).standard_normal(64).astype(np.float32)
+    raw = base64.b64decode(encode_vector(vector.tolist(), "f16"))
+    assert len(raw) == 128
+    widened = np.frombuffer(raw, dtype="<f2").astype(np.float32)
+    assert np.allclose(widened, vector, rtol=1e-3, atol=1e-4)
+    assert np.array_equal(widened, vector.astype(np.float16).astype(np.float32))
+
+
+@pytest.mark.parametrize("dim", [0, 3])
+def test_decode_rejects_partial_rows(dim):
+    with pytest.raises(ValueError):
+        decode_f32(encode_vector([1.0] * 8, "f32"), dim)
@@ -1,5 +1,6 @@
-import { Hono } from "hono";
+import { Hono, type Context } from "hono";
 import { z } from "zod";
+import { gunzipSync } from "zlib";
 import { db } from "@/lib/db";
 import {
   pages,
@@ -13,11 +14,12 @@ import {
   pageEntities,
   tasks,
 } from "@/lib/db/schema";
-import { eq, and, gte, lte, inArray } from "drizzle-orm";
+import { eq, and, gt, gte, lte, inArray, asc, count } from "drizzle-orm";
 import { randomUUID } from "crypto";
 import { sseManager } from "../services/sse-manager";
 import { triggerProjectAnalysis } from "../services/ai-trigger";
 import { createSuggestion } from "../services/suggestion-service";
+import { embeddingToBuffer, packedEmbeddingError } from "../services/vector-codec";
 
 const app = new Hono();
 
@@ -33,7 +35,9 @@ const callbackSchema = z.object({
     })
   ),
   summary: z.string(),
-  embedding: z.array(z.number()),
+  // Float list, or base64 packed floats when the sidecar was asked for them
+  embedding: z.union([z.array(z.number()), z.string()]),
+  embeddingEncoding: z.enum(["json", "f32", "f16"]).optional().default("json"),
   clusterId: z.number().nullable().optional(),
   entities: z
     .array(
@@ -67,10 +71,41 @@ const callbackSchema = z.object({
     )
     .optional()
     .default([]),
-});
+})
+  // A float list must be "json" and a packed string "f32" or "f16" of whole
+  // values, so a mismatch is a 400 here rather than a throw in
+  // embeddingToBuffer
+  .superRefine((value, ctx) => {
+    const packed = typeof value.embedding === "string";
+    if (packed !== (value.embeddingEncoding !== "json")) {
+      ctx.addIssue({
+        code: z.ZodIssueCode.custom,
+        path: ["embeddingEncoding"],
+        message: packed
+          ? "A base64 embedding needs embeddingEncoding f32 or f16"
+          : "A float list embedding needs embeddingEncoding json",
+      });
+      return;
+    }
+    if (typeof value.embedding === "string" && value.embeddingEncoding !== "json") {
+      const error = packedEmbeddingError(value.embedding, value.embeddingEncoding);
+      if (error) {
+        ctx.addIssue({ code: z.ZodIssueCode.custom, path: ["embedding"], message: error });
+      }
+    }
+  });
+
+// The sidecar gzips callback bodies when /process asked for it
+async function readJsonBody(c: Context): Promise<unknown> {
+  if (c.req.header("content-encoding") === "gzip") {
+    const raw = Buffer.from(await c.req.arrayBuffer());
+    return JSON.parse(gunzipSync(raw).toString("utf8"));
+  }
+  return c.req.json();
+}
 
 app.post("/callback", async (c) => {
-  const body = await c.req.json();
+  const body = await readJsonBody(c);
   const parsed = callbackSchema.safeParse(body);
   if (!parsed.success) {
     return c.json({ error: parsed.error.flatten() }, 400);
@@ -82,6 +117,7 @@ app.post("/callback", async (c) => {
     tags: tagData,
     summary,
     embedding,
+    embeddingEncoding,
     clusterId,
     entities,
     todos,
@@ -106,7 +142,7 @@ app.post("/callback", async (c) => {
     .run();
 
   // Store embedding
-  const vectorBuffer = Buffer.from(new Float32Array(embedding).buffer);
+  const vectorBuffer = embeddingToBuffer(embedding, embeddingEncoding);
   const existingEmbedding = db
     .select()
     .from(embeddings)
@@ -371,8 +407,53 @@ const reportSchema = z.object({
   ),
 });
 
-// Called by recluster job (6h interval) to fetch all embeddings
+// Called by recluster job (6h interval) to fetch all embeddings.
+// With ?limit=N it returns one page in page_id order, the vectors packed as
+// base64 little-endian float32 rows; pass the returned next_after as ?after=
+// for the next page. The first page also carries the total row count so the
+// caller can preallocate. Without limit it returns the legacy JSON float lists.
 app.post("/trigger-recluster", async (c) => {
+  const limitParam = c.req.query("limit");
+  if (limitParam !== undefined) {
+    const limit = Number(limitParam);
+    if (!Number.isInteger(limit) || limit < 1 || limit > 20000) {
+      return c.json({ error: "limit must be an integer in 1..20000" }, 400);
+    }
+    const after = c.req.query("after");
+    const rows = db
+      .select({ pageId: embeddings.pageId, vector: embeddings.vector })
+      .from(embeddings)
+      .where(after ? gt(embeddings.pageId, after) : undefined)
+      .orderBy(asc(embeddings.pageId))
+      .limit(limit)
+      .all();
+
+    const dim = rows.length
+      ? Buffer.from(rows[0].vector as ArrayBuffer).byteLength / 4
+      : 0;
+    const pageIds: string[] = [];
+    const chunks: Buffer[] = [];
+    for (const row of rows) {
+      const buf = Buffer.from(row.vector as ArrayBuffer);
+      // Skip rows stored with a different dimension rather than misalign the batch
+      if (buf.byteLength !== dim * 4) continue;
+      pageIds.push(row.pageId);
+      chunks.push(buf);
+    }
+
+    const total = after
+      ? undefined
+      : db.select({ total: count() }).from(embeddings).get()?.total ?? 0;
+
+    return c.json({
+      page_ids: pageIds,
+      dim,
+      vectors: Buffer.concat(chunks).toString("base64"),
+      next_after: rows.length === limit ? rows[rows.length - 1].pageId : null,
+      ...(total !== undefined ? { total } : {}),
+    });
+  }
+
   const allEmbeddings = db.select().from(embeddings).all();
 
   const result = allEmbeddings.map((row) => {
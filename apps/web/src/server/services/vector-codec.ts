@@ -0,0 +1,58 @@
+// Embeddings from the AI sidecar arrive either as JSON float lists or, when
+// requested, as base64 of packed little-endian float32 / float16 values.
+// They are stored as little-endian float32 blobs.
+
+export type VectorEncoding = "json" | "f32" | "f16";
+
+function halfToFloat(h: number): number {
+  const sign = h & 0x8000 ? -1 : 1;
+  const exponent = (h >> 10) & 0x1f;
+  const fraction = h & 0x3ff;
+  if (exponent === 0) return sign * 2 ** -14 * (fraction / 1024);
+  if (exponent === 0x1f) return fraction ? NaN : sign * Infinity;
+  return sign * 2 ** (exponent - 15) * (1 + fraction / 1024);
+}
+
+const BYTES_PER_VALUE = { f32: 4, f16: 2 } as const;
+
+// Why a packed embedding can't be stored, or null when it can
+export function packedEmbeddingError(
+  embedding: string,
+  encoding: "f32" | "f16"
+): string | null {
+  const size = BYTES_PER_VALUE[encoding];
+  // Decoded rather than estimated: Buffer skips characters outside base64
+  const byteLength = Buffer.from(embedding, "base64").byteLength;
+  if (byteLength === 0) {
+    return "Packed embedding is empty";
+  }
+  if (byteLength % size !== 0) {
+    return `${byteLength} bytes is not a whole number of ${encoding} values`;
+  }
+  return null;
+}
+
+export function embeddingToBuffer(
+  embedding: number[] | string,
+  encoding: VectorEncoding = "json"
+): Buffer {
+  if (typeof embedding !== "string") {
+    return Buffer.from(new Float32Array(embedding).buffer);
+  }
+  if (encoding !== "f32" && encoding !== "f16") {
+    throw new Error(`Packed embedding with encoding "${encoding}"`);
+  }
+  const error = packedEmbeddingError(embedding, encoding);
+  if (error) {
+    throw new Error(error);
+  }
+  const raw = Buffer.from(embedding, "base64");
+  if (encoding === "f32") {
+    return raw;
+  }
+  const floats = new Float32Array(raw.byteLength / 2);
+  for (let i = 0; i < floats.length; i++) {
+    floats[i] = halfToFloat(raw.readUInt16LE(i * 2));
+  }
+  return Buffer.from(floats.buffer);
+}
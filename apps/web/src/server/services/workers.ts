@@ -31,6 +31,8 @@ export const aiProcessingWorker = new Worker(
         page_id: pageId,
         plain_text: plainText,
         callback_url: callbackUrl,
+        // Packed float32 is what we store, so the callback decodes for free
+        embedding_encoding: "f32",
       }),
     });
 